@@ -0,0 +1,219 @@
+"""Benchmarks for the data, model, chart and API hot paths.
+
+Runs entirely offline on synthetic bars (yfinance and web3 are stubbed) and
+compares the best-of-N timings against benchmarks/baseline.json:
+
+    python benchmarks/run_benchmarks.py                # compare, exit 1 on regression
+    python benchmarks/run_benchmarks.py --update       # record a new baseline
+
+Timings are only comparable on the host that recorded them, so the baseline
+is not checked in: record it with --update on the machine that runs the
+comparison. Runs whose settings or host differ from the baseline's are
+refused rather than compared.
+"""
+import os
+import sys
+import json
+import logging
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+# Settings and host properties that must match for timings to be comparable
+COMPARABLE_META = ('bars', 'symbols', 'repeat', 'python', 'machine', 'cpus')
+
+def configure_environment(workdir):
+    # config reads the environment at import time, so this must run before any src import
+    abi_path = os.path.join(workdir, 'abi.json')
+    with open(abi_path, 'w') as f:
+        json.dump([], f)
+    os.environ['CONTRACT_ABI_PATH'] = abi_path
+    os.environ['MODEL_SAVE_PATH'] = os.path.join(workdir, 'models')
+    os.environ['DATA_STORE_PATH'] = os.path.join(workdir, 'market_store')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['JWT_SECRET_KEY'] = 'benchmark-secret-key-with-32-bytes-or-more'
+    sys.path[:0] = [os.path.join(ROOT_DIR, 'src'), BENCH_DIR]
+
+def measure(func, repeat, setup=None):
+    # One untimed warm-up run, then `repeat` timed runs; setup is never timed
+    args = setup() if setup else ()
+    func(*args)
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return {
+        'median_s': statistics.median(timings),
+        'min_s': min(timings),
+        'repeat': repeat
+    }
+
+def define_benchmarks(workdir, bars, n_symbols):
+    from fastapi.testclient import TestClient
+    from synthetic import generate_ohlcv, generate_universe
+    from stubs import install_stubs
+    install_stubs(bars=bars)
+
+    from data.bar_store import BarStore
+    from data.market_data import MarketDataFetcher
+    from data.indicators import FEATURE_COLUMNS
+    from models.prediction_model import MarketPredictionModel
+    from models.training_jobs import prepare_training_data
+    from visualization.market_charts import MarketVisualizer
+    from auth.jwt_handler import JWTHandler
+    from api import app as app_module
+
+    raw = generate_ohlcv('BENCH-USD', bars)
+    fetcher = MarketDataFetcher(store=BarStore(os.path.join(workdir, 'scratch_store')))
+    processed = fetcher._process_data(raw.copy())
+    features, target = prepare_training_data(processed)
+
+    model = MarketPredictionModel()
+    model.train(features, target)
+    model_path = os.path.join(workdir, 'bench_model.joblib')
+    model.save_model(model_path)
+    latest = features.iloc[-1:]
+    latest_row = latest[FEATURE_COLUMNS].to_numpy(dtype=float)[0]
+    predictions = [{'predicted_price': float(processed['Close'].iloc[-1]), 'timestamp': processed.index[-1]}]
+
+    def cold_fetch_setup():
+        store = BarStore(tempfile.mkdtemp(dir=workdir))
+        return (MarketDataFetcher(store=store),)
+
+    def load_model():
+        MarketPredictionModel().load_model(model_path)
+
+    # The API serves every synthetic symbol from a trained model in the registry
+    symbols = list(generate_universe(n_symbols, 1))
+    market = app_module.market
+    for symbol in symbols:
+        data = market.market_data.fetch_historical_data(symbol, period='1y')
+        symbol_model = MarketPredictionModel()
+        symbol_model.model.set_params(n_estimators=20)
+        symbol_model.train(*prepare_training_data(data[FEATURE_COLUMNS]))
+        market.models.save(symbol, symbol_model)
+    # Warm the 60d frames the prediction endpoints read
+    market.market_data.fetch_multiple_symbols(symbols, period='60d')
+    client = TestClient(app_module.app)
+    headers = {'Authorization': f"Bearer {JWTHandler.create_access_token({'sub': 'bench'})}"}
+
+    def api(method, path, **kwargs):
+        def call():
+            response = client.request(method, path, **kwargs)
+            assert response.status_code < 400, (path, response.status_code, response.text)
+        return call
+
+    return {
+        'fetch_historical_data_cold': (lambda f: f.fetch_historical_data('BENCH-USD'), cold_fetch_setup),
+        'process_data': (lambda: fetcher._process_data(raw.copy()), None),
+        'add_technical_indicators': (lambda: model._add_technical_indicators(raw.copy()), None),
+        'model_train': (lambda: MarketPredictionModel().train(features, target), None),
+        'model_predict_batch': (lambda: model.predict(features), None),
+        'model_predict_latest': (lambda: model.predict(latest), None),
+        'model_predict_one': (lambda: model.predict_one(latest_row), None),
+        'model_save': (lambda: model.save_model(model_path), None),
+        'model_load': (load_model, None),
+        'chart_price_prediction': (
+            lambda: MarketVisualizer.create_price_prediction_chart(processed, predictions), None
+        ),
+        'chart_technical_indicators': (
+            lambda: MarketVisualizer.create_technical_indicators_chart(processed), None
+        ),
+        'api_health': (api('GET', '/health'), None),
+        'api_predict': (api('POST', '/predict', json={'symbol': symbols[0]}), None),
+        'api_predict_batch': (api('POST', '/predict/batch', json={'symbols': symbols}), None),
+        'api_chart_price': (api('GET', f"/chart/{symbols[0]}", headers=headers), None),
+        'api_chart_indicators': (
+            api('GET', f"/chart/{symbols[0]}", params={'chart_type': 'technical'}, headers=headers), None
+        )
+    }, client
+
+def meta_mismatches(meta, baseline_meta):
+    return [
+        (key, baseline_meta.get(key), meta[key])
+        for key in COMPARABLE_META if baseline_meta.get(key) != meta[key]
+    ]
+
+def compare(results, baseline, threshold, min_delta):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            continue
+        # The fastest run is the least noisy estimate; tiny absolute changes are jitter
+        before, after = previous['min_s'], result['min_s']
+        if after > before * (1 + threshold) and after - before > min_delta:
+            regressions.append((name, before, after))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--output', help='also write this run\'s results to this JSON file')
+    parser.add_argument('--update', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, 0.25 = 25%%')
+    parser.add_argument('--min-delta', type=float, default=0.001, help='ignore slowdowns below this many seconds')
+    parser.add_argument('--bars', type=int, default=1000, help='bars per synthetic symbol')
+    parser.add_argument('--symbols', type=int, default=20, help='symbols for the batch endpoints')
+    parser.add_argument('--repeat', type=int, default=7, help='timed runs per benchmark')
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(workdir)
+        benchmarks, client = define_benchmarks(workdir, args.bars, args.symbols)
+        # Per-request INFO logging would dominate the API timings
+        logging.disable(logging.INFO)
+        results = {}
+        with client:
+            for name, (func, setup) in benchmarks.items():
+                if args.filter and args.filter not in name:
+                    continue
+                results[name] = measure(func, args.repeat, setup)
+                print(f"{name:32s} median {results[name]['median_s'] * 1000:10.3f} ms"
+                      f"   min {results[name]['min_s'] * 1000:10.3f} ms")
+
+    report = {
+        'meta': {
+            'bars': args.bars,
+            'symbols': args.symbols,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count()
+        },
+        'benchmarks': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    mismatches = meta_mismatches(report['meta'], baseline.get('meta', {}))
+    if mismatches:
+        for key, before, after in mismatches:
+            print(f"Baseline {key} is {before!r}, this run has {after!r}")
+        print("Not comparable with the baseline; record one for this host with --update")
+        return 2
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms "
+              f"(+{(after / before - 1) * 100:.0f}%)")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
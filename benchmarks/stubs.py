@@ -0,0 +1,46 @@
+import itertools
+
+from synthetic import generate_ohlcv
+
+class SyntheticTicker:
+    """Stands in for yfinance.Ticker, serving generated bars for any symbol."""
+
+    bars = 1000
+    seed = 0
+    _frames = {}
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, period=None, interval='1d', start=None, **kwargs):
+        key = (self.symbol, SyntheticTicker.bars, SyntheticTicker.seed)
+        if key not in SyntheticTicker._frames:
+            SyntheticTicker._frames[key] = generate_ohlcv(self.symbol, SyntheticTicker.bars, seed=SyntheticTicker.seed)
+        data = SyntheticTicker._frames[key]
+        if start is not None:
+            return data[data.index >= start].copy()
+        return data.copy()
+
+class StubContract:
+    """Stands in for PredictionContract without a node: every submission gets a fake hash."""
+
+    def __init__(self, *args, **kwargs):
+        self._counter = itertools.count()
+
+    def place_prediction(self, user_address, prediction_value, stake_amount):
+        return {'hash': f"0x{next(self._counter):064x}"}
+
+    def get_prediction_result(self, prediction_id):
+        return (0, 0, 0, False, False)
+
+def install_stubs(bars=1000, seed=0):
+    # Must run after src is importable; replaces the network-facing classes in place
+    import yfinance
+    from blockchain import smart_contract
+    import main
+
+    SyntheticTicker.bars = bars
+    SyntheticTicker.seed = seed
+    yfinance.Ticker = SyntheticTicker
+    smart_contract.PredictionContract = StubContract
+    main.PredictionContract = StubContract
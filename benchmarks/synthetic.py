@@ -0,0 +1,31 @@
+import zlib
+import numpy as np
+import pandas as pd
+
+def generate_ohlcv(symbol, bars, seed=0, start='2015-01-01', freq='D', price=100.0):
+    """Deterministic OHLCV bars shaped like yfinance history output.
+
+    Close follows a geometric random walk seeded from the symbol name, so the
+    same (symbol, bars, seed) always yields identical data.
+    """
+    rng = np.random.default_rng([seed, zlib.crc32(symbol.encode())])
+    returns = rng.normal(0.0003, 0.02, bars)
+    close = price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([price], close[:-1])) * np.exp(rng.normal(0, 0.002, bars))
+    spread = np.abs(rng.normal(0, 0.01, bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(14, 0.5, bars).round()
+
+    index = pd.date_range(start=start, periods=bars, freq=freq, tz='UTC', name='Date')
+    return pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume
+    }, index=index)
+
+def generate_universe(n_symbols, bars, seed=0, **kwargs):
+    symbols = [f"SYN{i:04d}-USD" for i in range(n_symbols)]
+    return {symbol: generate_ohlcv(symbol, bars, seed=seed, **kwargs) for symbol in symbols}
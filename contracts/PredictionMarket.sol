@@ -83,7 +83,7 @@ contract PredictionMarket is Ownable, ReentrancyGuard {
     }
     
     function resolvePrediction(
-        string memory symbol,
+        string calldata symbol,
         uint256 actualPrice,
         uint256 predictionIndex
     ) external onlyOwner {
@@ -91,24 +91,72 @@ contract PredictionMarket is Ownable, ReentrancyGuard {
         Prediction storage prediction = predictions[marketId][predictionIndex];
         require(!prediction.resolved, "Already resolved");
         
+        _resolve(prediction, symbol, actualPrice, markets[marketId].rewardMultiplier);
+    }
+    
+    function resolvePredictions(
+        string calldata symbol,
+        uint256 actualPrice,
+        uint256[] calldata predictionIndexes
+    ) external onlyOwner {
+        bytes32 marketId = keccak256(abi.encodePacked(symbol));
+        Prediction[] storage marketPredictions = predictions[marketId];
+        uint256 rewardMultiplier = markets[marketId].rewardMultiplier;
+        
+        for (uint256 i = 0; i < predictionIndexes.length; i++) {
+            Prediction storage prediction = marketPredictions[predictionIndexes[i]];
+            // Skip instead of reverting so one settled entry cannot fail the whole batch
+            if (!prediction.resolved) {
+                _resolve(prediction, symbol, actualPrice, rewardMultiplier);
+            }
+        }
+    }
+    
+    function resolvePredictionRange(
+        string calldata symbol,
+        uint256 actualPrice,
+        uint256 fromIndex,
+        uint256 toIndex
+    ) external onlyOwner {
+        bytes32 marketId = keccak256(abi.encodePacked(symbol));
+        Prediction[] storage marketPredictions = predictions[marketId];
+        require(fromIndex <= toIndex && toIndex < marketPredictions.length, "Invalid range");
+        uint256 rewardMultiplier = markets[marketId].rewardMultiplier;
+        
+        for (uint256 i = fromIndex; i <= toIndex; i++) {
+            Prediction storage prediction = marketPredictions[i];
+            if (!prediction.resolved) {
+                _resolve(prediction, symbol, actualPrice, rewardMultiplier);
+            }
+        }
+    }
+    
+    function _resolve(
+        Prediction storage prediction,
+        string calldata symbol,
+        uint256 actualPrice,
+        uint256 rewardMultiplier
+    ) private {
+        uint256 predictedPrice = prediction.predictedPrice;
+        
         // Calculate if prediction was correct (within 1% margin)
-        uint256 priceDiff = actualPrice > prediction.predictedPrice ? 
-            actualPrice - prediction.predictedPrice : 
-            prediction.predictedPrice - actualPrice;
+        uint256 priceDiff = actualPrice > predictedPrice ? 
+            actualPrice - predictedPrice : 
+            predictedPrice - actualPrice;
         
-        bool won = (priceDiff * 100) / prediction.predictedPrice <= 1;
+        bool won = (priceDiff * 100) / predictedPrice <= 1;
         prediction.resolved = true;
         prediction.won = won;
         
         if (won) {
-            uint256 reward = (prediction.stake * markets[marketId].rewardMultiplier) / 100;
+            uint256 reward = (prediction.stake * rewardMultiplier) / 100;
             userBalances[prediction.user] += reward;
         }
         
         emit PredictionResolved(
             prediction.user,
             symbol,
-            prediction.predictedPrice,
+            predictedPrice,
             actualPrice,
             won
         );
@@ -0,0 +1,49 @@
+import React, { useEffect, useState } from 'react';
+
+interface LivePriceProps {
+    symbol: string;
+}
+
+interface LiveUpdate {
+    type: 'update' | 'error';
+    symbol: string;
+    price?: number;
+    predicted_price?: number;
+    predicted_change_percent?: number;
+    confidence_score?: number;
+    detail?: string;
+}
+
+export const LivePrice: React.FC<LivePriceProps> = ({ symbol }) => {
+    const [update, setUpdate] = useState<LiveUpdate | null>(null);
+
+    useEffect(() => {
+        // Updates are pushed by the server, which refreshes each symbol once for all viewers
+        const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const token = encodeURIComponent(localStorage.getItem('token') || '');
+        const socket = new WebSocket(`${protocol}://${window.location.host}/api/ws/predictions?token=${token}`);
+
+        setUpdate(null);
+        socket.onopen = () => socket.send(JSON.stringify({ action: 'subscribe', symbols: [symbol] }));
+        socket.onmessage = (event) => {
+            const message: LiveUpdate = JSON.parse(event.data);
+            if (message.symbol === symbol) {
+                setUpdate(message);
+            }
+        };
+        return () => socket.close();
+    }, [symbol]);
+
+    if (!update) return <div className="live-price">Connecting...</div>;
+    if (update.type === 'error') return <div className="live-price error-message">{update.detail}</div>;
+
+    return (
+        <div className="live-price">
+            <span>{symbol}: {update.price?.toFixed(2)}</span>
+            <span>
+                Predicted: {update.predicted_price?.toFixed(2)} ({update.predicted_change_percent?.toFixed(2)}%)
+            </span>
+            <span>Confidence: {update.confidence_score?.toFixed(2)}</span>
+        </div>
+    );
+};
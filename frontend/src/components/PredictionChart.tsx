@@ -9,10 +9,12 @@ interface PredictionChartProps {
 }
 
 export const PredictionChart: React.FC<PredictionChartProps> = ({ symbol, chartType }) => {
+    // The server downsamples to roughly one point per pixel of this width
+    const width = Math.round(window.innerWidth);
     const { data, isLoading, error } = useQuery(
-        ['chart', symbol, chartType],
+        ['chart', symbol, chartType, width],
         async () => {
-            const response = await axios.get(`/api/chart/${symbol}?chart_type=${chartType}`, {
+            const response = await axios.get(`/api/chart/${symbol}?chart_type=${chartType}&width=${width}`, {
                 headers: {
                     'Authorization': `Bearer ${localStorage.getItem('token')}`
                 }
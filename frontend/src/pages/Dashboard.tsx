@@ -1,6 +1,7 @@
 import React from 'react';
 import { PredictionChart } from '../components/PredictionChart';
 import { PredictionForm } from '../components/PredictionForm';
+import { LivePrice } from '../components/LivePrice';
 import { useQuery } from 'react-query';
 import axios from 'axios';
 
@@ -39,6 +40,8 @@ export const Dashboard: React.FC = () => {
                     <option value="technical">Technical Indicators</option>
                 </select>
             </div>
+
+            <LivePrice symbol={selectedSymbol} />
             
             <div className="chart-section">
                 <PredictionChart
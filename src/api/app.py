@@ -1,7 +1,9 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, WebSocket
+from fastapi.responses import PlainTextResponse, Response
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+import asyncio
 import sys
 import os
 
@@ -11,10 +13,20 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from main import PredictionMarket
 import config
 from auth.jwt_handler import JWTHandler
-from auth.models import UserCreate, UserLogin, Token
+from auth.models import User, UserCreate, UserLogin, Token
 from visualization.market_charts import MarketVisualizer
+from visualization.downsampling import viewport
+from visualization.chart_cache import ChartCache, ChartEntry, as_utc
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_async_db, init_db, dispose_engines, SessionLocal
+from predictions.history import history_query, serialize
+from blockchain.indexer import ChainIndexer, prediction_history, leaderboard
+from web3 import Web3
+from executors import cpu_executor, auth_executor, shutdown_executors, ExecutorSaturated
+from metrics import REGISTRY
+from api.stream import PredictionHub
 
 app = FastAPI(
     title="Market Prediction API",
@@ -23,6 +35,57 @@ app = FastAPI(
 )
 
 market = PredictionMarket()
+chart_cache = ChartCache()
+indexer_stop = None
+
+async def live_update(symbol):
+    data, result = await market.forecast_async(symbol)
+    return {
+        'bar_time': data.index[-1].isoformat(),
+        'price': float(result['current_price']),
+        'predicted_price': float(result['predicted_price']),
+        'predicted_change_percent': float(result['predicted_change_percent']),
+        'confidence_score': float(result['confidence_score'])
+    }
+
+# One refresh per watched symbol, shared by every connected client
+stream_hub = PredictionHub(live_update)
+
+@app.on_event("startup")
+def startup():
+    global indexer_stop
+    init_db()
+    if config.INDEXER_ENABLED:
+        indexer = ChainIndexer(
+            Web3(Web3.HTTPProvider(config.WEB3_PROVIDER_URI)),
+            config.CONTRACT_ADDRESS,
+            SessionLocal
+        )
+        indexer_stop = indexer.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    if indexer_stop is not None:
+        indexer_stop.set()
+    market.training.shutdown(wait=False)
+    shutdown_executors(wait=False)
+    await stream_hub.shutdown()
+    # Write out buffered prediction history before the engines go away
+    market.history.stop()
+    await dispose_engines()
+
+async def run_request(awaitable, timeout=config.REQUEST_TIMEOUT):
+    # Map executor back-pressure and per-request timeouts onto HTTP errors
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Request timed out")
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 class PredictionRequest(BaseModel):
     symbol: str
@@ -38,43 +101,100 @@ class PredictionResponse(BaseModel):
     transaction_hash: Optional[str] = None
 
 @app.post("/predict", response_model=PredictionResponse)
-async def make_prediction(request: PredictionRequest):
-    try:
-        result = market.make_prediction(request.symbol)
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def make_prediction(
+    request: PredictionRequest,
+    current_user: Optional[dict] = Depends(JWTHandler.get_optional_user)
+):
+    user = current_user["sub"] if current_user else None
+    return await run_request(market.make_prediction_async(request.symbol, user=user))
+
+class BatchPredictionRequest(BaseModel):
+    symbols: List[str]
+
+class BatchPredictionResponse(BaseModel):
+    predictions: Dict[str, PredictionResponse]
+    errors: Dict[str, str]
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def make_batch_prediction(
+    request: BatchPredictionRequest,
+    current_user: Optional[dict] = Depends(JWTHandler.get_optional_user)
+):
+    symbols = list(dict.fromkeys(request.symbols))
+    if len(symbols) > config.MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.MAX_BATCH_SYMBOLS} symbols per batch"
+        )
+    user = current_user["sub"] if current_user else None
+    return await run_request(market.make_predictions_async(symbols, user=user))
+
+class TrainingJobRequest(BaseModel):
+    symbols: List[str]
+
+class TrainingJobResponse(BaseModel):
+    job_id: str
+    symbol: str
+    status: str
+    submitted_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    metrics: Optional[Dict[str, float]] = None
+    model_version: Optional[str] = None
+    error: Optional[str] = None
+
+@app.post("/train/jobs", response_model=List[TrainingJobResponse], status_code=202)
+async def submit_training_jobs(request: TrainingJobRequest):
+    if len(set(request.symbols)) > config.MAX_BATCH_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {config.MAX_BATCH_SYMBOLS} symbols per batch"
+        )
+    return [job.to_dict() for job in market.training.submit_many(request.symbols)]
 
-@app.get("/train/{symbol}")
+@app.get("/train/jobs", response_model=List[TrainingJobResponse])
+async def list_training_jobs(status: Optional[str] = None):
+    return [job.to_dict() for job in market.training.jobs(status)]
+
+@app.get("/train/jobs/stats")
+async def training_job_stats():
+    return market.training.stats()
+
+@app.get("/train/jobs/{job_id}", response_model=TrainingJobResponse)
+async def get_training_job(job_id: str):
+    job = market.training.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job {job_id}")
+    return job.to_dict()
+
+@app.get("/train/{symbol}", response_model=TrainingJobResponse, status_code=202)
 async def train_model(symbol: str):
-    try:
-        results = market.train_models([symbol])
-        return {
-            "status": "success",
-            "training_metrics": results[symbol]
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Training runs in the background; poll /train/jobs/{job_id} for the result
+    return market.training.submit(symbol).to_dict()
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/register", response_model=Token)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists
-    if db.query(User).filter(User.email == user.email).first():
+    if (await db.execute(select(User.id).where(User.email == user.email))).first():
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
     db_user = User(
         email=user.email,
         username=user.username,
-        hashed_password=User.hash_password(user.password),
+        hashed_password=await run_request(auth_executor.run(User.hash_password, user.password)),
         wallet_address=user.wallet_address
     )
     db.add(db_user)
-    db.commit()
+    await db.commit()
     
     # Create access token
     access_token = JWTHandler.create_access_token(
@@ -84,9 +204,9 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     return {"access_token": access_token}
 
 @app.post("/login", response_model=Token)
-async def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if not db_user or not db_user.verify_password(user.password):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    db_user = (await db.execute(select(User).where(User.username == user.username))).scalars().first()
+    if not db_user or not await run_request(auth_executor.run(db_user.verify_password, user.password)):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     access_token = JWTHandler.create_access_token(
@@ -98,18 +218,98 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
 @app.get("/chart/{symbol}")
 async def get_market_chart(
     symbol: str,
+    request: Request,
     chart_type: str = "price",
+    width: int = config.CHART_DEFAULT_WIDTH,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     current_user: dict = Depends(JWTHandler.get_current_user)
 ):
-    try:
-        market_data = market.market_data.fetch_historical_data(symbol)
-        predictions = [market.make_prediction(symbol)]
+    # The plot never carries more points than the client has pixels to draw them on
+    width = max(1, min(width, config.CHART_MAX_WIDTH))
+    chart_type = "price" if chart_type == "price" else "technical"
+
+    async def build_chart():
+        market_data = await market.async_market_data.fetch_historical_data(symbol)
+        # Charts show the last stored prediction; viewing one never triggers a new prediction
+        prediction = market.latest_prediction(symbol) if chart_type == "price" else None
+        last_bar = market_data.index[-1]
+        
+        # The chart only changes with a new bar or a new prediction, so both are part of the key
+        key = (symbol, chart_type, width, start, end, str(last_bar), prediction and prediction['timestamp'])
+        entry = chart_cache.get(key)
+        if entry is None:
+            updated = [last_bar, prediction['timestamp']] if prediction else [last_bar]
+            entry = ChartEntry(key, max(as_utc(t) for t in updated))
+        if entry.not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+            return Response(status_code=304, headers=entry.headers)
+        if entry.body is not None:
+            return Response(content=entry.body, media_type="application/json", headers=entry.headers)
         
+        market_data = viewport(market_data, start, end)
         if chart_type == "price":
-            fig = MarketVisualizer.create_price_prediction_chart(market_data, predictions)
+            fig = await cpu_executor.run(
+                MarketVisualizer.create_price_prediction_chart, market_data, [prediction] if prediction else [],
+                max(1, width // config.CHART_CANDLE_PIXELS)
+            )
         else:
-            fig = MarketVisualizer.create_technical_indicators_chart(market_data)
+            fig = await cpu_executor.run(MarketVisualizer.create_technical_indicators_chart, market_data, width)
             
-        return fig.to_json()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        entry.body = await cpu_executor.run(fig.to_json)
+        chart_cache.put(entry)
+        return Response(content=entry.body, media_type="application/json", headers=entry.headers)
+    
+    return await run_request(build_chart())
+
+@app.get("/predictions")
+async def get_predictions(
+    symbol: Optional[str] = None,
+    user: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = history_query(symbol=symbol, username=user, start=start, end=end)
+    rows = (await db.execute(query.limit(limit).offset(offset))).scalars().all()
+    return [serialize(row) for row in rows]
+
+@app.get("/predictions/me")
+async def get_my_predictions(
+    symbol: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: dict = Depends(JWTHandler.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = history_query(symbol=symbol, username=current_user["sub"], start=start, end=end)
+    rows = (await db.execute(query.limit(limit).offset(offset))).scalars().all()
+    return [serialize(row) for row in rows]
+
+@app.websocket("/ws/predictions")
+async def prediction_stream(websocket: WebSocket, token: str = ""):
+    # Browsers cannot set headers on WebSocket requests, so the token comes in the query string
+    if JWTHandler.decode_token(token) is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    await stream_hub.serve(websocket)
+
+@app.get("/chain/predictions")
+def get_chain_predictions(
+    user: Optional[str] = None,
+    symbol: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    # Served from the event indexer's tables instead of per-prediction contract calls
+    return prediction_history(db, user=user, symbol=symbol, limit=limit, offset=offset)
+
+@app.get("/chain/leaderboard")
+def get_leaderboard(symbol: Optional[str] = None, limit: int = Query(10, ge=1, le=100),
+                    db: Session = Depends(get_db)):
+    return leaderboard(db, symbol=symbol, limit=limit)
\ No newline at end of file
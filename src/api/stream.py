@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from fastapi import WebSocket, WebSocketDisconnect
+
+import config
+from metrics import STREAM_MESSAGES, STREAM_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+class Subscriber:
+    # Outgoing updates for one connection; only the newest undelivered update per
+    # symbol is kept, so a slow client skips stale ones instead of building a backlog
+
+    def __init__(self):
+        self.symbols = set()
+        self._pending = OrderedDict()  # symbol -> latest undelivered message
+        self._ready = asyncio.Event()
+
+    def offer(self, symbol, message):
+        if symbol in self._pending:
+            STREAM_MESSAGES.labels('conflated').inc()
+        self._pending[symbol] = message
+        self._ready.set()
+
+    async def next(self):
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+        _, message = self._pending.popitem(last=False)
+        return message
+
+class PredictionHub:
+    # Fans out live updates to WebSocket subscribers, with one refresh task per
+    # watched symbol however many clients watch it
+
+    def __init__(self, refresh, interval=None, max_symbols=None):
+        self.refresh = refresh  # async symbol -> update dict
+        self.interval = interval or config.STREAM_REFRESH_INTERVAL
+        self.max_symbols = max_symbols or config.STREAM_MAX_SYMBOLS
+        self._subscribers = {}  # symbol -> set of Subscriber
+        self._tasks = {}
+        self._latest = {}
+        self._connections = set()
+        STREAM_CONNECTIONS.set_function(lambda: len(self._connections))
+
+    def connect(self):
+        subscriber = Subscriber()
+        self._connections.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber):
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+        self._connections.discard(subscriber)
+
+    @staticmethod
+    def _validate(symbols):
+        # A bare string would otherwise be subscribed character by character
+        if not isinstance(symbols, list) or not all(isinstance(s, str) and s.strip() for s in symbols):
+            raise ValueError("symbols must be a list of non-empty strings")
+
+    def subscribe(self, subscriber, symbols):
+        self._validate(symbols)
+        for symbol in symbols:
+            if symbol in subscriber.symbols:
+                continue
+            if len(subscriber.symbols) >= self.max_symbols:
+                raise ValueError(f"At most {self.max_symbols} symbols per connection")
+            subscriber.symbols.add(symbol)
+            self._subscribers.setdefault(symbol, set()).add(subscriber)
+            if symbol in self._latest:
+                subscriber.offer(symbol, self._latest[symbol])
+            if symbol not in self._tasks:
+                self._tasks[symbol] = asyncio.create_task(self._poll(symbol))
+
+    def unsubscribe(self, subscriber, symbols):
+        self._validate(symbols)
+        for symbol in symbols:
+            subscriber.symbols.discard(symbol)
+            watchers = self._subscribers.get(symbol)
+            if watchers is not None:
+                watchers.discard(subscriber)
+                if not watchers:
+                    del self._subscribers[symbol]
+
+    def watched_symbols(self):
+        return set(self._subscribers)
+
+    async def shutdown(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def serve(self, websocket: WebSocket):
+        # Clients send {"action": "subscribe" | "unsubscribe", "symbols": [...]}
+        subscriber = self.connect()
+        sender = asyncio.create_task(self._send(websocket, subscriber))
+        try:
+            while True:
+                try:
+                    # Malformed messages get an error reply; only a disconnect ends the loop
+                    request = await websocket.receive_json()
+                    if not isinstance(request, dict):
+                        raise ValueError("Messages must be JSON objects")
+                    action, symbols = request.get('action'), request.get('symbols', [])
+                    if action == 'subscribe':
+                        self.subscribe(subscriber, symbols)
+                    elif action == 'unsubscribe':
+                        self.unsubscribe(subscriber, symbols)
+                    else:
+                        raise ValueError(f"Unknown action {action!r}")
+                except (ValueError, TypeError, KeyError) as e:
+                    # json.JSONDecodeError is a ValueError; binary frames have no text to decode
+                    subscriber.offer(None, {'type': 'error', 'detail': str(e)})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            sender.cancel()
+            self.disconnect(subscriber)
+
+    async def _send(self, websocket, subscriber):
+        try:
+            while True:
+                await websocket.send_json(await subscriber.next())
+                STREAM_MESSAGES.labels('sent').inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Stream send failed: {str(e)}")
+
+    async def _poll(self, symbol):
+        try:
+            while self._subscribers.get(symbol):
+                try:
+                    message = {'type': 'update', 'symbol': symbol, **await self.refresh(symbol)}
+                except Exception as e:
+                    logger.error(f"Stream refresh failed for {symbol}: {str(e)}")
+                    message = {'type': 'error', 'symbol': symbol, 'detail': str(e)}
+
+                if message != self._latest.get(symbol):
+                    self._latest[symbol] = message
+                    for subscriber in list(self._subscribers.get(symbol, ())):
+                        subscriber.offer(symbol, message)
+                await asyncio.sleep(self.interval)
+        finally:
+            del self._tasks[symbol]
+            if symbol not in self._subscribers:
+                self._latest.pop(symbol, None)
@@ -1,11 +1,52 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from collections import OrderedDict
+import time
+import threading
 import jwt
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import config
+from metrics import CACHE_REQUESTS, CACHE_EVICTIONS
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+class TokenCache:
+    # Claims of valid tokens whose signature was already checked, dropped once the token expires
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or config.TOKEN_CACHE_SIZE
+        self._claims = OrderedDict()  # token -> claims
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            claims = self._claims.get(token)
+            if claims is not None and claims["exp"] <= time.time():
+                del self._claims[token]
+                CACHE_EVICTIONS.labels('tokens', 'expired').inc()
+                claims = None
+            if claims is None:
+                CACHE_REQUESTS.labels('tokens', 'miss').inc()
+                return None
+            self._claims.move_to_end(token)
+            CACHE_REQUESTS.labels('tokens', 'hit').inc()
+            return claims
+
+    def put(self, token, claims):
+        with self._lock:
+            self._claims[token] = claims
+            self._claims.move_to_end(token)
+            while len(self._claims) > self.max_entries:
+                self._claims.popitem(last=False)
+                CACHE_EVICTIONS.labels('tokens', 'capacity').inc()
+
+    def clear(self):
+        with self._lock:
+            self._claims.clear()
+
+token_cache = TokenCache()
 
 class JWTHandler:
     @staticmethod
@@ -22,9 +63,15 @@ class JWTHandler:
     
     @staticmethod
     def decode_token(token: str):
+        cached = token_cache.get(token)
+        if cached is not None:
+            return cached
         try:
             decoded_token = jwt.decode(token, config.JWT_SECRET_KEY, algorithms=[config.JWT_ALGORITHM])
-            return decoded_token if decoded_token["exp"] >= datetime.utcnow().timestamp() else None
+            if decoded_token["exp"] < datetime.utcnow().timestamp():
+                return None
+            token_cache.put(token, decoded_token)
+            return decoded_token
         except:
             return None
             
@@ -34,4 +81,11 @@ class JWTHandler:
         decoded_token = JWTHandler.decode_token(token)
         if decoded_token is None:
             raise HTTPException(status_code=401, detail="Invalid or expired token")
-        return decoded_token 
\ No newline at end of file
+        return decoded_token
+    
+    @staticmethod
+    async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Security(optional_security)):
+        # Anonymous requests are allowed, but a token that is sent must be valid
+        if credentials is None:
+            return None
+        return await JWTHandler.get_current_user(credentials) 
\ No newline at end of file
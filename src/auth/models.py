@@ -4,6 +4,7 @@ from datetime import datetime
 import bcrypt
 from sqlalchemy import Column, Integer, String, DateTime, Float
 from sqlalchemy.ext.declarative import declarative_base
+import config
 
 Base = declarative_base()
 
@@ -20,7 +21,8 @@ class User(Base):
     
     @staticmethod
     def hash_password(password: str) -> str:
-        salt = bcrypt.gensalt()
+        # Existing hashes keep the cost they were created with; checkpw reads it from the hash
+        salt = bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS)
         return bcrypt.hashpw(password.encode(), salt).decode()
     
     def verify_password(self, password: str) -> bool:
@@ -1,9 +1,12 @@
 from web3 import Web3
-from eth_account import Account
 import json
 import logging
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import Future
 import config
+from blockchain.transactions import TransactionPipeline
+from blockchain.resolver import BatchResolver
+from blockchain.reads import ContractReader, ContractReadError
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,8 @@ class ContractManager:
             address=config.CONTRACT_ADDRESS,
             abi=self.contract_abi
         )
+        self.transactions = TransactionPipeline(self.w3)
+        self.reader = ContractReader(self.w3, config.CONTRACT_ADDRESS, self.contract_abi)
         
     def create_market(
         self,
@@ -27,29 +32,7 @@ class ContractManager:
         private_key: str
     ) -> Dict:
         try:
-            account = Account.from_key(private_key)
-            nonce = self.w3.eth.get_transaction_count(account.address)
-            
-            txn = self.contract.functions.createMarket(
-                symbol,
-                minimum_stake,
-                reward_multiplier
-            ).build_transaction({
-                'from': account.address,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(txn, private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            return {
-                'status': 'success',
-                'transaction_hash': receipt['transactionHash'].hex(),
-                'block_number': receipt['blockNumber']
-            }
+            return self.submit_create_market(symbol, minimum_stake, reward_multiplier, private_key).result()
             
         except Exception as e:
             logger.error(f"Error creating market: {str(e)}")
@@ -63,45 +46,132 @@ class ContractManager:
         private_key: str
     ) -> Dict:
         try:
-            account = Account.from_key(private_key)
-            nonce = self.w3.eth.get_transaction_count(account.address)
+            return self.submit_prediction(symbol, predicted_price, stake_amount, private_key).result()
             
-            txn = self.contract.functions.placePrediction(
-                symbol,
-                predicted_price,
-                stake_amount
-            ).build_transaction({
-                'from': account.address,
-                'gas': 2000000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-            })
+        except Exception as e:
+            logger.error(f"Error placing prediction: {str(e)}")
+            raise
             
-            signed_txn = self.w3.eth.account.sign_transaction(txn, private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    def submit_create_market(
+        self,
+        symbol: str,
+        minimum_stake: int,
+        reward_multiplier: int,
+        private_key: str,
+        callback: Optional[Callable] = None
+    ) -> Future:
+        # Returns once the node accepted the transaction; the future resolves when it is mined
+        return self.transactions.submit(
+            self.contract.functions.createMarket(symbol, minimum_stake, reward_multiplier),
+            private_key,
+            callback=callback
+        )
+        
+    def submit_prediction(
+        self,
+        symbol: str,
+        predicted_price: int,
+        stake_amount: int,
+        private_key: str,
+        callback: Optional[Callable] = None
+    ) -> Future:
+        return self.transactions.submit(
+            self.contract.functions.placePrediction(symbol, predicted_price, stake_amount),
+            private_key,
+            callback=callback
+        )
+        
+    def place_predictions(self, predictions: List[Dict], private_key: str) -> List[Future]:
+        # Sends every prediction back-to-back with consecutive nonces, then waits for none of them.
+        # Futures come back in input order, so several predictions on one symbol each keep theirs
+        futures = []
+        for prediction in predictions:
+            try:
+                futures.append(self.submit_prediction(
+                    prediction['symbol'],
+                    prediction['predicted_price'],
+                    prediction['stake_amount'],
+                    private_key
+                ))
+            except Exception as e:
+                logger.error(f"Error placing prediction for {prediction['symbol']}: {str(e)}")
+                failed = Future()
+                failed.set_exception(e)
+                futures.append(failed)
+        return futures
             
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            return {
-                'status': 'success',
-                'transaction_hash': receipt['transactionHash'].hex(),
-                'block_number': receipt['blockNumber']
-            }
+    def submit_resolution(
+        self,
+        symbol: str,
+        actual_price: int,
+        prediction_indexes: List[int],
+        private_key: str,
+        gas: Optional[int] = None,
+        as_range: bool = False,
+        callback: Optional[Callable] = None
+    ) -> Future:
+        function_call = self._resolution_call(symbol, actual_price, prediction_indexes, as_range)
+        return self.transactions.submit(function_call, private_key, gas=gas, callback=callback)
+        
+    def estimate_resolution_gas(
+        self,
+        symbol: str,
+        actual_price: int,
+        prediction_indexes: List[int],
+        private_key: str,
+        as_range: bool = False
+    ) -> int:
+        # The node's estimate; raises if the call would revert
+        function_call = self._resolution_call(symbol, actual_price, prediction_indexes, as_range)
+        return self.transactions.estimate_gas(function_call, private_key)
+        
+    def _resolution_call(self, symbol, actual_price, prediction_indexes, as_range):
+        if as_range:
+            return self.contract.functions.resolvePredictionRange(
+                symbol, actual_price, prediction_indexes[0], prediction_indexes[-1]
+            )
+        return self.contract.functions.resolvePredictions(symbol, actual_price, prediction_indexes)
+        
+    def resolve_open_predictions(self, session, actual_prices: Dict[str, int], private_key: str) -> List:
+        # Open predictions come from the indexer tables; returns (batch, future) pairs
+        try:
+            return BatchResolver(self).resolve(session, actual_prices, private_key)
             
         except Exception as e:
-            logger.error(f"Error placing prediction: {str(e)}")
+            logger.error(f"Error resolving predictions: {str(e)}")
             raise
             
     def get_market_info(self, symbol: str) -> Dict:
         try:
             market_id = Web3.solidity_keccak(['string'], [symbol])
-            market = self.contract.functions.markets(market_id).call()
+            return self._market_info(self.reader.call('markets', market_id))
+        except Exception as e:
+            logger.error(f"Error getting market info: {str(e)}")
+            raise
             
-            return {
-                'symbol': market[0],
-                'minimum_stake': market[1],
-                'reward_multiplier': market[2],
-                'active': market[3]
-            }
+    def get_market_infos(self, symbols: List[str]) -> Dict[str, Dict]:
+        # One batched, block-cached read for the whole list; failed symbols are left out
+        try:
+            markets = self.reader.call_many(
+                [('markets', (Web3.solidity_keccak(['string'], [symbol]),)) for symbol in symbols]
+            )
         except Exception as e:
             logger.error(f"Error getting market info: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+        
+        infos = {}
+        for symbol, market in zip(symbols, markets):
+            if isinstance(market, ContractReadError):
+                logger.error(f"Error getting market info for {symbol}: {str(market)}")
+                continue
+            infos[symbol] = self._market_info(market)
+        return infos
+        
+    @staticmethod
+    def _market_info(market) -> Dict:
+        return {
+            'symbol': market[0],
+            'minimum_stake': market[1],
+            'reward_multiplier': market[2],
+            'active': market[3]
+        } 
\ No newline at end of file
@@ -0,0 +1,277 @@
+import logging
+import threading
+from eth_abi import decode
+from web3 import Web3
+from sqlalchemy import insert, update, delete, select, func, case
+
+import config
+from blockchain.models import ChainMarket, ChainPrediction, IndexedBlock, IndexerCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# None of the PredictionMarket event parameters are indexed, so everything is in the log data
+EVENTS = {
+    'MarketCreated': ['string', 'uint256', 'uint256'],
+    'PredictionPlaced': ['address', 'string', 'uint256', 'uint256'],
+    'PredictionResolved': ['address', 'string', 'uint256', 'uint256', 'bool'],
+}
+
+def event_topic(name):
+    return Web3.keccak(text=f"{name}({','.join(EVENTS[name])})")
+
+TOPICS = {bytes(event_topic(name)): name for name in EVENTS}
+
+def _hex(value):
+    return value if isinstance(value, str) else '0x' + bytes(value).hex()
+
+class ChainIndexer:
+    # Follows PredictionMarket events into the chain_* tables, committing each block range
+    # with its checkpoint and re-indexing above a fork when a reorg is detected
+
+    def __init__(self, w3, contract_address, session_factory, name='prediction_market',
+                 start_block=None, reorg_depth=None, chunk_size=None, max_chunk_size=None, target_logs=None):
+        self.w3 = w3
+        self.contract_address = contract_address
+        self.session_factory = session_factory
+        self.name = name
+        self.start_block = config.INDEXER_START_BLOCK if start_block is None else start_block
+        self.reorg_depth = reorg_depth or config.INDEXER_REORG_DEPTH
+        self.chunk_size = chunk_size or config.INDEXER_CHUNK_SIZE
+        self.max_chunk_size = max_chunk_size or config.INDEXER_MAX_CHUNK_SIZE
+        self.target_logs = target_logs or config.INDEXER_TARGET_LOGS
+        self._ceiling = self.max_chunk_size
+        self._next_index = {}  # symbol -> next prediction index, loaded lazily
+
+    def index_once(self):
+        """Index every block up to the current head; returns the number of logs applied."""
+        head = self.w3.eth.block_number
+        applied = 0
+        session = self.session_factory()
+        try:
+            self._handle_reorg(session)
+            start = self._checkpoint(session) + 1
+            while start <= head:
+                end = min(start + self.chunk_size - 1, head)
+                hashes = self._block_hashes(max(start, head - self.reorg_depth + 1), end)
+                try:
+                    logs = self._get_logs(start, end)
+                except Exception as e:
+                    if self.chunk_size == 1:
+                        raise
+                    # Remember the size that failed so growth does not run into it again
+                    self.chunk_size = self._ceiling = max(1, self.chunk_size // 2)
+                    logger.warning(f"get_logs {start}-{end} failed, shrinking range to {self.chunk_size}: {str(e)}")
+                    continue
+
+                if any(_hex(log['blockHash']) != hashes[log['blockNumber']]
+                       for log in logs if log['blockNumber'] in hashes):
+                    # The chain reorganised between reading hashes and logs; read both again
+                    continue
+
+                self._apply(session, logs)
+                self._record_blocks(session, hashes, head)
+                self._set_checkpoint(session, end)
+                session.commit()
+                applied += len(logs)
+                start = end + 1
+
+                if len(logs) < self.target_logs // 2:
+                    self.chunk_size = min(self.chunk_size * 2, self.max_chunk_size, self._ceiling)
+                elif len(logs) > self.target_logs:
+                    self.chunk_size = max(1, self.chunk_size // 2)
+            return applied
+        except Exception:
+            session.rollback()
+            self._next_index.clear()
+            raise
+        finally:
+            session.close()
+
+    def run(self, stop_event, poll_interval=None):
+        poll_interval = poll_interval or config.INDEXER_POLL_INTERVAL
+        while not stop_event.is_set():
+            try:
+                self.index_once()
+            except Exception as e:
+                logger.error(f"Indexer {self.name} failed: {str(e)}")
+            stop_event.wait(poll_interval)
+
+    def start(self, poll_interval=None):
+        stop_event = threading.Event()
+        thread = threading.Thread(target=self.run, args=(stop_event, poll_interval), name='chain-indexer', daemon=True)
+        thread.start()
+        return stop_event
+
+    def _get_logs(self, start, end):
+        logs = self.w3.eth.get_logs({
+            'fromBlock': start,
+            'toBlock': end,
+            'address': self.contract_address,
+            'topics': [[_hex(topic) for topic in TOPICS]]
+        })
+        return sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex']))
+
+    def _block_hashes(self, start, end):
+        return {number: _hex(self.w3.eth.get_block(number)['hash']) for number in range(start, end + 1)}
+
+    def _apply(self, session, logs):
+        markets, placed, resolved = [], [], []
+        for log in logs:
+            name = TOPICS.get(bytes(log['topics'][0]))
+            if name is None:
+                continue
+            values = decode(EVENTS[name], bytes(log['data']))
+            source = {
+                'block_number': log['blockNumber'],
+                'transaction_hash': _hex(log['transactionHash'])
+            }
+
+            if name == 'MarketCreated':
+                symbol, minimum_stake, reward_multiplier = values
+                markets.append(dict(source, symbol=symbol, minimum_stake=minimum_stake,
+                                    reward_multiplier=reward_multiplier))
+            elif name == 'PredictionPlaced':
+                user, symbol, predicted_price, stake = values
+                placed.append(dict(
+                    source,
+                    symbol=symbol,
+                    prediction_index=self._take_index(session, symbol),
+                    user=user.lower(),
+                    predicted_price=predicted_price,
+                    stake=stake,
+                    log_index=log['logIndex'],
+                    resolved=False
+                ))
+            else:
+                resolved.append((source['block_number'],) + values)
+
+        if markets:
+            session.execute(insert(ChainMarket), markets)
+        if placed:
+            session.execute(insert(ChainPrediction), placed)
+        for block_number, user, symbol, predicted_price, actual_price, won in resolved:
+            self._resolve(session, block_number, user.lower(), symbol, predicted_price, actual_price, won)
+
+    def _resolve(self, session, block_number, user, symbol, predicted_price, actual_price, won):
+        # PredictionResolved carries no index; the contract only resolves open predictions,
+        # so the oldest open one with the same user, symbol and price is taken
+        prediction_id = session.execute(
+            select(ChainPrediction.id)
+            .where(
+                ChainPrediction.symbol == symbol,
+                ChainPrediction.user == user,
+                ChainPrediction.predicted_price == predicted_price,
+                ChainPrediction.resolved.is_(False)
+            )
+            .order_by(ChainPrediction.prediction_index)
+            .limit(1)
+        ).scalar()
+        if prediction_id is None:
+            logger.warning(f"PredictionResolved for unknown prediction {symbol} {user} at block {block_number}")
+            return
+        session.execute(
+            update(ChainPrediction)
+            .where(ChainPrediction.id == prediction_id)
+            .values(resolved=True, won=won, actual_price=actual_price, resolved_block=block_number)
+        )
+
+    def _take_index(self, session, symbol):
+        if symbol not in self._next_index:
+            latest = session.execute(
+                select(func.max(ChainPrediction.prediction_index)).where(ChainPrediction.symbol == symbol)
+            ).scalar()
+            self._next_index[symbol] = 0 if latest is None else latest + 1
+        index = self._next_index[symbol]
+        self._next_index[symbol] = index + 1
+        return index
+
+    def _record_blocks(self, session, hashes, head):
+        if hashes:
+            session.execute(delete(IndexedBlock).where(IndexedBlock.number.in_(list(hashes))))
+            session.execute(insert(IndexedBlock), [{'number': n, 'hash': h} for n, h in hashes.items()])
+        session.execute(delete(IndexedBlock).where(IndexedBlock.number <= head - self.reorg_depth))
+
+    def _handle_reorg(self, session):
+        stored = session.execute(select(IndexedBlock).order_by(IndexedBlock.number.desc())).scalars().all()
+        fork = None
+        for block in stored:
+            if _hex(self.w3.eth.get_block(block.number)['hash']) == block.hash:
+                fork = block.number
+                break
+        if not stored or fork == stored[0].number:
+            return
+
+        if fork is None:
+            fork = stored[-1].number - 1
+            logger.error(f"Reorg deeper than {self.reorg_depth} blocks; re-indexing from block {fork + 1}")
+        else:
+            logger.warning(f"Reorg detected; rolling back to block {fork}")
+        self._rollback(session, fork)
+        session.commit()
+
+    def _rollback(self, session, fork):
+        session.execute(delete(ChainPrediction).where(ChainPrediction.block_number > fork))
+        session.execute(
+            update(ChainPrediction)
+            .where(ChainPrediction.resolved_block > fork)
+            .values(resolved=False, won=None, actual_price=None, resolved_block=None)
+        )
+        session.execute(delete(ChainMarket).where(ChainMarket.block_number > fork))
+        session.execute(delete(IndexedBlock).where(IndexedBlock.number > fork))
+        self._set_checkpoint(session, fork)
+        self._next_index.clear()
+
+    def _checkpoint(self, session):
+        checkpoint = session.get(IndexerCheckpoint, self.name)
+        return checkpoint.block_number if checkpoint is not None else self.start_block - 1
+
+    def _set_checkpoint(self, session, block_number):
+        checkpoint = session.get(IndexerCheckpoint, self.name)
+        if checkpoint is None:
+            session.add(IndexerCheckpoint(name=self.name, block_number=block_number))
+        else:
+            checkpoint.block_number = block_number
+        session.flush()
+
+def prediction_history(session, user=None, symbol=None, limit=100, offset=0):
+    query = select(ChainPrediction)
+    if user:
+        query = query.where(ChainPrediction.user == user.lower())
+    if symbol:
+        query = query.where(ChainPrediction.symbol == symbol)
+    query = query.order_by(ChainPrediction.block_number.desc(), ChainPrediction.log_index.desc())
+    rows = session.execute(query.limit(limit).offset(offset)).scalars().all()
+    return [{
+        'symbol': row.symbol,
+        'prediction_index': row.prediction_index,
+        'user': row.user,
+        'predicted_price': int(row.predicted_price),
+        'stake': int(row.stake),
+        'block_number': row.block_number,
+        'transaction_hash': row.transaction_hash,
+        'resolved': row.resolved,
+        'won': row.won,
+        'actual_price': int(row.actual_price) if row.actual_price is not None else None
+    } for row in rows]
+
+def leaderboard(session, symbol=None, limit=10):
+    wins = func.sum(case((ChainPrediction.won.is_(True), 1), else_=0))
+    resolved = func.sum(case((ChainPrediction.resolved.is_(True), 1), else_=0))
+    query = select(
+        ChainPrediction.user,
+        func.count().label('predictions'),
+        resolved.label('resolved'),
+        wins.label('wins'),
+        func.sum(ChainPrediction.stake).label('total_stake')
+    ).group_by(ChainPrediction.user)
+    if symbol:
+        query = query.where(ChainPrediction.symbol == symbol)
+    query = query.order_by(wins.desc(), resolved.asc(), ChainPrediction.user).limit(limit)
+    return [{
+        'user': row.user,
+        'predictions': row.predictions,
+        'resolved': row.resolved,
+        'wins': row.wins,
+        'win_rate': row.wins / row.resolved if row.resolved else None,
+        'total_stake': int(row.total_stake or 0)
+    } for row in session.execute(query)]
@@ -0,0 +1,53 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Numeric, Index, UniqueConstraint
+from auth.models import Base
+
+# uint256 values from the contract do not fit in a 64-bit integer
+Uint256 = Numeric(78, 0)
+
+class ChainMarket(Base):
+    __tablename__ = "chain_markets"
+
+    symbol = Column(String, primary_key=True)
+    minimum_stake = Column(Uint256)
+    reward_multiplier = Column(Uint256)
+    block_number = Column(Integer, index=True)
+    transaction_hash = Column(String)
+
+class ChainPrediction(Base):
+    __tablename__ = "chain_predictions"
+    __table_args__ = (
+        UniqueConstraint('transaction_hash', 'log_index'),
+        Index('ix_chain_predictions_symbol_index', 'symbol', 'prediction_index', unique=True),
+        Index('ix_chain_predictions_user_block', 'user', 'block_number'),
+        Index('ix_chain_predictions_open', 'symbol', 'user', 'predicted_price', 'resolved'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    # Position in the contract's predictions[marketId] array
+    prediction_index = Column(Integer, nullable=False)
+    user = Column(String, nullable=False)
+    predicted_price = Column(Uint256)
+    stake = Column(Uint256)
+    block_number = Column(Integer, nullable=False, index=True)
+    transaction_hash = Column(String, nullable=False)
+    log_index = Column(Integer, nullable=False)
+    resolved = Column(Boolean, default=False, nullable=False)
+    won = Column(Boolean)
+    actual_price = Column(Uint256)
+    resolved_block = Column(Integer, index=True)
+
+class IndexedBlock(Base):
+    # Hashes of recently indexed blocks, kept for the reorg window only
+    __tablename__ = "chain_blocks"
+
+    number = Column(Integer, primary_key=True)
+    hash = Column(String, nullable=False)
+
+class IndexerCheckpoint(Base):
+    __tablename__ = "indexer_checkpoints"
+
+    name = Column(String, primary_key=True)
+    block_number = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,151 @@
+import time
+import logging
+import threading
+from eth_abi import encode, decode
+from eth_abi.exceptions import DecodingError
+from web3 import Web3
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Multicall3 is deployed at the same address on most EVM chains
+AGGREGATE3_SELECTOR = Web3.keccak(text='aggregate3((address,bool,bytes)[])')[:4]
+
+class ContractReadError(Exception):
+    pass
+
+def _abi_type(param):
+    if param['type'].startswith('tuple'):
+        inner = ','.join(_abi_type(component) for component in param['components'])
+        return f"({inner}){param['type'][len('tuple'):]}"
+    return param['type']
+
+class ContractReader:
+    # View calls for one contract, batched (Multicall3 or JSON-RPC) and cached per block
+
+    def __init__(self, w3, contract_address, abi, multicall_address=None, block_refresh=None, max_batch=None):
+        self.w3 = w3
+        self.contract_address = contract_address
+        self.multicall_address = config.MULTICALL_ADDRESS if multicall_address is None else multicall_address
+        self.block_refresh = config.BLOCK_REFRESH_INTERVAL if block_refresh is None else block_refresh
+        self.max_batch = max_batch or config.READ_BATCH_SIZE
+        self._multicall_deployed = None
+        self._functions = {
+            entry['name']: entry for entry in abi
+            if entry.get('type') == 'function' and entry.get('stateMutability') in ('view', 'pure')
+        }
+        self._block = None
+        self._block_checked = 0.0
+        self._cache = {}  # (function, args) -> result, all read at self._block
+        self._lock = threading.Lock()
+
+    def block_number(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._block is None or now - self._block_checked >= self.block_refresh:
+                block = self.w3.eth.block_number
+                if block != self._block:
+                    self._block = block
+                    self._cache = {}
+                self._block_checked = now
+            return self._block
+
+    def call(self, function, *args):
+        result = self.call_many([(function, args)])[0]
+        if isinstance(result, ContractReadError):
+            raise result
+        return result
+
+    def call_many(self, calls):
+        """Results in the same order as `calls`; failed reads come back as ContractReadError."""
+        block = self.block_number()
+        keys = [(function, tuple(args)) for function, args in calls]
+        with self._lock:
+            cache = self._cache if block == self._block else {}
+            results = {key: cache[key] for key in keys if key in cache}
+        missing = list(dict.fromkeys(key for key in keys if key not in results))
+
+        for start in range(0, len(missing), self.max_batch):
+            chunk = missing[start:start + self.max_batch]
+            payloads = [self._encode(function, args) for function, args in chunk]
+            try:
+                if self._use_multicall():
+                    raw = self._multicall(payloads, block)
+                else:
+                    raw = self._rpc_batch(payloads, block)
+            except ContractReadError as e:
+                raw = [e] * len(chunk)
+
+            fetched = {}
+            for key, result in zip(chunk, raw):
+                if isinstance(result, ContractReadError):
+                    fetched[key] = result
+                    continue
+                success, data = result
+                if not success:
+                    fetched[key] = ContractReadError(f"{key[0]}{key[1]} reverted at block {block}")
+                    continue
+                try:
+                    fetched[key] = self._decode(key[0], data)
+                except DecodingError as e:
+                    fetched[key] = ContractReadError(f"{key[0]}{key[1]} returned undecodable data at block {block}: {e}")
+            results.update(fetched)
+            with self._lock:
+                if block == self._block:
+                    self._cache.update(
+                        {key: value for key, value in fetched.items() if not isinstance(value, ContractReadError)}
+                    )
+        return [results[key] for key in keys]
+
+    def _encode(self, function, args):
+        entry = self._functions.get(function)
+        if entry is None:
+            raise ContractReadError(f"No view function {function} in the contract ABI")
+        types = [_abi_type(param) for param in entry['inputs']]
+        selector = Web3.keccak(text=f"{function}({','.join(types)})")[:4]
+        return bytes(selector) + encode(types, list(args))
+
+    def _decode(self, function, data):
+        types = [_abi_type(param) for param in self._functions[function]['outputs']]
+        values = decode(types, bytes(data))
+        return values[0] if len(values) == 1 else values
+
+    def _use_multicall(self):
+        if not self.multicall_address:
+            return False
+        if self._multicall_deployed is None:
+            # An eth_call to an address without code returns nothing, so check once up front
+            self._multicall_deployed = len(self.w3.eth.get_code(self.multicall_address)) > 0
+            if not self._multicall_deployed:
+                logger.warning(f"No Multicall3 at {self.multicall_address}, using JSON-RPC batches")
+        return self._multicall_deployed
+
+    def _multicall(self, payloads, block):
+        calls = [(self.contract_address, True, payload) for payload in payloads]
+        data = bytes(AGGREGATE3_SELECTOR) + encode(['(address,bool,bytes)[]'], [calls])
+        response = self.w3.eth.call({'to': self.multicall_address, 'data': data}, block_identifier=block)
+        try:
+            return decode(['(bool,bytes)[]'], bytes(response))[0]
+        except DecodingError as e:
+            raise ContractReadError(f"Undecodable Multicall3 response at block {block}: {e}")
+
+    def _rpc_batch(self, payloads, block):
+        # Through the provider, so its transport (HTTP, IPC, WebSocket) and auth settings apply
+        responses = self.w3.provider.make_batch_request([
+            ('eth_call', [{'to': self.contract_address, 'data': '0x' + payload.hex()}, hex(block)])
+            for payload in payloads
+        ])
+        if not isinstance(responses, list):
+            # The node rejected the batch as a whole
+            raise ContractReadError(f"eth_call batch failed: {responses.get('error')}")
+
+        results = []
+        for i in range(len(payloads)):
+            response = responses[i] if i < len(responses) else {}
+            if 'result' in response:
+                results.append((True, Web3.to_bytes(hexstr=response['result'])))
+            else:
+                logger.debug(f"eth_call {i} failed: {response.get('error')}")
+                results.append((False, b''))
+        return results
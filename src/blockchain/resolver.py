@@ -0,0 +1,96 @@
+import logging
+from collections import defaultdict
+from sqlalchemy import select
+
+import config
+from blockchain.models import ChainPrediction
+
+logger = logging.getLogger(__name__)
+
+class ResolutionBatch:
+    def __init__(self, symbol, indexes):
+        self.symbol = symbol
+        self.indexes = indexes
+
+    @property
+    def contiguous(self):
+        return self.indexes[-1] - self.indexes[0] + 1 == len(self.indexes)
+
+    def __repr__(self):
+        return f"ResolutionBatch({self.symbol!r}, {len(self.indexes)} predictions)"
+
+class BatchResolver:
+    # Settles open predictions from the indexer tables in gas-bounded batches per symbol;
+    # consecutive indexes go out as a range call
+
+    def __init__(self, contract_manager, max_gas=None, base_gas=None, gas_per_prediction=None,
+                 gas_margin=None):
+        self.contract_manager = contract_manager
+        self.max_gas = max_gas or config.RESOLVE_BATCH_GAS_LIMIT
+        self.base_gas = base_gas or config.RESOLVE_BASE_GAS
+        self.gas_per_prediction = gas_per_prediction or config.RESOLVE_GAS_PER_PREDICTION
+        self.gas_margin = gas_margin or config.RESOLVE_GAS_MARGIN
+
+    @property
+    def batch_size(self):
+        # The per-prediction constant only sizes batches; the gas limit sent comes from the node
+        return max(1, (self.max_gas - self.base_gas) // self.gas_per_prediction)
+
+    def gas_limit(self, estimate):
+        return min(int(estimate * self.gas_margin), self.max_gas)
+
+    @staticmethod
+    def open_predictions(session, symbols=None):
+        query = select(ChainPrediction.symbol, ChainPrediction.prediction_index).where(
+            ChainPrediction.resolved.is_(False)
+        )
+        if symbols is not None:
+            query = query.where(ChainPrediction.symbol.in_(list(symbols)))
+
+        grouped = defaultdict(list)
+        for symbol, index in session.execute(query):
+            grouped[symbol].append(index)
+        return dict(grouped)
+
+    def plan(self, open_predictions):
+        batches = []
+        for symbol, indexes in open_predictions.items():
+            indexes = sorted(set(indexes))
+            for start in range(0, len(indexes), self.batch_size):
+                batches.append(ResolutionBatch(symbol, indexes[start:start + self.batch_size]))
+        return batches
+
+    def submit(self, batches, actual_prices, private_key):
+        """Send every batch back-to-back; returns (batch, future) pairs resolving to receipts."""
+        submitted = []
+        for batch in batches:
+            if batch.symbol not in actual_prices:
+                logger.warning(f"No actual price for {batch.symbol}; leaving {len(batch.indexes)} predictions open")
+                continue
+            try:
+                estimate = self.contract_manager.estimate_resolution_gas(
+                    batch.symbol, actual_prices[batch.symbol], batch.indexes, private_key, as_range=batch.contiguous
+                )
+            except Exception as e:
+                # The node expects it to revert, so sending it would only burn gas
+                logger.error(f"Gas estimate failed for {batch}; leaving it open: {str(e)}")
+                continue
+            future = self.contract_manager.submit_resolution(
+                batch.symbol,
+                actual_prices[batch.symbol],
+                batch.indexes,
+                private_key,
+                gas=self.gas_limit(estimate),
+                as_range=batch.contiguous
+            )
+            submitted.append((batch, future))
+        return submitted
+
+    def resolve(self, session, actual_prices, private_key):
+        open_predictions = self.open_predictions(session, symbols=actual_prices)
+        batches = self.plan(open_predictions)
+        logger.info(
+            f"Resolving {sum(len(b.indexes) for b in batches)} predictions "
+            f"for {len(open_predictions)} symbols in {len(batches)} transactions"
+        )
+        return self.submit(batches, actual_prices, private_key)
@@ -1,5 +1,6 @@
 from web3 import Web3
 import json
+from blockchain.reads import ContractReader
 
 class PredictionContract:
     def __init__(self, contract_address, abi_path):
@@ -13,6 +14,7 @@ class PredictionContract:
             address=self.contract_address,
             abi=contract_abi
         )
+        self.reader = ContractReader(self.w3, self.contract_address, contract_abi)
     
     def place_prediction(self, user_address, prediction_value, stake_amount):
         nonce = self.w3.eth.get_transaction_count(user_address)
@@ -30,4 +32,8 @@ class PredictionContract:
         return txn
     
     def get_prediction_result(self, prediction_id):
-        return self.contract.functions.getPredictionResult(prediction_id).call() 
\ No newline at end of file
+        return self.reader.call('getPredictionResult', prediction_id)
+    
+    def get_prediction_results(self, prediction_ids):
+        # Batched into one request; failed reads come back as ContractReadError
+        return self.reader.call_many([('getPredictionResult', (prediction_id,)) for prediction_id in prediction_ids]) 
\ No newline at end of file
@@ -0,0 +1,155 @@
+import time
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from eth_account import Account
+
+import config
+
+logger = logging.getLogger(__name__)
+
+def _raw_transaction(signed_txn):
+    # Renamed from rawTransaction to raw_transaction in newer eth-account releases
+    raw = getattr(signed_txn, 'raw_transaction', None)
+    return raw if raw is not None else signed_txn.rawTransaction
+
+def _is_nonce_error(error):
+    message = str(error).lower()
+    return 'nonce too low' in message or 'already known' in message or 'replacement transaction' in message
+
+class NonceManager:
+    # Local per-account nonces; nonces given back after a failed send are reused first so no gap forms
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self._next = {}  # address -> next fresh nonce
+        self._released = {}  # address -> heap of nonces to reuse
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def lock(self, address):
+        with self._lock:
+            return self._locks.setdefault(address, threading.RLock())
+
+    def reserve(self, address):
+        with self.lock(address):
+            released = self._released.get(address)
+            if released:
+                return heapq.heappop(released)
+            if address not in self._next:
+                self._next[address] = self.w3.eth.get_transaction_count(address, 'pending')
+            nonce = self._next[address]
+            self._next[address] = nonce + 1
+            return nonce
+
+    def release(self, address, nonce):
+        # The nonce was never used by a sent transaction
+        with self.lock(address):
+            if self._next.get(address) == nonce + 1:
+                self._next[address] = nonce
+            else:
+                heapq.heappush(self._released.setdefault(address, []), nonce)
+
+    def resync(self, address):
+        # Start over from the node, e.g. after a dropped transaction or a nonce error
+        with self.lock(address):
+            self._next.pop(address, None)
+            self._released.pop(address, None)
+
+class GasPriceCache:
+    def __init__(self, w3, ttl=None):
+        self.w3 = w3
+        self.ttl = config.GAS_PRICE_TTL if ttl is None else ttl
+        self._price = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._price is None or time.monotonic() - self._fetched_at >= self.ttl:
+                self._price = self.w3.eth.gas_price
+                self._fetched_at = time.monotonic()
+            return self._price
+
+    def invalidate(self):
+        with self._lock:
+            self._price = None
+
+class TransactionPipeline:
+    # Sends transactions back-to-back; `submit` returns a future that resolves once the receipt is in
+
+    def __init__(self, w3, nonces=None, gas_prices=None, receipt_timeout=None, max_workers=None):
+        self.w3 = w3
+        self.nonces = nonces or NonceManager(w3)
+        self.gas_prices = gas_prices or GasPriceCache(w3)
+        self.receipt_timeout = receipt_timeout or config.TX_RECEIPT_TIMEOUT
+        self._receipts = ThreadPoolExecutor(
+            max_workers=max_workers or config.TX_RECEIPT_WORKERS,
+            thread_name_prefix='receipts'
+        )
+        self._accounts = {}
+
+    def submit(self, function_call, private_key, value=0, gas=None, callback=None):
+        account = self._account(private_key)
+        tx_hash = self._send(function_call, account, private_key, value, gas or config.GAS_LIMIT)
+
+        future = self._receipts.submit(self._wait_for_receipt, account.address, tx_hash)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def estimate_gas(self, function_call, private_key, value=0):
+        params = {'from': self._account(private_key).address}
+        if value:
+            params['value'] = value
+        return function_call.estimate_gas(params)
+
+    def shutdown(self, wait=True):
+        self._receipts.shutdown(wait=wait)
+
+    def _send(self, function_call, account, private_key, value, gas, retry=True):
+        address = account.address
+        # Holding the account lock keeps nonces and sends in the same order
+        with self.nonces.lock(address):
+            nonce = self.nonces.reserve(address)
+            try:
+                params = {
+                    'from': address,
+                    'gas': gas,
+                    'gasPrice': self.gas_prices.get(),
+                    'nonce': nonce,
+                }
+                if value:
+                    params['value'] = value
+                txn = function_call.build_transaction(params)
+                signed_txn = self.w3.eth.account.sign_transaction(txn, private_key)
+                return self.w3.eth.send_raw_transaction(_raw_transaction(signed_txn))
+            except Exception as e:
+                if retry and _is_nonce_error(e):
+                    # Another client used this account; take the node's view and try once more
+                    logger.warning(f"Nonce {nonce} rejected for {address}, resyncing: {str(e)}")
+                    self.nonces.resync(address)
+                    self.gas_prices.invalidate()
+                    return self._send(function_call, account, private_key, value, gas, retry=False)
+                self.nonces.release(address, nonce)
+                raise
+
+    def _wait_for_receipt(self, address, tx_hash):
+        try:
+            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout)
+        except Exception:
+            # The transaction may have been dropped, leaving a gap behind it
+            self.nonces.resync(address)
+            raise
+        return {
+            'status': 'success' if receipt.get('status', 1) == 1 else 'reverted',
+            'transaction_hash': receipt['transactionHash'].hex(),
+            'block_number': receipt['blockNumber']
+        }
+
+    def _account(self, private_key):
+        account = self._accounts.get(private_key)
+        if account is None:
+            account = self._accounts[private_key] = Account.from_key(private_key)
+        return account
@@ -8,14 +8,49 @@ OWNER_PRIVATE_KEY = os.getenv("OWNER_PRIVATE_KEY", "your-private-key")
 GAS_LIMIT = int(os.getenv("GAS_LIMIT", "2000000"))
 TRADING_ACCOUNT = os.getenv("TRADING_ACCOUNT", "0x0000000000000000000000000000000000000000")
 DEFAULT_STAKE_AMOUNT = float(os.getenv("DEFAULT_STAKE_AMOUNT", "0.1"))
+GAS_PRICE_TTL = float(os.getenv("GAS_PRICE_TTL", "15"))  # Seconds a fetched gas price is reused
+TX_RECEIPT_TIMEOUT = float(os.getenv("TX_RECEIPT_TIMEOUT", "120"))
+TX_RECEIPT_WORKERS = int(os.getenv("TX_RECEIPT_WORKERS", "8"))
+RESOLVE_BATCH_GAS_LIMIT = int(os.getenv("RESOLVE_BATCH_GAS_LIMIT", "8000000"))
+RESOLVE_BASE_GAS = int(os.getenv("RESOLVE_BASE_GAS", "60000"))
+RESOLVE_GAS_PER_PREDICTION = int(os.getenv("RESOLVE_GAS_PER_PREDICTION", "45000"))  # Worst case: a winning prediction
+RESOLVE_GAS_MARGIN = float(os.getenv("RESOLVE_GAS_MARGIN", "1.2"))  # Gas limit sent = node estimate x margin, capped by the batch limit
+MULTICALL_ADDRESS = os.getenv("MULTICALL_ADDRESS", "")  # Empty: JSON-RPC batches; Multicall3 is usually 0xcA11bde05977b3631167028862bE2a173976CA11
+BLOCK_REFRESH_INTERVAL = float(os.getenv("BLOCK_REFRESH_INTERVAL", "1"))  # Seconds between head checks for the read cache
+READ_BATCH_SIZE = int(os.getenv("READ_BATCH_SIZE", "200"))
+CONTRACT_PRICE_SCALE = int(os.getenv("CONTRACT_PRICE_SCALE", "1"))  # Contract prices are integers in 1/scale units
+
+# Event indexer configuration
+INDEXER_ENABLED = os.getenv("INDEXER_ENABLED", "false").lower() == "true"
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+INDEXER_REORG_DEPTH = int(os.getenv("INDEXER_REORG_DEPTH", "12"))
+INDEXER_CHUNK_SIZE = int(os.getenv("INDEXER_CHUNK_SIZE", "2000"))
+INDEXER_MAX_CHUNK_SIZE = int(os.getenv("INDEXER_MAX_CHUNK_SIZE", "50000"))
+INDEXER_TARGET_LOGS = int(os.getenv("INDEXER_TARGET_LOGS", "5000"))
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "5"))
 
 # Model configuration
 MODEL_SAVE_PATH = os.getenv("MODEL_SAVE_PATH", "models/saved_models/")
 PREDICTION_THRESHOLD = float(os.getenv("PREDICTION_THRESHOLD", "0.7"))
+MODEL_CACHE_MAX_MODELS = int(os.getenv("MODEL_CACHE_MAX_MODELS", "50"))
+MODEL_CACHE_MAX_BYTES = int(os.getenv("MODEL_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+MODEL_VERSION_CHECK_INTERVAL = float(os.getenv("MODEL_VERSION_CHECK_INTERVAL", "5"))  # Seconds between looks for newer artifacts
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", str(os.cpu_count() or 1)))
+TRAINING_JOB_HISTORY = int(os.getenv("TRAINING_JOB_HISTORY", "1000"))
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+TUNING_WORKERS = int(os.getenv("TUNING_WORKERS", str(os.cpu_count() or 1)))
 
 # API configuration
 API_HOST = os.getenv("API_HOST", "localhost")
 API_PORT = int(os.getenv("API_PORT", "8000"))
+MAX_BATCH_SYMBOLS = int(os.getenv("MAX_BATCH_SYMBOLS", "500"))
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "30"))
+CHART_DEFAULT_WIDTH = int(os.getenv("CHART_DEFAULT_WIDTH", "1200"))
+CHART_MAX_WIDTH = int(os.getenv("CHART_MAX_WIDTH", "4096"))
+CHART_CANDLE_PIXELS = int(os.getenv("CHART_CANDLE_PIXELS", "3"))  # Minimum candle width
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "256"))
+STREAM_REFRESH_INTERVAL = float(os.getenv("STREAM_REFRESH_INTERVAL", "15"))  # seconds
+STREAM_MAX_SYMBOLS = int(os.getenv("STREAM_MAX_SYMBOLS", "20"))  # per connection
 
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -23,12 +58,36 @@ LOG_FILE = os.getenv("LOG_FILE", "logs/prediction_market.log")
 
 # Data configuration
 CACHE_DURATION = int(os.getenv("CACHE_DURATION", "3600"))  # 1 hour in seconds
+MARKET_DATA_STALE_TTL = int(os.getenv("MARKET_DATA_STALE_TTL", "86400"))  # How long past CACHE_DURATION stale data may still be served
+MARKET_DATA_RETRY_INTERVAL = int(os.getenv("MARKET_DATA_RETRY_INTERVAL", "60"))  # Seconds between refresh attempts of a stale entry
+MARKET_DATA_CACHE_MAX_ENTRIES = int(os.getenv("MARKET_DATA_CACHE_MAX_ENTRIES", "1000"))
+MARKET_DATA_CACHE_MAX_BYTES = int(os.getenv("MARKET_DATA_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
 MAX_WORKERS = int(os.getenv("MAX_WORKERS", "5"))
+IO_WORKERS = int(os.getenv("IO_WORKERS", str(MAX_WORKERS * 4)))
+EXECUTOR_MAX_PENDING = int(os.getenv("EXECUTOR_MAX_PENDING", "100"))
+DATA_STORE_PATH = os.getenv("DATA_STORE_PATH", "data/market_store/")
+DATA_STORE_MAX_SEGMENTS = int(os.getenv("DATA_STORE_MAX_SEGMENTS", "32"))
+SHARED_FRAMES_ENABLED = os.getenv("SHARED_FRAMES_ENABLED", "true").lower() == "true"  # Share processed frames across workers
 
 # Authentication configuration
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "2"))
+AUTH_MAX_PENDING = int(os.getenv("AUTH_MAX_PENDING", "50"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
 
 # Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./prediction_market.db") 
\ No newline at end of file
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./prediction_market.db")
+# Pool settings apply to server databases only; SQLite ignores them
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Prediction history write-behind buffer
+PREDICTION_FLUSH_SIZE = int(os.getenv("PREDICTION_FLUSH_SIZE", "100"))
+PREDICTION_FLUSH_INTERVAL = float(os.getenv("PREDICTION_FLUSH_INTERVAL", "2"))  # seconds
+PREDICTION_BUFFER_MAX = int(os.getenv("PREDICTION_BUFFER_MAX", "10000")) 
\ No newline at end of file
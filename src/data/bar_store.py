@@ -0,0 +1,145 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts only get in-process locking
+    fcntl = None
+
+
+class BarStore:
+    # On-disk OHLCV store: one directory of append-only Parquet segments per symbol/interval,
+    # where later segments win so the newest bar can be revised by appending it again
+
+    META_FILE = '_meta.json'
+    LOCK_FILE = '_lock'
+
+    def __init__(self, root, max_segments=32):
+        self.root = root
+        self.max_segments = max_segments
+        self.logger = logging.getLogger(__name__)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def partition_path(self, symbol, interval):
+        safe_symbol = re.sub(r'[^A-Za-z0-9._=^-]', '_', symbol)
+        return os.path.join(self.root, interval, safe_symbol)
+
+    def read(self, symbol, interval):
+        path = self.partition_path(symbol, interval)
+        segments = self._segments(path)
+        if not segments:
+            return None
+
+        frames = []
+        for segment in segments:
+            try:
+                frames.append(pd.read_parquet(os.path.join(path, segment)))
+            except FileNotFoundError:
+                # Segment removed by a concurrent compaction; its rows live on in the compacted file
+                return self.read(symbol, interval)
+
+        data = pd.concat(frames) if len(frames) > 1 else frames[0]
+        data = data[~data.index.duplicated(keep='last')]
+        return data.sort_index()
+
+    def append(self, symbol, interval, bars, coverage_start=None):
+        if bars is None or bars.empty:
+            return
+
+        path = self.partition_path(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+
+        with self._partition_lock(path):
+            self._write_segment(path, bars.sort_index())
+
+            meta = self._read_meta(path)
+            meta['fetched_at'] = time.time()
+            if coverage_start is not None:
+                meta['coverage_start'] = self._min_coverage(meta.get('coverage_start'), coverage_start)
+            self._write_meta(path, meta)
+
+            if len(self._segments(path)) > self.max_segments:
+                self._compact(path)
+
+    def touch(self, symbol, interval):
+        path = self.partition_path(symbol, interval)
+        if not os.path.isdir(path):
+            return
+
+        with self._partition_lock(path):
+            meta = self._read_meta(path)
+            meta['fetched_at'] = time.time()
+            self._write_meta(path, meta)
+
+    def metadata(self, symbol, interval):
+        return self._read_meta(self.partition_path(symbol, interval))
+
+    def _segments(self, path):
+        if not os.path.isdir(path):
+            return []
+        # Segment names embed a nanosecond timestamp, so lexical order is write order
+        return sorted(name for name in os.listdir(path) if name.endswith('.parquet'))
+
+    def _write_segment(self, path, bars):
+        name = f"part-{time.time_ns():020d}-{os.getpid()}.parquet"
+        tmp_path = os.path.join(path, f".{name}.tmp")
+        bars.to_parquet(tmp_path)
+        os.replace(tmp_path, os.path.join(path, name))
+
+    def _compact(self, path):
+        segments = self._segments(path)
+        frames = [pd.read_parquet(os.path.join(path, segment)) for segment in segments]
+        data = pd.concat(frames)
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+
+        self._write_segment(path, data)
+        for segment in segments:
+            os.remove(os.path.join(path, segment))
+        self.logger.debug(f"Compacted {len(segments)} segments in {path}")
+
+    def _read_meta(self, path):
+        try:
+            with open(os.path.join(path, self.META_FILE)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_meta(self, path, meta):
+        tmp_path = os.path.join(path, f".{self.META_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(path, self.META_FILE))
+
+    @staticmethod
+    def _min_coverage(current, new):
+        new = pd.Timestamp(new).isoformat() if new != 'max' else 'max'
+        if current is None:
+            return new
+        if 'max' in (current, new):
+            return 'max'
+        return min(current, new, key=pd.Timestamp)
+
+    @contextmanager
+    def _partition_lock(self, path):
+        with self._locks_guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            # Serialise writers across worker processes sharing the same store
+            with open(os.path.join(path, self.LOCK_FILE), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,129 @@
+import time
+import threading
+from collections import OrderedDict
+
+import config
+from metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+
+class FrameCache:
+    # LRU cache of period views into shared frames; entries past `ttl` are served
+    # stale for up to `stale_ttl` while they are refreshed
+
+    def __init__(self, ttl=None, stale_ttl=None, max_entries=None, max_bytes=None,
+                 retry_interval=None, on_release=None):
+        self._ttl = ttl
+        self.stale_ttl = config.MARKET_DATA_STALE_TTL if stale_ttl is None else stale_ttl
+        self.max_entries = max_entries or config.MARKET_DATA_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or config.MARKET_DATA_CACHE_MAX_BYTES
+        self.retry_interval = config.MARKET_DATA_RETRY_INTERVAL if retry_interval is None else retry_interval
+        self._entries = OrderedDict()  # key -> {'frame', 'offset', 'timestamp', 'retry_at'}
+        self._frames = {}  # id(frame) -> [frame, bytes, entries pointing at it]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Called with each frame no entry points at any more, outside the lock
+        self.on_release = on_release
+
+    @property
+    def ttl(self):
+        # Follows CACHE_DURATION unless set explicitly
+        return config.CACHE_DURATION if self._ttl is None else self._ttl
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def get(self, key):
+        """Returns (view, refresh): the cached view or None, and whether the caller should refresh it."""
+        now = time.time()
+        view, refresh, released = None, False, []
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry['timestamp'] if entry is not None else None
+            if entry is None:
+                CACHE_REQUESTS.labels('market_data', 'miss').inc()
+            elif age >= self.ttl + self.stale_ttl:
+                released = self._remove(key)
+                CACHE_EVICTIONS.labels('market_data', 'expired').inc()
+                CACHE_REQUESTS.labels('market_data', 'miss').inc()
+            else:
+                self._entries.move_to_end(key)
+                view = entry['frame'].iloc[entry['offset']:]
+                if age < self.ttl:
+                    CACHE_REQUESTS.labels('market_data', 'hit').inc()
+                else:
+                    CACHE_REQUESTS.labels('market_data', 'stale').inc()
+                    refresh = now >= entry['retry_at']
+                    if refresh:
+                        entry['retry_at'] = now + self.retry_interval
+        self._release(released)
+        return view, refresh
+
+    def get_stale(self, key):
+        """The view for `key` at any age up to the stale limit, for when refreshing it failed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry['timestamp'] >= self.ttl + self.stale_ttl:
+                return None
+            # The failed refresh counts as an attempt
+            entry['retry_at'] = time.time() + self.retry_interval
+            CACHE_REQUESTS.labels('market_data', 'stale_error').inc()
+            return entry['frame'].iloc[entry['offset']:]
+
+    def put(self, key, frame, offset):
+        released = []
+        with self._lock:
+            if key in self._entries:
+                released.extend(self._remove(key))
+            self._entries[key] = {'frame': frame, 'offset': offset, 'timestamp': time.time(), 'retry_at': 0}
+
+            tracked = self._frames.get(id(frame))
+            if tracked is None:
+                size = int(frame.memory_usage(index=True).sum())
+                self._frames[id(frame)] = [frame, size, 1]
+                self._bytes += size
+            else:
+                tracked[2] += 1
+
+            # Evict least recently used entries, but always keep the one just added
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                released.extend(self._remove(next(iter(self._entries))))
+                CACHE_EVICTIONS.labels('market_data', 'capacity').inc()
+
+            # A frame freed by replacing the entry may be the one just stored again
+            released = [f for f in released if id(f) not in self._frames]
+        self._release(released)
+
+    def frames(self):
+        with self._lock:
+            return [tracked[0] for tracked in self._frames.values()]
+
+    def clear(self):
+        # Only the views go; owners of the frames are not told
+        with self._lock:
+            self._entries.clear()
+            self._frames.clear()
+            self._bytes = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        frame = self._entries.pop(key)['frame']
+        tracked = self._frames[id(frame)]
+        tracked[2] -= 1
+        if tracked[2] > 0:
+            return []
+        del self._frames[id(frame)]
+        self._bytes -= tracked[1]
+        return [frame]
+
+    def _release(self, frames):
+        if self.on_release is not None:
+            for frame in frames:
+                self.on_release(frame)
@@ -0,0 +1,327 @@
+import json
+import math
+from collections import deque
+
+INDICATOR_COLUMNS = [
+    'SMA_20', 'SMA_50', 'RSI', 'Volatility', 'Volume_MA', 'Price_Momentum',
+    'MACD', 'Signal_Line', 'BB_middle', 'BB_upper', 'BB_lower', 'Momentum'
+]
+
+# Quoted back to users, so kept at full precision when frames are compacted
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# Model inputs, in the order PredictionMarket feeds them to the model
+FEATURE_COLUMNS = [
+    'Open', 'High', 'Low', 'Close', 'Volume',
+    'SMA_20', 'SMA_50', 'RSI', 'MACD', 'Signal_Line',
+    'BB_middle', 'BB_upper', 'BB_lower', 'Momentum',
+    'Volatility', 'Volume_MA', 'Price_Momentum'
+]
+
+def calculate_rsi(prices, period=14):
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+def calculate_macd(prices):
+    exp1 = prices.ewm(span=12, adjust=False).mean()
+    exp2 = prices.ewm(span=26, adjust=False).mean()
+    macd = exp1 - exp2
+    signal_line = macd.ewm(span=9, adjust=False).mean()
+    return macd, signal_line
+
+def calculate_bollinger_bands(prices, window=20):
+    middle = prices.rolling(window=window).mean()
+    std = prices.rolling(window=window).std()
+    return middle, middle + 2 * std, middle - 2 * std
+
+def compute_indicators(data):
+    # Full-frame (vectorised) computation; IndicatorState reproduces it bar by bar
+    close = data['Close']
+    data['SMA_20'] = close.rolling(window=20).mean()
+    data['SMA_50'] = close.rolling(window=50).mean()
+    data['RSI'] = calculate_rsi(close)
+    data['Volatility'] = close.rolling(window=20).std()
+    data['Volume_MA'] = data['Volume'].rolling(window=20).mean()
+    data['Price_Momentum'] = close.pct_change(periods=5)
+    data['MACD'], data['Signal_Line'] = calculate_macd(close)
+    data['BB_middle'], data['BB_upper'], data['BB_lower'] = calculate_bollinger_bands(close)
+    data['Momentum'] = close - close.shift(4)
+    return data
+
+
+class RollingWindow:
+    """Fixed-size window with O(1) mean/std updates (Welford add/remove)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.nonzero = 0
+        self._undo = None
+
+    def push(self, value):
+        removed = self.values.popleft() if len(self.values) == self.size else None
+        self._undo = (removed, self.mean, self.m2, self.nonzero)
+
+        if removed is not None:
+            self._remove(removed)
+        self._add(value)
+        self.values.append(value)
+
+    def undo(self):
+        removed, self.mean, self.m2, self.nonzero = self._undo
+        self.values.pop()
+        if removed is not None:
+            self.values.appendleft(removed)
+        self._undo = None
+
+    def _add(self, value):
+        n = len(self.values) + 1
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+        self.nonzero += int(value != 0)
+
+    def _remove(self, value):
+        n = len(self.values)
+        self.nonzero -= int(value != 0)
+        if n == 0 or self.nonzero == 0:
+            # Avoid carrying rounding residue into all-zero windows (e.g. RSI gains)
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / n
+        self.m2 -= delta * (value - self.mean)
+
+    @property
+    def full(self):
+        return len(self.values) == self.size
+
+    def average(self):
+        return self.mean if self.full else math.nan
+
+    def std(self):
+        if not self.full or self.size < 2:
+            return math.nan
+        return math.sqrt(max(self.m2, 0.0) / (self.size - 1))
+
+    def lag(self, periods):
+        # Value `periods` bars before the newest one
+        return self.values[-periods - 1] if len(self.values) > periods else math.nan
+
+    def to_dict(self):
+        return {
+            'size': self.size,
+            'values': list(self.values),
+            'mean': self.mean,
+            'm2': self.m2,
+            'nonzero': self.nonzero,
+            'undo': self._undo
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        window = cls(state['size'])
+        window.values = deque(state['values'])
+        window.mean = state['mean']
+        window.m2 = state['m2']
+        window.nonzero = state['nonzero']
+        window._undo = tuple(state['undo']) if state['undo'] is not None else None
+        return window
+
+
+class IndicatorState:
+    """Streaming state for one symbol; each update costs O(1) regardless of history length."""
+
+    EMA_ALPHAS = {'ema12': 2 / 13, 'ema26': 2 / 27, 'signal': 2 / 10}
+
+    def __init__(self):
+        self.close_20 = RollingWindow(20)
+        self.close_50 = RollingWindow(50)
+        self.volume_20 = RollingWindow(20)
+        self.gains = RollingWindow(14)
+        self.losses = RollingWindow(14)
+        self.ema12 = None
+        self.ema26 = None
+        self.signal = None
+        self.count = 0
+        self._undo = None
+
+    def _windows(self):
+        return (self.close_20, self.close_50, self.volume_20, self.gains, self.losses)
+
+    def update(self, close, volume):
+        close = float(close)
+        volume = float(volume)
+        self._undo = (self.ema12, self.ema26, self.signal, self.count)
+
+        # First delta is NaN in pandas and counted as a zero gain/loss
+        prev_close = self.close_50.values[-1] if self.count else close
+        delta = close - prev_close
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+
+        self.close_20.push(close)
+        self.close_50.push(close)
+        self.volume_20.push(volume)
+
+        if self.count == 0:
+            self.ema12 = self.ema26 = close
+            self.signal = 0.0
+        else:
+            self.ema12 += self.EMA_ALPHAS['ema12'] * (close - self.ema12)
+            self.ema26 += self.EMA_ALPHAS['ema26'] * (close - self.ema26)
+            self.signal += self.EMA_ALPHAS['signal'] * ((self.ema12 - self.ema26) - self.signal)
+        self.count += 1
+
+        return self.values()
+
+    def revise(self, close, volume):
+        # Replace the most recent bar, e.g. a candle that was still forming
+        if self._undo is None:
+            raise ValueError("No bar to revise")
+        self.undo()
+        return self.update(close, volume)
+
+    def undo(self):
+        self.ema12, self.ema26, self.signal, self.count = self._undo
+        for window in self._windows():
+            window.undo()
+        self._undo = None
+
+    def values(self):
+        close = self.close_50.values[-1]
+        sma_20 = self.close_20.average()
+        std_20 = self.close_20.std()
+        macd = self.ema12 - self.ema26
+
+        gain = self.gains.average()
+        loss = self.losses.average()
+        if math.isnan(gain) or (gain == 0 and loss == 0):
+            rsi = math.nan
+        elif loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + gain / loss))
+
+        lag_5 = self.close_50.lag(5)
+        if math.isnan(lag_5):
+            price_momentum = math.nan
+        elif lag_5 == 0:
+            price_momentum = math.inf if close else math.nan
+        else:
+            price_momentum = close / lag_5 - 1
+
+        return {
+            'SMA_20': sma_20,
+            'SMA_50': self.close_50.average(),
+            'RSI': rsi,
+            'Volatility': std_20,
+            'Volume_MA': self.volume_20.average(),
+            'Price_Momentum': price_momentum,
+            'MACD': macd,
+            'Signal_Line': self.signal,
+            'BB_middle': sma_20,
+            'BB_upper': sma_20 + 2 * std_20,
+            'BB_lower': sma_20 - 2 * std_20,
+            'Momentum': close - self.close_50.lag(4)
+        }
+
+    @classmethod
+    def from_history(cls, data):
+        # Warm start from a frame: EWMs in one vectorised pass, windows from the tail
+        state = cls()
+        if data.empty:
+            return state
+
+        close = data['Close'].astype(float)
+        volume = data['Volume'].astype(float)
+        head = close.iloc[:-1]
+        if not head.empty:
+            ema12 = head.ewm(span=12, adjust=False).mean()
+            ema26 = head.ewm(span=26, adjust=False).mean()
+            state.ema12 = float(ema12.iloc[-1])
+            state.ema26 = float(ema26.iloc[-1])
+            state.signal = float((ema12 - ema26).ewm(span=9, adjust=False).mean().iloc[-1])
+            state.count = len(head)
+
+            delta = head.diff().fillna(0).to_numpy()
+            tail = slice(max(len(head) - 50, 0), len(head))
+            for value in delta[-14:]:
+                state.gains.push(value if value > 0 else 0.0)
+                state.losses.push(-value if value < 0 else 0.0)
+            for value in head.to_numpy()[tail][-20:]:
+                state.close_20.push(float(value))
+            for value in head.to_numpy()[tail]:
+                state.close_50.push(float(value))
+            for value in volume.iloc[:-1].to_numpy()[-20:]:
+                state.volume_20.push(float(value))
+
+        # Replay the newest bar through update() so it can later be revised
+        state.update(close.iloc[-1], volume.iloc[-1])
+        return state
+
+    def to_dict(self):
+        return {
+            'windows': [window.to_dict() for window in self._windows()],
+            'ema12': self.ema12,
+            'ema26': self.ema26,
+            'signal': self.signal,
+            'count': self.count,
+            'undo': self._undo
+        }
+
+    @classmethod
+    def from_dict(cls, checkpoint):
+        state = cls()
+        (state.close_20, state.close_50, state.volume_20,
+         state.gains, state.losses) = [RollingWindow.from_dict(w) for w in checkpoint['windows']]
+        state.ema12 = checkpoint['ema12']
+        state.ema26 = checkpoint['ema26']
+        state.signal = checkpoint['signal']
+        state.count = checkpoint['count']
+        state._undo = tuple(checkpoint['undo']) if checkpoint['undo'] is not None else None
+        return state
+
+
+class IndicatorEngine:
+    """Per-key IndicatorState registry that can be checkpointed to and restored from JSON."""
+
+    def __init__(self):
+        self.states = {}
+
+    def prime(self, key, data):
+        self.states[key] = IndicatorState.from_history(data)
+
+    def update(self, key, close, volume):
+        state = self.states.setdefault(key, IndicatorState())
+        return state.update(close, volume)
+
+    def revise(self, key, close, volume):
+        return self.states[key].revise(close, volume)
+
+    def __contains__(self, key):
+        return key in self.states
+
+    def discard(self, key):
+        self.states.pop(key, None)
+
+    def checkpoint(self, path=None):
+        snapshot = {key: state.to_dict() for key, state in self.states.items()}
+        if path is not None:
+            with open(path, 'w') as f:
+                json.dump(snapshot, f)
+        return snapshot
+
+    def restore(self, checkpoint):
+        if isinstance(checkpoint, str):
+            with open(checkpoint) as f:
+                checkpoint = json.load(f)
+        self.states = {key: IndicatorState.from_dict(state) for key, state in checkpoint.items()}
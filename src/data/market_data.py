@@ -1,84 +1,479 @@
+import os
+import re
+import time
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+import asyncio
 import requests
+import config
+from executors import io_executor, ExecutorSaturated
+from metrics import MARKET_DATA_DOWNLOAD_SECONDS, MARKET_DATA_CACHE_BYTES
+from data.bar_store import BarStore
+from data.frame_cache import FrameCache
+from data.shared_frames import SharedFrameCache
+from data.indicators import PRICE_COLUMNS, IndicatorEngine, compute_indicators, calculate_rsi
+from data.panel import MarketPanel, compute_panel_indicators
+
+PERIOD_PATTERN = re.compile(r'^(\d+)(d|wk|mo|y)$')
 
 class MarketDataFetcher:
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, store=None, shared=None, cache=None, refresh_executor=io_executor):
+        self.cache = cache if cache is not None else FrameCache()
+        # Frames dropped by the cache are dropped here too, so memory stays within its budget
+        self.cache.on_release = self._release_frame
+        self.refresh_executor = refresh_executor
+        self._loading = {}  # cache key -> Future of the load in progress
+        self._loading_lock = threading.Lock()
+        self.store = store if store is not None else BarStore(
+            config.DATA_STORE_PATH,
+            max_segments=config.DATA_STORE_MAX_SEGMENTS
+        )
+        # Processed frames live next to the bars, so every worker using this store shares them;
+        # shared=False keeps them private to this process
+        if shared is None and config.SHARED_FRAMES_ENABLED and isinstance(self.store, BarStore):
+            shared = SharedFrameCache(os.path.join(self.store.root, '_frames'))
+        self.shared = shared or None
+        self.indicators = IndicatorEngine()
+        # One compact frame per symbol and interval; cached periods are positional views of it
+        self._frames = {}
+        self._indicator_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
+        MARKET_DATA_CACHE_BYTES.set_function(lambda: self.memory_usage()['bytes'])
         
     def fetch_historical_data(self, symbol, period='1y', interval='1d'):
         try:
             # Check cache first
             cache_key = f"{symbol}_{period}_{interval}"
-            if cache_key in self.cache:
-                if datetime.now() - self.cache[cache_key]['timestamp'] < timedelta(hours=1):
-                    return self.cache[cache_key]['data']
-            
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period, interval=interval)
-            
-            # Process and clean the data
-            data = self._process_data(data)
-            
-            # Add to cache
-            self.cache[cache_key] = {
-                'data': data,
-                'timestamp': datetime.now()
-            }
+            cached = self._get_cached(cache_key)
+            if cached is not None:
+                return cached
             
-            return data
+            return self._fetch_uncached(symbol, period, interval)
             
         except Exception as e:
             self.logger.error(f"Error fetching data for {symbol}: {str(e)}")
             raise
     
-    def _process_data(self, data):
-        # Remove missing values
-        data = data.dropna()
+    def _fetch_uncached(self, symbol, period, interval):
+        cache_key = f"{symbol}_{period}_{interval}"
+        with self._loading_lock:
+            loading = self._loading.get(cache_key)
+            owner = loading is None
+            if owner:
+                loading = self._loading[cache_key] = Future()
+                # A running future cannot be cancelled by one of its waiters
+                loading.set_running_or_notify_cancel()
+        
+        if not owner:
+            # Another thread is loading the same key; share its result instead of loading twice
+            return loading.result()
+        
+        try:
+            result = self._load(symbol, period, interval)
+            loading.set_result(result)
+            return result
+        except Exception as e:
+            loading.set_exception(e)
+            raise
+        finally:
+            with self._loading_lock:
+                del self._loading[cache_key]
+    
+    def _in_flight(self, cache_key):
+        return self._loading.get(cache_key)
+    
+    def _load(self, symbol, period, interval):
+        cache_key = f"{symbol}_{period}_{interval}"
+        try:
+            frame = self._load_frame(symbol, period, interval)
+        except Exception as e:
+            stale = self.cache.get_stale(cache_key)
+            if stale is None:
+                raise
+            self.logger.warning(f"Refreshing {symbol} failed, serving cached data: {str(e)}")
+            return stale
+        
+        # Add to cache
+        return self._set_cached(cache_key, frame, self._period_offset(frame, period))
+    
+    def _revalidate(self, symbol, period, interval):
+        try:
+            self._fetch_uncached(symbol, period, interval)
+        except Exception as e:
+            self.logger.warning(f"Background refresh failed for {symbol}: {str(e)}")
+    
+    def _refresh_frame(self, symbol, period, interval):
+        # Only bars newer than the last stored one are downloaded
+        bars = self._load_bars(symbol, period, interval)
+        
+        # Indicators are kept for the full stored history and extended bar by bar
+        return self._update_indicators(symbol, interval, bars)
+    
+    def _load_frame(self, symbol, period, interval):
+        if self.shared is None:
+            return self._refresh_frame(symbol, period, interval)
         
-        # Calculate technical indicators
-        data['SMA_20'] = data['Close'].rolling(window=20).mean()
-        data['SMA_50'] = data['Close'].rolling(window=50).mean()
-        data['RSI'] = self._calculate_rsi(data['Close'])
+        frame, meta = self.shared.read(symbol, interval)
+        covered = frame is not None and self._covers(meta, period, frame.index)
+        if covered and self._shared_fresh(meta):
+            return self._adopt(symbol, interval, frame)
         
-        # Add volatility indicator
-        data['Volatility'] = data['Close'].rolling(window=20).std()
+        # Single flight across workers: one refreshes the frame while the others
+        # keep serving the stale version, or wait when there is nothing to serve
+        with self.shared.refresh_lock(symbol, interval, blocking=not covered) as owner:
+            if not owner:
+                return self._adopt(symbol, interval, frame)
+            
+            # Another worker may have published while we waited for the lock
+            frame, meta = self.shared.read(symbol, interval)
+            if frame is not None and self._covers(meta, period, frame.index) and self._shared_fresh(meta):
+                return self._adopt(symbol, interval, frame)
+            
+            return self._publish(symbol, interval, self._refresh_frame(symbol, period, interval))
+    
+    @staticmethod
+    def _shared_fresh(meta):
+        return time.time() - meta.get('written_at', 0) < config.CACHE_DURATION
+    
+    def _shared_frame(self, symbol, period, interval):
+        # A fresh frame another worker already computed, or None
+        if self.shared is None:
+            return None
+        frame, meta = self.shared.read(symbol, interval)
+        if frame is None or not self._covers(meta, period, frame.index) or not self._shared_fresh(meta):
+            return None
+        return self._adopt(symbol, interval, frame)
+    
+    def _adopt(self, symbol, interval, frame):
+        key = f"{symbol}_{interval}"
+        with self._indicator_lock:
+            if self._frames.get(key) is not frame:
+                self._frames[key] = frame
+                # Computed by another worker, so our incremental state may be behind it
+                self.indicators.discard(key)
+        return frame
+    
+    def _publish(self, symbol, interval, frame):
+        key = f"{symbol}_{interval}"
+        meta = self.store.metadata(symbol, interval)
+        try:
+            version = self.shared.write(symbol, interval, frame, coverage_start=meta.get('coverage_start'))
+            shared, shared_meta = self.shared.read(symbol, interval)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not share frame for {symbol}: {str(e)}")
+            return frame
+        if shared is None or shared_meta['version'] != version:
+            # Superseded by another worker's frame, which may not cover our period
+            return frame
         
-        # Add trading volume moving average
-        data['Volume_MA'] = data['Volume'].rolling(window=20).mean()
+        # Keep the mapped copy instead of our private one; both hold the same values,
+        # so the incremental indicator state stays valid
+        with self._indicator_lock:
+            if self._frames.get(key) is frame:
+                self._frames[key] = shared
+        return shared
+    
+    def _get_cached(self, cache_key):
+        cached, refresh = self.cache.get(cache_key)
+        if refresh:
+            # Expired entries are served while one background load replaces them
+            symbol, period, interval = cache_key.rsplit('_', 2)
+            try:
+                self.refresh_executor.submit(self._revalidate, symbol, period, interval)
+            except (ExecutorSaturated, RuntimeError) as e:
+                self.logger.debug(f"Background refresh of {symbol} not scheduled: {str(e)}")
+        return cached
+    
+    def _set_cached(self, cache_key, frame, offset):
+        # Overlapping periods of a symbol share its frame instead of holding copies
+        self.cache.put(cache_key, frame, offset)
+        return frame.iloc[offset:]
+    
+    def _release_frame(self, frame):
+        with self._indicator_lock:
+            for key, current in list(self._frames.items()):
+                if current is frame:
+                    del self._frames[key]
+                    self.indicators.discard(key)
+                    if self.shared is not None:
+                        self.shared.forget(*key.rsplit('_', 1))
+    
+    def memory_usage(self):
+        # Frames still referenced by cache entries count too, but each frame only once
+        frames = {id(frame): frame for frame in list(self._frames.values())}
+        frames.update({id(frame): frame for frame in self.cache.frames()})
+        return {
+            'frames': len(frames),
+            'cache_entries': len(self.cache),
+            'bars': sum(len(frame) for frame in frames.values()),
+            'bytes': sum(int(frame.memory_usage(index=True).sum()) for frame in frames.values())
+        }
+    
+    def _load_bars(self, symbol, period, interval):
+        stored = self.store.read(symbol, interval)
+        meta = self.store.metadata(symbol, interval)
+        
+        if stored is None or stored.empty or not self._covers(meta, period, stored.index):
+            bars = self._download(symbol, period=period, interval=interval)
+            coverage_start = self._period_start(period, self._now(bars.index))
+            self.store.append(symbol, interval, bars, coverage_start=coverage_start or 'max')
+            return self._merge_bars(stored, bars)
+        
+        if time.time() - meta.get('fetched_at', 0) < config.CACHE_DURATION:
+            return stored
+        
+        # The last stored bar may still have been forming, so it is fetched again
+        last_timestamp = stored.index[-1]
+        try:
+            new_bars = self._download(symbol, start=last_timestamp, interval=interval)
+        except Exception as e:
+            self.logger.warning(f"Incremental fetch failed for {symbol}, serving stored bars: {str(e)}")
+            return stored
         
-        # Add price momentum
-        data['Price_Momentum'] = data['Close'].pct_change(periods=5)
+        new_bars = new_bars[new_bars.index >= last_timestamp]
+        if new_bars.empty:
+            self.store.touch(symbol, interval)
+            return stored
+        
+        self.store.append(symbol, interval, new_bars)
+        return self._merge_bars(stored, new_bars)
+    
+    def _update_indicators(self, symbol, interval, bars):
+        key = f"{symbol}_{interval}"
+        bars = bars.dropna()
+        
+        with self._indicator_lock:
+            frame = self._frames.get(key)
+            if frame is None or not self._extends(frame, bars):
+                frame = self._compact(self._process_data(bars))
+                self.indicators.prime(key, bars)
+                self._frames[key] = frame
+                return frame
+            
+            last_bar = frame.iloc[-1][bars.columns].to_numpy(np.float32)
+            if len(bars) > len(frame) or not np.array_equal(bars.iloc[-1].to_numpy(np.float32), last_bar):
+                if key not in self.indicators:
+                    # Frames computed on a panel are primed lazily, on their first new bar
+                    self.indicators.prime(key, frame)
+                frame = self._append_bars(key, frame, bars.iloc[len(frame) - 1:])
+            
+            self._frames[key] = frame
+            return frame
+    
+    @staticmethod
+    def _extends(frame, bars):
+        # Incremental updates only apply when the stored history up to our last bar is unchanged
+        if frame.empty or len(bars) < len(frame):
+            return False
+        return bars.index[len(frame) - 1] == frame.index[-1] and bars.index[0] == frame.index[0]
+    
+    def _append_bars(self, key, frame, new_bars):
+        rows = []
+        for i, (timestamp, bar) in enumerate(new_bars.iterrows()):
+            # The first bar is our last one again and may have been revised upstream
+            update = self.indicators.revise if i == 0 else self.indicators.update
+            rows.append({**bar.to_dict(), **update(key, bar['Close'], bar['Volume'])})
+        
+        new_rows = pd.DataFrame(rows, index=new_bars.index)[frame.columns].fillna(0)
+        new_rows = new_rows.astype(frame.dtypes.to_dict())
+        return pd.concat([frame.iloc[:-1], new_rows])
+    
+    def _download(self, symbol, **kwargs):
+        with MARKET_DATA_DOWNLOAD_SECONDS.time():
+            ticker = yf.Ticker(symbol)
+            return ticker.history(**kwargs)
+    
+    @staticmethod
+    def _merge_bars(stored, bars):
+        if stored is None or stored.empty:
+            return bars.sort_index()
+        data = pd.concat([stored, bars])
+        return data[~data.index.duplicated(keep='last')].sort_index()
+    
+    def _covers(self, meta, period, index):
+        coverage_start = meta.get('coverage_start')
+        if coverage_start is None:
+            return False
+        if coverage_start == 'max':
+            return True
+        if period == 'max':
+            return False
+        return pd.Timestamp(coverage_start) <= self._period_start(period, self._now(index))
+    
+    def _period_offset(self, bars, period):
+        if bars.empty or period == 'max':
+            return 0
+        # Anchor on the newest bar so closed sessions still return their last bars
+        start = self._period_start(period, bars.index[-1])
+        return int(bars.index.searchsorted(start, side='left'))
+    
+    @staticmethod
+    def _compact(frame):
+        # Prices stay float64 so quotes are served as downloaded; volume and indicators only
+        # feed the trees, which read features as float32 anyway. Integer volumes included,
+        # so the frame is one float64 and one float32 block that workers can share
+        numeric = np.array([np.issubdtype(dtype, np.number) for dtype in frame.dtypes], dtype=bool)
+        prices = np.asarray(frame.columns.isin(PRICE_COLUMNS))
+        if not numeric.all():
+            return frame.astype({
+                column: np.float64 if is_price else np.float32
+                for column, is_price in zip(frame.columns[numeric], prices[numeric])
+            })
+        
+        # Converting column by column is an order of magnitude slower than in two blocks
+        values = frame.to_numpy(np.float64)
+        compact = pd.concat([
+            pd.DataFrame(values[:, prices], index=frame.index, columns=frame.columns[prices], copy=False),
+            pd.DataFrame(values[:, ~prices].astype(np.float32), index=frame.index,
+                         columns=frame.columns[~prices], copy=False)
+        ], axis=1)
+        return compact if compact.columns.equals(frame.columns) else compact[frame.columns]
+    
+    @staticmethod
+    def _now(index):
+        return pd.Timestamp.now(tz=getattr(index, 'tz', None))
+    
+    @staticmethod
+    def _period_start(period, end):
+        if period == 'max':
+            return None
+        if period == 'ytd':
+            return end.normalize().replace(month=1, day=1)
+        
+        match = PERIOD_PATTERN.match(period)
+        if not match:
+            raise ValueError(f"Unsupported period: {period}")
+        
+        count, unit = int(match.group(1)), match.group(2)
+        offsets = {
+            'd': pd.DateOffset(days=count),
+            'wk': pd.DateOffset(weeks=count),
+            'mo': pd.DateOffset(months=count),
+            'y': pd.DateOffset(years=count)
+        }
+        return end - offsets[unit]
+    
+    def _process_data(self, data):
+        # Remove missing values
+        data = data.dropna()
+        
+        # Calculate technical indicators (SMA, RSI, volatility, MACD, Bollinger Bands, momentum)
+        data = compute_indicators(data)
         
         return data.fillna(0)
     
     def _calculate_rsi(self, prices, period=14):
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        return calculate_rsi(prices, period)
     
     def fetch_multiple_symbols(self, symbols, period='1y', interval='1d'):
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            results = {}
+        return self._fetch_frames(symbols, period, interval)
+    
+    def _fetch_frames(self, symbols, period, interval):
+        results = {}
+        missing = []
+        for symbol in symbols:
+            cached = self._get_cached(f"{symbol}_{period}_{interval}")
+            if cached is not None:
+                results[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        frames = {}
+        for symbol in missing:
+            frame = self._shared_frame(symbol, period, interval)
+            if frame is not None:
+                frames[symbol] = frame
+        missing = [symbol for symbol in missing if symbol not in frames]
+        
+        bars = {}
+        with ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
             future_to_symbol = {
-                executor.submit(self.fetch_historical_data, symbol, period, interval): symbol 
-                for symbol in symbols
+                executor.submit(self._load_bars, symbol, period, interval): symbol 
+                for symbol in missing
             }
             
             for future in future_to_symbol:
                 symbol = future_to_symbol[future]
                 try:
-                    results[symbol] = future.result()
+                    bars[symbol] = future.result().dropna()
                 except Exception as e:
-                    self.logger.error(f"Error fetching {symbol}: {str(e)}")
-                    
-            return results 
\ No newline at end of file
+                    stale = self.cache.get_stale(f"{symbol}_{period}_{interval}")
+                    if stale is not None:
+                        self.logger.warning(f"Refreshing {symbol} failed, serving cached data: {str(e)}")
+                        results[symbol] = stale
+                    else:
+                        self.logger.error(f"Error fetching {symbol}: {str(e)}")
+        
+        # Symbols with a warm frame are extended bar by bar, the rest are
+        # computed together in one vectorised pass over a panel
+        cold = {}
+        for symbol, symbol_bars in bars.items():
+            frame = self._frames.get(f"{symbol}_{interval}")
+            if frame is not None and self._extends(frame, symbol_bars):
+                frames[symbol] = self._update_indicators(symbol, interval, symbol_bars)
+            else:
+                cold[symbol] = symbol_bars
+        
+        if cold:
+            panel = compute_panel_indicators(MarketPanel.from_frames(cold))
+            with self._indicator_lock:
+                for symbol, frame in panel.to_frames().items():
+                    key = f"{symbol}_{interval}"
+                    frame = self._compact(frame)
+                    self._frames[key] = frame
+                    self.indicators.discard(key)
+                    frames[symbol] = frame
+        
+        if self.shared is not None:
+            for symbol in bars:
+                if symbol not in frames:
+                    continue
+                # A worker refreshing the symbol will publish it; ours stays private
+                with self.shared.refresh_lock(symbol, interval) as owner:
+                    if owner:
+                        frames[symbol] = self._publish(symbol, interval, frames[symbol])
+        
+        for symbol, frame in frames.items():
+            results[symbol] = self._set_cached(
+                f"{symbol}_{period}_{interval}", frame, self._period_offset(frame, period)
+            )
+        
+        return {symbol: results[symbol] for symbol in symbols if symbol in results}
+
+
+class AsyncMarketDataFetcher:
+    """Awaitable front for MarketDataFetcher; downloads run on the I/O executor."""
+    
+    def __init__(self, fetcher, executor=io_executor):
+        self.fetcher = fetcher
+        self.executor = executor
+        
+    async def fetch_historical_data(self, symbol, period='1y', interval='1d', timeout=None):
+        # Cache hits, stale ones included, are answered without a thread hop
+        cache_key = f"{symbol}_{period}_{interval}"
+        cached = self.fetcher._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        try:
+            loading = self.fetcher._in_flight(cache_key)
+            if loading is not None:
+                # Wait for the load already running instead of taking an executor thread to do so
+                return await asyncio.wait_for(asyncio.wrap_future(loading), timeout)
+            return await self.executor.run(
+                self.fetcher._fetch_uncached, symbol, period, interval, timeout=timeout
+            )
+        except Exception as e:
+            self.fetcher.logger.error(f"Error fetching data for {symbol}: {str(e)}")
+            raise
+    
+    async def fetch_multiple_symbols(self, symbols, period='1y', interval='1d', timeout=None):
+        results = await asyncio.gather(
+            *(self.fetch_historical_data(symbol, period, interval, timeout) for symbol in symbols),
+            return_exceptions=True
+        )
+        # Failed symbols map to their exception instead of failing the whole batch
+        return dict(zip(symbols, results))
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from data.indicators import INDICATOR_COLUMNS
+
+
+class MarketPanel:
+    # Symbols x time x fields in one float64 array, each symbol right-aligned and NaN-padded
+    # at the front so rolling windows match the per-symbol computation
+
+    def __init__(self, symbols, fields, values, indexes, columns=None, dtypes=None):
+        self.symbols = list(symbols)
+        self.fields = list(fields)
+        self.values = values
+        self.indexes = indexes
+        # Per-symbol column lists and dtypes, so frames round-trip unchanged
+        self.columns = columns if columns is not None else [list(self.fields) for _ in self.symbols]
+        self.dtypes = dtypes if dtypes is not None else [{} for _ in self.symbols]
+        self._field_pos = {field: i for i, field in enumerate(self.fields)}
+        self._symbol_pos = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_frames(cls, frames, fields=None):
+        symbols = list(frames)
+        if fields is None:
+            fields = []
+            for symbol in symbols:
+                fields += [c for c in frames[symbol].columns if c not in fields]
+
+        length = max((len(frames[symbol]) for symbol in symbols), default=0)
+        values = np.full((len(symbols), length, len(fields)), np.nan)
+        indexes, columns, dtypes = [], [], []
+        for i, symbol in enumerate(symbols):
+            frame = frames[symbol]
+            present = [field for field in fields if field in frame.columns]
+            positions = [fields.index(field) for field in present]
+            if len(frame):
+                values[i, length - len(frame):, positions] = frame[present].to_numpy(dtype=float).T
+            indexes.append(frame.index)
+            columns.append(present)
+            dtypes.append(frame[present].dtypes.to_dict())
+        return cls(symbols, fields, values, indexes, columns, dtypes)
+
+    @property
+    def lengths(self):
+        return np.array([len(index) for index in self.indexes])
+
+    def padding_mask(self):
+        # True where a row holds no bar for that symbol
+        steps = np.arange(self.values.shape[1])
+        return steps[None, :] < (self.values.shape[1] - self.lengths)[:, None]
+
+    def field(self, name):
+        return self.values[:, :, self._field_pos[name]]
+
+    def with_fields(self, new_fields):
+        names = [name for name in new_fields if name not in self._field_pos]
+        values = np.concatenate(
+            [self.values, np.full(self.values.shape[:2] + (len(names),), np.nan)], axis=2
+        )
+        columns = [cols + [name for name in new_fields if name not in cols] for cols in self.columns]
+        panel = MarketPanel(self.symbols, self.fields + names, values, self.indexes, columns, self.dtypes)
+        for name, array in new_fields.items():
+            panel.values[:, :, panel._field_pos[name]] = array
+        return panel
+
+    def select(self, fields):
+        positions = [self._field_pos[field] for field in fields]
+        return self.values[:, :, positions]
+
+    def latest(self, fields):
+        # Newest bar per symbol (the last time step, given right alignment)
+        return self.select(fields)[:, -1, :]
+
+    def frame(self, symbol):
+        i = self._symbol_pos[symbol]
+        length = len(self.indexes[i])
+        rows = self.values[i, self.values.shape[1] - length:, :]
+        frame = pd.DataFrame(rows, index=self.indexes[i], columns=self.fields)[self.columns[i]]
+        return frame.astype(self.dtypes[i])
+
+    def to_frames(self):
+        return {symbol: self.frame(symbol) for symbol in self.symbols}
+
+
+def _shift(values, periods):
+    shifted = np.full_like(values, np.nan)
+    shifted[:, periods:] = values[:, :-periods]
+    return shifted
+
+def _rolling(values, window, reducer, **kwargs):
+    result = np.full_like(values, np.nan)
+    if values.shape[1] >= window:
+        # NaN padding propagates, so windows overlapping it stay NaN as in pandas
+        result[:, window - 1:] = reducer(sliding_window_view(values, window, axis=1), axis=-1, **kwargs)
+    return result
+
+def _ewm(values, span, padding):
+    # adjust=False EWM along time for every symbol at once; the padding is filled
+    # with each symbol's first bar so the recursion starts exactly there
+    alpha = 2 / (span + 1)
+    first = values[np.arange(len(values)), padding.sum(axis=1).clip(max=values.shape[1] - 1)]
+    filled = np.where(padding, first[:, None], values)
+    smoothed, _ = lfilter([alpha], [1, alpha - 1], filled, axis=1, zi=((1 - alpha) * first)[:, None])
+    return smoothed
+
+def compute_panel_indicators(panel):
+    close = panel.field('Close')
+    volume = panel.field('Volume')
+    padding = panel.padding_mask()
+    if close.shape[1] == 0:
+        return panel.with_fields({name: close for name in INDICATOR_COLUMNS})
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = close - _shift(close, 1)
+        # pandas counts each symbol's first (NaN) delta as zero gain and loss
+        delta = np.where(np.isnan(delta) & ~padding, 0.0, delta)
+        gain = _rolling(np.where(delta > 0, delta, np.where(padding, np.nan, 0.0)), 14, np.mean)
+        loss = _rolling(np.where(delta < 0, -delta, np.where(padding, np.nan, 0.0)), 14, np.mean)
+        rsi = 100 - (100 / (1 + gain / loss))
+
+        sma_20 = _rolling(close, 20, np.mean)
+        std_20 = _rolling(close, 20, np.std, ddof=1)
+
+        ema12 = _ewm(close, 12, padding)
+        ema26 = _ewm(close, 26, padding)
+        macd = np.where(padding, np.nan, ema12 - ema26)
+        signal = np.where(padding, np.nan, _ewm(macd, 9, padding))
+
+        indicators = {
+            'SMA_20': sma_20,
+            'SMA_50': _rolling(close, 50, np.mean),
+            'RSI': rsi,
+            'Volatility': std_20,
+            'Volume_MA': _rolling(volume, 20, np.mean),
+            'Price_Momentum': close / _shift(close, 5) - 1,
+            'MACD': macd,
+            'Signal_Line': signal,
+            'BB_middle': sma_20,
+            'BB_upper': sma_20 + 2 * std_20,
+            'BB_lower': sma_20 - 2 * std_20,
+            'Momentum': close - _shift(close, 4)
+        }
+
+    # Same as the per-symbol fillna(0), leaving the padding untouched
+    indicators = {
+        name: np.where(np.isnan(values) & ~padding, 0.0, values)
+        for name, values in indicators.items()
+    }
+    return panel.with_fields(indicators)
@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import time
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts only get in-process locking
+    fcntl = None
+
+
+class SharedFrameCache:
+    # Processed frames written once as versioned .npy files and memory-mapped by
+    # every worker on the host, so they share pages instead of holding copies
+
+    CURRENT_FILE = '_current.json'
+    LOCK_FILE = '_refresh.lock'
+    WRITE_LOCK_FILE = '_write.lock'
+    DTYPES = {'float32', 'float64'}
+
+    def __init__(self, root):
+        self.root = root
+        self.logger = logging.getLogger(__name__)
+        self._loaded = {}  # path -> (version, frame)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def key_path(self, symbol, interval):
+        safe_symbol = re.sub(r'[^A-Za-z0-9._=^-]', '_', symbol)
+        return os.path.join(self.root, interval, safe_symbol)
+
+    def read(self, symbol, interval):
+        """Returns (frame, meta) for the current version, or (None, None)."""
+        path = self.key_path(symbol, interval)
+        meta = self._read_current(path)
+        if meta is None:
+            return None, None
+
+        loaded = self._loaded.get(path)
+        if loaded is not None and loaded[0] == meta['version']:
+            return loaded[1], meta
+
+        version_path = os.path.join(path, meta['version'])
+        try:
+            blocks = {
+                dtype: np.load(os.path.join(version_path, f"values-{dtype}.npy"), mmap_mode='r')
+                for dtype in meta['blocks']
+            }
+            index = np.load(os.path.join(version_path, 'index.npy'))
+        except FileNotFoundError:
+            # Superseded by a newer version between reading the pointer and the files
+            current = self._read_current(path)
+            if current is None or current['version'] == meta['version']:
+                return None, None
+            return self.read(symbol, interval)
+
+        index = pd.to_datetime(index, unit='ns', utc=meta['tz'] is not None)
+        if meta['tz'] is not None:
+            index = index.tz_convert(meta['tz'])
+        index = pd.DatetimeIndex(index.as_unit(meta['unit']), name=meta['index_name'])
+
+        # copy=False keeps each read-only mapping as one of the frame's blocks
+        frame = pd.concat([
+            pd.DataFrame(values, index=index, columns=meta['blocks'][dtype], copy=False)
+            for dtype, values in blocks.items()
+        ], axis=1)
+        if list(frame.columns) != meta['columns']:
+            frame = frame[meta['columns']]
+        self._loaded[path] = (meta['version'], frame)
+        return frame, meta
+
+    def forget(self, symbol, interval):
+        # Drops our mapping of the key; the files stay for other workers
+        self._loaded.pop(self.key_path(symbol, interval), None)
+
+    def write(self, symbol, interval, frame, **meta):
+        """Publishes `frame` and returns its version, or None if a newer one won; kwargs are metadata."""
+        dtypes = [str(dtype) for dtype in frame.dtypes]
+        if not set(dtypes) <= self.DTYPES:
+            raise ValueError("Only float32 and float64 columns can be shared")
+        blocks = {
+            dtype: [position for position, column_dtype in enumerate(dtypes) if column_dtype == dtype]
+            for dtype in sorted(set(dtypes))
+        }
+
+        path = self.key_path(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+
+        # Version names embed a nanosecond timestamp, so lexical order is write order
+        version = f"v{time.time_ns():020d}-{os.getpid()}"
+        tmp_path = os.path.join(path, f".{version}.tmp")
+        os.makedirs(tmp_path)
+        for dtype, positions in blocks.items():
+            values = frame.iloc[:, positions].to_numpy(dtype)
+            np.save(os.path.join(tmp_path, f"values-{dtype}.npy"), np.ascontiguousarray(values))
+        np.save(os.path.join(tmp_path, 'index.npy'), frame.index.as_unit('ns').asi8)
+        os.replace(tmp_path, os.path.join(path, version))
+
+        tz = getattr(frame.index, 'tz', None)
+        with self._file_lock(path, self.WRITE_LOCK_FILE, blocking=True):
+            # A newer version published while we wrote ours wins
+            current = self._read_current(path)
+            if current is not None and current['version'] > version:
+                shutil.rmtree(os.path.join(path, version), ignore_errors=True)
+                return None
+
+            self._write_current(path, {
+                **meta,
+                'version': version,
+                'columns': list(frame.columns),
+                'blocks': {dtype: list(frame.columns[positions]) for dtype, positions in blocks.items()},
+                'tz': str(tz) if tz is not None else None,
+                'unit': frame.index.unit,
+                'index_name': frame.index.name,
+                'written_at': time.time()
+            })
+
+            # Readers that already mapped an old version keep it alive until they drop it
+            for name in os.listdir(path):
+                if name.startswith('v') and name < version:
+                    shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        return version
+
+    @contextmanager
+    def refresh_lock(self, symbol, interval, blocking=False):
+        """Yields True when this caller owns the key's refresh, False if another worker does."""
+        path = self.key_path(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+        with self._locks_guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+
+        if not lock.acquire(blocking):
+            yield False
+            return
+        try:
+            with self._file_lock(path, self.LOCK_FILE, blocking) as owner:
+                yield owner
+        finally:
+            lock.release()
+
+    @staticmethod
+    @contextmanager
+    def _file_lock(path, name, blocking):
+        # Yields whether the lock was taken; without fcntl only the thread locks apply
+        if fcntl is None:
+            yield True
+            return
+        with open(os.path.join(path, name), 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_current(self, path):
+        try:
+            with open(os.path.join(path, self.CURRENT_FILE)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_current(self, path, meta):
+        tmp_path = os.path.join(path, f".{self.CURRENT_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(path, self.CURRENT_FILE))
@@ -1,23 +1,73 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 import config
 from auth.models import Base
+import blockchain.models  # noqa: F401 - registers the indexer tables
+import predictions.models  # noqa: F401 - registers the prediction history table
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    config.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Only needed for SQLite
-)
+# Async drivers for URLs that name only the dialect
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+def async_url(url):
+    url = make_url(url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+def engine_options(url):
+    if is_sqlite(url):
+        # SQLite connections are handed between threads; pool sizing does not apply
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+# Create SQLAlchemy engine; used by background workers such as the chain indexer
+engine = create_engine(config.DATABASE_URL, **engine_options(config.DATABASE_URL))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The async engine imports its driver, so it is only built on first use
+_async_engine = None
+_async_sessions = None
+
+def get_async_engine():
+    global _async_engine, _async_sessions
+    if _async_engine is None:
+        _async_engine = create_async_engine(async_url(config.DATABASE_URL), **engine_options(config.DATABASE_URL))
+        _async_sessions = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_engine
+
+def init_db():
+    # Create all tables; called at application startup rather than on import
+    Base.metadata.create_all(bind=engine)
+
+async def dispose_engines():
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    engine.dispose()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    get_async_engine()
+    async with _async_sessions() as db:
+        yield db
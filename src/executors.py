@@ -0,0 +1,75 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import config
+from metrics import EXECUTOR_PENDING
+
+
+class ExecutorSaturated(Exception):
+    pass
+
+
+class BoundedExecutor:
+    # Thread pool for blocking calls from async handlers; work beyond `max_pending` is rejected up front
+
+    def __init__(self, name, max_workers, max_pending):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        EXECUTOR_PENDING.labels(name).set_function(lambda: self._pending)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit(self, func, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExecutorSaturated(f"{self.name} executor is saturated")
+            self._pending += 1
+
+        def task():
+            # Released when the work really finishes, even if the caller timed out
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._release()
+
+        try:
+            future = self._executor.submit(task)
+        except Exception:
+            self._release()
+            raise
+        # Work cancelled before it started never runs task()
+        future.add_done_callback(lambda f: f.cancelled() and self._release())
+        return future
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        future = asyncio.wrap_future(self.submit(functools.partial(func, *args, **kwargs)))
+        if timeout is None:
+            return await future
+        return await asyncio.wait_for(future, timeout)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+
+# Network-bound work (yfinance, RPC) can overlap freely; CPU-bound model work
+# is capped at MAX_WORKERS so it cannot starve the event loop's own thread
+io_executor = BoundedExecutor('io', config.IO_WORKERS, config.EXECUTOR_MAX_PENDING)
+cpu_executor = BoundedExecutor('cpu', config.MAX_WORKERS, config.EXECUTOR_MAX_PENDING)
+# bcrypt gets its own small pool so a login burst queues here, not ahead of chart and prediction work
+auth_executor = BoundedExecutor('auth', config.AUTH_WORKERS, config.AUTH_MAX_PENDING)
+
+def shutdown_executors(wait=True):
+    io_executor.shutdown(wait=wait)
+    cpu_executor.shutdown(wait=wait)
+    auth_executor.shutdown(wait=wait)
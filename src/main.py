@@ -1,10 +1,21 @@
-from models.prediction_model import MarketPredictionModel
+from models.model_registry import ModelRegistry
+from models.training_jobs import TrainingJobManager, COMPLETED
+from models.backtest import WalkForwardBacktester
+from models.tuning import HyperparameterSearch
 from blockchain.smart_contract import PredictionContract
-from data.market_data import MarketDataFetcher
+from data.market_data import MarketDataFetcher, AsyncMarketDataFetcher
+from executors import cpu_executor, io_executor
+from metrics import PREDICTION_STAGE_SECONDS
+from data.indicators import FEATURE_COLUMNS
+from predictions.history import PredictionWriter
+from database import SessionLocal, init_db
 import config
+import asyncio
 import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(
     level=logging.INFO,
@@ -15,88 +26,222 @@ logger = logging.getLogger(__name__)
 class PredictionMarket:
     def __init__(self):
         self.market_data = MarketDataFetcher()
-        self.prediction_model = MarketPredictionModel()
+        self.async_market_data = AsyncMarketDataFetcher(self.market_data)
+        self.models = ModelRegistry()
+        self.training = TrainingJobManager(self.market_data, self.models)
         self.blockchain_contract = PredictionContract(
             config.CONTRACT_ADDRESS,
             config.CONTRACT_ABI_PATH
         )
+        # Latest result per symbol, served to readers such as the charts without predicting again
+        self.latest_predictions = {}
+        self.history = PredictionWriter(SessionLocal)
         
     def train_models(self, symbols=['BTC-USD', 'ETH-USD']):
         logger.info(f"Training models for symbols: {symbols}")
-        results = {}
         
-        data_dict = self.market_data.fetch_multiple_symbols(symbols)
-        for symbol, data in data_dict.items():
-            try:
-                features = self._prepare_features(data)
-                target = data['Close'].shift(-1)  # Next day's closing price
-                
-                # Remove last row since we don't have target for it
-                features = features[:-1]
-                target = target[:-1].values
-                
-                # Train model and get metrics
-                metrics = self.prediction_model.train(features, target)
-                logger.info(f"Training metrics for {symbol}: {metrics}")
-                
-                # Save trained model
-                model_path = f"{config.MODEL_SAVE_PATH}/{symbol}_{datetime.now().strftime('%Y%m%d')}.joblib"
-                self.prediction_model.save_model(model_path)
-                
-                results[symbol] = metrics
-                
-            except Exception as e:
-                logger.error(f"Error training model for {symbol}: {str(e)}")
-                results[symbol] = {'error': str(e)}
-                
+        # Symbols train in parallel worker processes; wait for all of them
+        jobs = self.training.submit_many(symbols)
+        self.training.wait(jobs)
+        
+        results = {}
+        for job in jobs:
+            results[job.symbol] = job.metrics if job.status == COMPLETED else {'error': job.error}
         return results
     
-    def make_prediction(self, symbol):
+    def backtest(self, symbols, period='5y', **kwargs):
+        # Out-of-sample walk-forward evaluation on the same features the models train on
+        data_dict = self.market_data.fetch_multiple_symbols(symbols, period=period)
+        frames = {symbol: self._prepare_features(data) for symbol, data in data_dict.items()}
+        return WalkForwardBacktester(**kwargs).run(frames)
+    
+    def tune_models(self, symbols, period='2y', **kwargs):
+        # Saves each symbol's best params; the next training run picks them up
+        search = HyperparameterSearch(**kwargs)
+        data_dict = self.market_data.fetch_multiple_symbols(symbols, period=period)
+        return {
+            symbol: search.tune(symbol, self._prepare_features(data), self.models)
+            for symbol, data in data_dict.items()
+        }
+    
+    def make_prediction(self, symbol, user=None):
         try:
             # Fetch latest data
-            data = self.market_data.fetch_historical_data(symbol, period='60d')
-            features = self._prepare_features(data)
+            with PREDICTION_STAGE_SECONDS.labels('fetch').time():
+                data = self.market_data.fetch_historical_data(symbol, period='60d')
             
             # Get prediction and confidence
-            latest_features = features.iloc[-1:]
-            prediction, confidence = self.prediction_model.predict(latest_features)
+            prediction, confidence = self._predict(symbol, data)
+            result = self._build_result(symbol, data, prediction, confidence)
+            self._submit_prediction(result)
+            self._record_prediction(result, user)
+            return result
             
-            current_price = data['Close'].iloc[-1]
-            predicted_change = ((prediction[0] - current_price) / current_price) * 100
+        except Exception as e:
+            logger.error(f"Error making prediction for {symbol}: {str(e)}")
+            raise
+    
+    async def make_prediction_async(self, symbol, user=None):
+        # Same steps as make_prediction, with blocking work kept off the event loop
+        try:
+            with PREDICTION_STAGE_SECONDS.labels('fetch').time():
+                data = await self.async_market_data.fetch_historical_data(symbol, period='60d')
+            prediction, confidence = await cpu_executor.run(self._predict, symbol, data)
+            result = self._build_result(symbol, data, prediction, confidence)
+            await io_executor.run(self._submit_prediction, result)
+            self._record_prediction(result, user)
+            return result
             
-            result = {
-                'symbol': symbol,
-                'current_price': current_price,
-                'predicted_price': prediction[0],
-                'predicted_change_percent': predicted_change,
-                'confidence_score': confidence[0],
-                'timestamp': datetime.now().isoformat()
+        except Exception as e:
+            logger.error(f"Error making prediction for {symbol}: {str(e)}")
+            raise
+    
+    async def forecast_async(self, symbol):
+        # Prediction for display only: never submitted on-chain or written to history
+        with PREDICTION_STAGE_SECONDS.labels('fetch').time():
+            data = await self.async_market_data.fetch_historical_data(symbol, period='60d')
+        prediction, confidence = await cpu_executor.run(self._predict, symbol, data)
+        return data, self._build_result(symbol, data, prediction, confidence)
+    
+    def make_predictions(self, symbols, user=None):
+        errors = {}
+        
+        # Fetch latest data for every symbol concurrently
+        data_dict = {}
+        with PREDICTION_STAGE_SECONDS.labels('fetch').time(), \
+                ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
+            future_to_symbol = {
+                executor.submit(self.market_data.fetch_historical_data, symbol, '60d'): symbol
+                for symbol in symbols
             }
+            for future in future_to_symbol:
+                symbol = future_to_symbol[future]
+                try:
+                    data_dict[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = str(e)
+        
+        predictions = self._predict_many(data_dict, errors)
+        for symbol, result in list(predictions.items()):
+            try:
+                self._submit_prediction(result)
+                self._record_prediction(result, user)
+            except Exception as e:
+                del predictions[symbol]
+                errors[symbol] = str(e)
+        
+        return {'predictions': predictions, 'errors': errors}
+    
+    async def make_predictions_async(self, symbols, user=None):
+        errors = {}
+        
+        data_dict = {}
+        with PREDICTION_STAGE_SECONDS.labels('fetch').time():
+            fetched = await self.async_market_data.fetch_multiple_symbols(symbols, period='60d')
+        for symbol, data in fetched.items():
+            if isinstance(data, Exception):
+                errors[symbol] = str(data)
+            else:
+                data_dict[symbol] = data
+        
+        predictions = await cpu_executor.run(self._predict_many, data_dict, errors)
+        submissions = await asyncio.gather(
+            *(io_executor.run(self._submit_prediction, result) for result in predictions.values()),
+            return_exceptions=True
+        )
+        for symbol, outcome in zip(list(predictions), submissions):
+            if isinstance(outcome, Exception):
+                del predictions[symbol]
+                errors[symbol] = str(outcome)
+            else:
+                self._record_prediction(predictions[symbol], user)
+        
+        return {'predictions': predictions, 'errors': errors}
+    
+    def _predict(self, symbol, data):
+        with PREDICTION_STAGE_SECONDS.labels('model_load').time():
+            model = self.models.get(symbol)
+        with PREDICTION_STAGE_SECONDS.labels('features').time():
+            row = self._latest_row(model, data)
+        with PREDICTION_STAGE_SECONDS.labels('model').time():
+            return model.predict_one(row)
+    
+    @staticmethod
+    def _latest_row(model, data):
+        # Only the newest bar is converted, not the whole 60-day frame
+        if model.feature_columns is None:
+            return data[FEATURE_COLUMNS].to_numpy(dtype=float)[-1]
+        return model.feature_row(data)
+    
+    def _predict_many(self, data_dict, errors):
+        predictions = {}
+        
+        # Stack the latest feature row of every symbol served by the same model
+        groups = {}
+        with PREDICTION_STAGE_SECONDS.labels('model_load').time():
+            for symbol, data in data_dict.items():
+                try:
+                    model = self.models.get(symbol)
+                except KeyError as e:
+                    errors[symbol] = str(e.args[0])
+                    continue
+                groups.setdefault(id(model), (model, []))[1].append(symbol)
+        
+        for model, group in groups.values():
+            try:
+                with PREDICTION_STAGE_SECONDS.labels('features').time():
+                    rows = np.vstack([self._latest_row(model, data_dict[symbol]) for symbol in group])
+                with PREDICTION_STAGE_SECONDS.labels('model').time():
+                    prediction, confidence = model.predict(rows)
+            except Exception as e:
+                logger.error(f"Error making predictions for {group}: {str(e)}")
+                errors.update({symbol: str(e) for symbol in group})
+                continue
             
-            # If confidence is high enough, submit to blockchain
-            if confidence[0] > config.PREDICTION_THRESHOLD:
+            for i, symbol in enumerate(group):
+                predictions[symbol] = self._build_result(
+                    symbol, data_dict[symbol], prediction[i], confidence[i]
+                )
+        
+        return predictions
+    
+    def _build_result(self, symbol, data, prediction, confidence):
+        current_price = float(data['Close'].iloc[-1])
+        predicted_change = ((prediction - current_price) / current_price) * 100
+        
+        return {
+            'symbol': symbol,
+            'current_price': current_price,
+            'predicted_price': prediction,
+            'predicted_change_percent': predicted_change,
+            'confidence_score': confidence,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def _submit_prediction(self, result):
+        # If confidence is high enough, submit to blockchain
+        if result['confidence_score'] > config.PREDICTION_THRESHOLD:
+            with PREDICTION_STAGE_SECONDS.labels('submit').time():
                 txn = self.blockchain_contract.place_prediction(
                     config.TRADING_ACCOUNT,
-                    prediction[0],
+                    result['predicted_price'],
                     config.DEFAULT_STAKE_AMOUNT
                 )
-                result['transaction_hash'] = txn['hash']
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error making prediction for {symbol}: {str(e)}")
-            raise
+            result['transaction_hash'] = txn['hash']
+    
+    def latest_prediction(self, symbol):
+        return self.latest_predictions.get(symbol)
+    
+    def _record_prediction(self, result, user=None):
+        self.latest_predictions[result['symbol']] = result
+        # Buffered; rows reach the predictions table in bulk off the request path
+        self.history.add(result, user)
     
     def _prepare_features(self, data):
-        return data[[
-            'Open', 'High', 'Low', 'Close', 'Volume',
-            'SMA_20', 'SMA_50', 'RSI', 'MACD', 'Signal_Line',
-            'BB_middle', 'BB_upper', 'BB_lower', 'Momentum',
-            'Volatility', 'Volume_MA', 'Price_Momentum'
-        ]]
+        return data[FEATURE_COLUMNS]
 
 def main():
+    init_db()
     market = PredictionMarket()
     
     # Train models for multiple symbols
@@ -111,6 +256,8 @@ def main():
             logger.info(f"Prediction for {symbol}:", prediction)
         except Exception as e:
             logger.error(f"Failed to make prediction for {symbol}: {str(e)}")
+    
+    market.history.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
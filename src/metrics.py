@@ -0,0 +1,222 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        # Prometheus text exposition format, version 0.0.4
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        # Children are created once per label set and then reused lock-free
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return self.labels()
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+class _Value:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def get(self):
+        return self._value
+
+class _GaugeValue(_Value):
+    def __init__(self):
+        super().__init__()
+        self._function = None
+
+    def set(self, value):
+        self._value = float(value)
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        # Read at scrape time, so nothing is paid on the hot path
+        self._function = function
+
+    def get(self):
+        return self._function() if self._function is not None else self._value
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def samples(self):
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.get())}"
+            for values, child in self._items()
+        ]
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def set_function(self, function):
+        self._default().set_function(function)
+
+    def samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"
+            for values, child in self._items()
+        ]
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts), self._sum
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self):
+        lines = []
+        for values, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, [le])} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+# Shared application metrics; modules import these instead of defining duplicates
+PREDICTION_STAGE_SECONDS = Histogram(
+    'prediction_stage_seconds', 'Time spent in each stage of a prediction', ['stage']
+)
+TRAINING_STAGE_SECONDS = Histogram(
+    'training_stage_seconds', 'Time spent in each stage of a training job', ['stage']
+)
+MARKET_DATA_DOWNLOAD_SECONDS = Histogram(
+    'market_data_download_seconds', 'Time spent downloading bars from yfinance'
+)
+MARKET_DATA_CACHE_BYTES = Gauge(
+    'market_data_cache_bytes', 'Memory held by cached market data frames'
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests', 'Cache lookups by cache and result', ['cache', 'result']
+)
+CACHE_EVICTIONS = Counter(
+    'cache_evictions', 'Entries dropped from a cache', ['cache', 'reason']
+)
+EXECUTOR_PENDING = Gauge(
+    'executor_pending_tasks', 'Tasks queued or running on an executor', ['executor']
+)
+PREDICTION_HISTORY_ROWS = Counter(
+    'prediction_history_rows', 'Prediction rows leaving the write-behind buffer', ['result']
+)
+STREAM_MESSAGES = Counter(
+    'stream_messages', 'Live updates sent to subscribers or replaced by a newer one', ['result']
+)
+STREAM_CONNECTIONS = Gauge(
+    'stream_connections', 'Open live prediction stream connections'
+)
@@ -0,0 +1,118 @@
+import logging
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+import config
+from models.prediction_model import MarketPredictionModel
+from models.training_jobs import prepare_training_data
+
+FOLD_METRICS = ['mse', 'rmse', 'mae', 'hit_rate', 'win_rate']
+
+def walk_forward_splits(n_samples, train_size, test_size, step=None, expanding=False):
+    # (train_start, train_end, test_end) per fold; rolling folds keep `train_size` bars, expanding folds all
+    step = step or test_size
+    train_end = train_size
+    while train_end + test_size <= n_samples:
+        train_start = 0 if expanding else train_end - train_size
+        yield train_start, train_end, train_end + test_size
+        train_end += step
+
+def contract_won(predicted, actual, price_scale=1):
+    # Mirrors resolvePrediction: integer prices, (|diff| * 100) / predicted <= 1
+    # with integer division, so a prediction wins while it is within 2%
+    predicted = np.floor(np.asarray(predicted) * price_scale).astype(np.int64)
+    actual = np.floor(np.asarray(actual) * price_scale).astype(np.int64)
+    diff = np.abs(actual - predicted)
+    return (predicted > 0) & ((diff * 100) // np.maximum(predicted, 1) <= 1)
+
+def score_fold(predicted, actual, current, price_scale=1):
+    errors = predicted - actual
+    mse = float(np.mean(errors ** 2))
+    return {
+        'mse': mse,
+        'rmse': float(np.sqrt(mse)),
+        'mae': float(np.mean(np.abs(errors))),
+        # Did the model call the direction of the next close correctly
+        'hit_rate': float(np.mean(np.sign(predicted - current) == np.sign(actual - current))),
+        'win_rate': float(np.mean(contract_won(predicted, actual, price_scale)))
+    }
+
+def run_fold(X, y, current, train_start, train_end, test_end, model_params=None, price_scale=1):
+    # Folds only slice the shared matrix; joblib memory-maps it into the workers
+    model = MarketPredictionModel(model_params)
+    model.train(X[train_start:train_end], y[train_start:train_end])
+
+    predicted, _ = model.predict(X[train_end:test_end])
+    return score_fold(predicted, y[train_end:test_end], current[train_end:test_end], price_scale)
+
+class WalkForwardBacktester:
+    # Walk-forward evaluation over rolling and expanding windows; folds of all symbols run as one joblib batch
+
+    def __init__(self, train_size=250, test_size=20, step=None, modes=('rolling', 'expanding'),
+                 model_params=None, n_jobs=None, price_scale=None):
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step
+        self.modes = list(modes)
+        self.model_params = model_params
+        self.n_jobs = n_jobs or config.BACKTEST_WORKERS
+        self.price_scale = price_scale or config.CONTRACT_PRICE_SCALE
+        self.logger = logging.getLogger(__name__)
+        self._matrices = {}  # symbol -> (last bar, X, y, current, index)
+
+    def feature_matrix(self, symbol, data):
+        key = data.index[-1] if len(data) else None
+        cached = self._matrices.get(symbol)
+        if cached is not None and cached[0] == key and len(cached[1]) == len(data) - 1:
+            return cached[1:]
+
+        features, target = prepare_training_data(data)
+        X = np.ascontiguousarray(features.fillna(0).to_numpy(dtype=float))
+        current = data['Close'].to_numpy(dtype=float)[:-1]
+        matrix = (X, np.asarray(target, dtype=float), current, features.index)
+        self._matrices[symbol] = (key,) + matrix
+        return matrix
+
+    def folds(self, n_samples):
+        for mode in self.modes:
+            splits = walk_forward_splits(
+                n_samples, self.train_size, self.test_size, self.step, expanding=(mode == 'expanding')
+            )
+            for fold, split in enumerate(splits):
+                yield mode, fold, split
+
+    def run(self, frames):
+        # One row per (symbol, mode, fold) for frames holding FEATURE_COLUMNS and Close
+        tasks, rows = [], []
+        for symbol, data in frames.items():
+            X, y, current, index = self.feature_matrix(symbol, data)
+            for mode, fold, (train_start, train_end, test_end) in self.folds(len(X)):
+                rows.append({
+                    'symbol': symbol,
+                    'mode': mode,
+                    'fold': fold,
+                    'train_start': index[train_start],
+                    'train_end': index[train_end - 1],
+                    'test_start': index[train_end],
+                    'test_end': index[test_end - 1],
+                    'n_train': train_end - train_start,
+                    'n_test': test_end - train_end
+                })
+                tasks.append(delayed(run_fold)(
+                    X, y, current, train_start, train_end, test_end, self.model_params, self.price_scale
+                ))
+
+        if not tasks:
+            self.logger.warning("Not enough history for a single walk-forward fold")
+            return pd.DataFrame(columns=['symbol', 'mode', 'fold'] + FOLD_METRICS)
+
+        results = Parallel(n_jobs=self.n_jobs)(tasks)
+        for row, metrics in zip(rows, results):
+            row.update(metrics)
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def summarize(results):
+        # Test windows are equal-sized within a run, so fold means weight every bar equally
+        return results.groupby(['symbol', 'mode'])[FOLD_METRICS].mean()
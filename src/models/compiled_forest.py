@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class CompiledForest:
+    # A fitted forest and its scaler packed into flat node arrays, so a prediction is a few NumPy
+    # operations; leaves point at themselves so every tree walks the same number of steps
+
+    def __init__(self, forest, scaler):
+        features, thresholds, left, right, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            right.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            values.append(tree.value.reshape(tree.node_count, -1)[:, 0])
+            depth = max(depth, tree.max_depth)
+            offset += tree.node_count
+
+        # Renumber so split nodes come first; single-row prediction only has to
+        # evaluate decisions for those, leaves just point at themselves
+        feature = np.concatenate(features)
+        threshold = np.concatenate(thresholds)
+        is_leaf = np.isinf(threshold)
+        order = np.argsort(is_leaf, kind='stable')
+        renumber = np.empty_like(order)
+        renumber[order] = np.arange(len(order))
+
+        self.n_splits = int((~is_leaf).sum())
+        self.feature = feature[order].astype(np.intp)
+        self.threshold = threshold[order]
+        self.left = renumber[np.concatenate(left)[order]].astype(np.intp)
+        self.right = renumber[np.concatenate(right)[order]].astype(np.intp)
+        self.value = np.concatenate(values)[order]
+        self.roots = renumber[np.array(roots)].astype(np.intp)
+        self.depth = depth
+
+        self._split_feature = self.feature[:self.n_splits]
+        self._split_threshold = self.threshold[:self.n_splits]
+        self._split_left = self.left[:self.n_splits]
+        self._split_right = self.right[:self.n_splits]
+        self._leaves = self.left[self.n_splits:]
+
+        self.mean = scaler.mean_
+        self.scale = scaler.scale_
+        # feature_importances_ is recomputed over every tree on each access
+        self.importances = forest.feature_importances_
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.value))
+
+    def transform(self, X):
+        return (X - self.mean) / self.scale
+
+    def predict_one(self, x_scaled):
+        # sklearn compares float32 inputs against float64 thresholds
+        x = x_scaled.astype(np.float32)
+        # Branch decision for every split node at once, then follow it depth times
+        following = np.concatenate((
+            np.where(x[self._split_feature] <= self._split_threshold, self._split_left, self._split_right),
+            self._leaves
+        ))
+        node = self.roots
+        for _ in range(self.depth):
+            node = following[node]
+        return self.value.take(node).mean()
+
+    def predict(self, X_scaled):
+        X = X_scaled.astype(np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1)
+
+    def confidence(self, X_scaled):
+        confidence = np.mean(X_scaled * self.importances, axis=-1)
+        return np.clip(confidence, 0, 1)
+
+    def confidence_one(self, x_scaled):
+        confidence = float(x_scaled @ self.importances) / len(self.importances)
+        return min(max(confidence, 0.0), 1.0)
@@ -0,0 +1,174 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import config
+from models.prediction_model import MarketPredictionModel
+from metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+ARTIFACT_PATTERN = re.compile(r'^(?P<symbol>.+)_(?P<version>\d{8,})\.joblib$')
+
+def estimate_model_size(model):
+    # Tree node/value arrays dominate a fitted forest's footprint
+    size = 0
+    for estimator in getattr(model.model, 'estimators_', []):
+        state = estimator.tree_.__getstate__()
+        size += state['nodes'].nbytes + state['values'].nbytes
+    return size
+
+class ModelRegistry:
+    # Per-symbol models loaded on demand into a size-bounded LRU; new versions, including ones
+    # published by other processes, are swapped in whole
+
+    def __init__(self, model_dir=None, max_models=None, max_bytes=None, check_interval=None):
+        self.model_dir = model_dir or config.MODEL_SAVE_PATH
+        self.max_models = max_models or config.MODEL_CACHE_MAX_MODELS
+        self.max_bytes = max_bytes or config.MODEL_CACHE_MAX_BYTES
+        self.check_interval = config.MODEL_VERSION_CHECK_INTERVAL if check_interval is None else check_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._models = OrderedDict()  # (symbol, version) -> (model, size)
+        self._current = {}  # symbol -> version
+        self._checked = {}  # symbol -> monotonic time of the last look at disk
+        self._loading = {}  # (symbol, version) -> Event
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def artifact_path(self, symbol, version):
+        return os.path.join(self.model_dir, f"{symbol}_{version}.joblib")
+
+    def params_path(self, symbol):
+        return os.path.join(self.model_dir, f"{symbol}_params.json")
+
+    def save_params(self, symbol, params):
+        os.makedirs(self.model_dir, exist_ok=True)
+        path = self.params_path(symbol)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(params, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def load_params(self, symbol):
+        # Best hyperparameters found by tuning, or None to use the model defaults
+        try:
+            with open(self.params_path(symbol)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def versions(self, symbol):
+        if not os.path.isdir(self.model_dir):
+            return []
+        versions = []
+        for name in os.listdir(self.model_dir):
+            match = ARTIFACT_PATTERN.match(name)
+            if match and match.group('symbol') == symbol:
+                versions.append(match.group('version'))
+        # Timestamps of any precision sort correctly as strings (20240101 < 20240101120000 < 20240102)
+        return sorted(versions)
+
+    def current_version(self, symbol):
+        now = time.monotonic()
+        with self._lock:
+            version = self._current.get(symbol)
+            due = version is None or now - self._checked.get(symbol, float('-inf')) >= self.check_interval
+            if due:
+                # Only one caller per interval scans the directory
+                self._checked[symbol] = now
+        if not due:
+            return version
+
+        # Other API workers never see our publish() calls, only the artifacts on disk
+        versions = self.versions(symbol)
+        with self._lock:
+            version = self._current.get(symbol)
+            if versions and (version is None or versions[-1] > version):
+                version = self._current[symbol] = versions[-1]
+        return version
+
+    def get(self, symbol, version=None):
+        version = version or self.current_version(symbol)
+        if version is None:
+            raise KeyError(f"No trained model for {symbol}")
+
+        key = (symbol, version)
+        while True:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    CACHE_REQUESTS.labels('models', 'hit').inc()
+                    return self._models[key][0]
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another thread is loading the same artifact; wait for it instead of loading twice
+            loading.wait()
+
+        CACHE_REQUESTS.labels('models', 'miss').inc()
+        try:
+            model = MarketPredictionModel()
+            model.load_model(self.artifact_path(symbol, version))
+            self._insert(key, model)
+            return model
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+
+    def save(self, symbol, model, version=None):
+        version = version or datetime.now().strftime('%Y%m%d%H%M%S')
+        os.makedirs(self.model_dir, exist_ok=True)
+
+        path = self.artifact_path(symbol, version)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        model.save_model(tmp_path)
+        os.replace(tmp_path, path)
+
+        self.publish(symbol, model, version)
+        return path
+
+    def publish(self, symbol, model, version):
+        self._insert((symbol, version), model)
+        with self._lock:
+            current = self._current.get(symbol)
+            if current is None or version >= current:
+                self._current[symbol] = version
+        self.logger.info(f"Published model {symbol} version {version}")
+
+    def refresh(self, symbol):
+        # Pick up artifacts written by other processes (e.g. training workers)
+        versions = self.versions(symbol)
+        with self._lock:
+            self._checked[symbol] = time.monotonic()
+            if versions:
+                self._current[symbol] = versions[-1]
+            else:
+                self._current.pop(symbol, None)
+        return versions[-1] if versions else None
+
+    def memory_usage(self):
+        with self._lock:
+            return {'models': len(self._models), 'bytes': self._bytes}
+
+    def _insert(self, key, model):
+        size = estimate_model_size(model)
+        with self._lock:
+            if key in self._models:
+                self._bytes -= self._models.pop(key)[1]
+            self._models[key] = (model, size)
+            self._bytes += size
+
+            # Evict least recently used models, but always keep the one just added
+            while len(self._models) > 1 and (
+                len(self._models) > self.max_models or self._bytes > self.max_bytes
+            ):
+                evicted, (_, evicted_size) = self._models.popitem(last=False)
+                self._bytes -= evicted_size
+                CACHE_EVICTIONS.labels('models', 'capacity').inc()
+                self.logger.debug(f"Evicted model {evicted[0]} version {evicted[1]}")
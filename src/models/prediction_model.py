@@ -4,35 +4,46 @@ from sklearn.metrics import mean_squared_error, r2_score
 import numpy as np
 import pandas as pd
 import joblib
+from data.indicators import calculate_macd, calculate_bollinger_bands
+from models.compiled_forest import CompiledForest
+
+MODEL_INDICATOR_COLUMNS = ['MACD', 'Signal_Line', 'BB_middle', 'BB_upper', 'BB_lower', 'Momentum']
 
 class MarketPredictionModel:
-    def __init__(self):
+    def __init__(self, params=None):
         self.model = RandomForestRegressor(
             n_estimators=100,
             max_depth=10,
             min_samples_split=5,
             random_state=42
         )
+        # Tuned settings (see models.tuning) override the defaults above
+        if params:
+            self.model.set_params(**params)
         self.scaler = StandardScaler()
+        self.feature_columns = None
+        self._compiled = None
+        self._feature_positions = None
         
     def preprocess_data(self, data):
         if isinstance(data, pd.DataFrame):
             # Add more technical indicators
             data = self._add_technical_indicators(data)
+            self.feature_columns = list(data.columns)
+            self._feature_positions = None
             data = data.values
         return self.scaler.fit_transform(data)
     
     def _add_technical_indicators(self, df):
+        # Frames from MarketDataFetcher already carry these columns
+        if all(column in df.columns for column in MODEL_INDICATOR_COLUMNS):
+            return df.fillna(0)
+        
         # Add MACD
-        exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = exp1 - exp2
-        df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
+        df['MACD'], df['Signal_Line'] = calculate_macd(df['Close'])
         
         # Add Bollinger Bands
-        df['BB_middle'] = df['Close'].rolling(window=20).mean()
-        df['BB_upper'] = df['BB_middle'] + 2 * df['Close'].rolling(window=20).std()
-        df['BB_lower'] = df['BB_middle'] - 2 * df['Close'].rolling(window=20).std()
+        df['BB_middle'], df['BB_upper'], df['BB_lower'] = calculate_bollinger_bands(df['Close'])
         
         # Add momentum
         df['Momentum'] = df['Close'] - df['Close'].shift(4)
@@ -42,6 +53,7 @@ class MarketPredictionModel:
     def train(self, X, y):
         X_scaled = self.preprocess_data(X)
         self.model.fit(X_scaled, y)
+        self._compiled = None
         
         # Calculate training metrics
         y_pred = self.model.predict(X_scaled)
@@ -55,27 +67,67 @@ class MarketPredictionModel:
         }
     
     def predict(self, X):
-        X_scaled = self.preprocess_data(X)
-        predictions = self.model.predict(X_scaled)
+        compiled = self.compile()
+        X_scaled = compiled.transform(self.select_features(X))
+        if len(X_scaled) == 1:
+            predictions = np.array([compiled.predict_one(X_scaled[0])])
+        else:
+            predictions = compiled.predict(X_scaled)
         
         # Add confidence scores based on feature importance
-        confidence_scores = self._calculate_confidence(X_scaled)
+        confidence_scores = compiled.confidence(X_scaled)
         
         return predictions, confidence_scores
     
-    def _calculate_confidence(self, X):
-        feature_importance = self.model.feature_importances_
-        # Weight predictions by feature importance
-        confidence = np.mean(X * feature_importance, axis=1)
-        return np.clip(confidence, 0, 1)
+    def predict_one(self, features):
+        # Single-row fast path: `features` is a 1-D array in feature_columns order
+        compiled = self.compile()
+        x_scaled = compiled.transform(features)
+        return compiled.predict_one(x_scaled), compiled.confidence_one(x_scaled)
+    
+    def feature_row(self, data):
+        # The newest row of `data` in feature_columns order. Looking columns up
+        # on a string index costs more than the prediction itself, so positions
+        # are kept for the last column layout seen
+        cached = self._feature_positions
+        if cached is None or not cached[0].equals(data.columns):
+            positions = data.columns.get_indexer(self.feature_columns)
+            if (positions < 0).any():
+                missing = [name for name, position in zip(self.feature_columns, positions) if position < 0]
+                raise KeyError(f"Missing feature columns: {missing}")
+            cached = self._feature_positions = (data.columns, positions)
+        # Cached frames hold a price block and a feature block; interleaving the
+        # few rows of a prediction frame is still cheap next to label lookups
+        return data.to_numpy()[-1, cached[1]].astype(float)
+    
+    def compile(self):
+        # Built once per fitted/loaded model and reused by every prediction
+        if self._compiled is None:
+            self._compiled = CompiledForest(self.model, self.scaler)
+        return self._compiled
+    
+    def select_features(self, X):
+        # Reuses the scaler fitted at training time; indicators are only computed
+        # when the caller has not already supplied the training columns
+        if not isinstance(X, pd.DataFrame):
+            return np.asarray(X, dtype=float)
+        if self.feature_columns and all(column in X.columns for column in self.feature_columns):
+            return X[self.feature_columns].to_numpy(dtype=float)
+        if X.shape[1] == self.scaler.n_features_in_:
+            return X.to_numpy(dtype=float)
+        return self._add_technical_indicators(X.copy()).to_numpy(dtype=float)
     
     def save_model(self, path):
         joblib.dump({
             'model': self.model,
-            'scaler': self.scaler
+            'scaler': self.scaler,
+            'feature_columns': self.feature_columns
         }, path)
     
     def load_model(self, path):
         saved_data = joblib.load(path)
         self.model = saved_data['model']
-        self.scaler = saved_data['scaler'] 
\ No newline at end of file
+        self.scaler = saved_data['scaler']
+        self.feature_columns = saved_data.get('feature_columns')
+        self._feature_positions = None
+        self.compile() 
\ No newline at end of file
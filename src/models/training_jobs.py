@@ -0,0 +1,204 @@
+import uuid
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime
+
+import config
+from data.indicators import FEATURE_COLUMNS
+from models.prediction_model import MarketPredictionModel
+from models.model_registry import ModelRegistry
+from metrics import TRAINING_STAGE_SECONDS, Gauge
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+def prepare_training_data(data):
+    features = data[FEATURE_COLUMNS]
+    target = data['Close'].shift(-1)  # Next day's closing price
+
+    # Remove last row since we don't have target for it
+    return features[:-1], target[:-1].values
+
+def train_symbol(symbol, data, model_dir):
+    # Runs in a worker process: train, then publish the artifact for the parent to pick up
+    registry = ModelRegistry(model_dir=model_dir)
+    features, target = prepare_training_data(data)
+    model = MarketPredictionModel(registry.load_params(symbol))
+    metrics = model.train(features, target)
+
+    version = datetime.now().strftime('%Y%m%d%H%M%S')
+    registry.save(symbol, model, version=version)
+    return metrics, version
+
+TRAINING_JOBS = Gauge('training_jobs', 'Training jobs in the history by status', ['status'])
+
+class TrainingJob:
+    def __init__(self, symbol):
+        self.id = uuid.uuid4().hex
+        self.symbol = symbol
+        self.status = QUEUED
+        self.submitted_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.metrics = None
+        self.version = None
+        self.error = None
+        self.done = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'symbol': self.symbol,
+            'status': self.status,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'metrics': self.metrics,
+            'model_version': self.version,
+            'error': self.error
+        }
+
+class TrainingJobManager:
+    # Training jobs fetched on dispatcher threads and fit in worker processes; a symbol with an
+    # unfinished job gets that job back
+
+    def __init__(self, market_data, registry, max_workers=None, max_jobs=None):
+        self.market_data = market_data
+        self.registry = registry
+        self.max_workers = max_workers or config.TRAINING_WORKERS
+        self.max_jobs = max_jobs or config.TRAINING_JOB_HISTORY
+        self.logger = logging.getLogger(__name__)
+
+        # One dispatcher per worker process, so a job is only 'running' while it holds a core
+        self._dispatcher = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='training')
+        self._pool = None
+        self._jobs = OrderedDict()  # job id -> TrainingJob, oldest first
+        self._active = {}  # symbol -> unfinished TrainingJob
+        self._lock = threading.Lock()
+
+        for status in (QUEUED, RUNNING, COMPLETED, FAILED):
+            TRAINING_JOBS.labels(status).set_function(lambda status=status: self.stats()[status])
+
+    def submit(self, symbol, period='1y'):
+        job, created = self._enqueue(symbol)
+        if created:
+            self._dispatcher.submit(self._run, job, period)
+        return job
+
+    def submit_many(self, symbols, period='1y'):
+        jobs, created = [], []
+        for symbol in dict.fromkeys(symbols):
+            job, new = self._enqueue(symbol)
+            jobs.append(job)
+            if new:
+                created.append(job)
+        if len(created) > 1:
+            # Queued ahead of the jobs, so it is always running by the time they wait on it
+            batch = self._dispatcher.submit(
+                self.market_data.fetch_multiple_symbols, [job.symbol for job in created], period=period
+            )
+            for job in created:
+                self._dispatcher.submit(self._run, job, period, batch)
+        elif created:
+            self._dispatcher.submit(self._run, created[0], period)
+        return jobs
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, status=None):
+        with self._lock:
+            return [job for job in self._jobs.values() if status is None or job.status == status]
+
+    def wait(self, jobs, timeout=None):
+        for job in jobs:
+            if not job.done.wait(timeout):
+                return False
+        return True
+
+    def stats(self):
+        counts = {QUEUED: 0, RUNNING: 0, COMPLETED: 0, FAILED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self, wait=True):
+        self._dispatcher.shutdown(wait=wait, cancel_futures=not wait)
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job, period, batch=None):
+        job.status = RUNNING
+        job.started_at = datetime.now()
+        try:
+            with TRAINING_STAGE_SECONDS.labels('fetch').time():
+                data = self._batch_data(job, batch)
+                if data is None:
+                    data = self.market_data.fetch_historical_data(job.symbol, period=period)
+            with TRAINING_STAGE_SECONDS.labels('train').time():
+                job.metrics, job.version = self._get_pool().submit(
+                    train_symbol, job.symbol, data, self.registry.model_dir
+                ).result()
+            with TRAINING_STAGE_SECONDS.labels('publish').time():
+                self.registry.refresh(job.symbol)
+            job.status = COMPLETED
+            self.logger.info(f"Training metrics for {job.symbol}: {job.metrics}")
+        except Exception as e:
+            self.logger.error(f"Error training model for {job.symbol}: {str(e)}")
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now()
+            with self._lock:
+                self._active.pop(job.symbol, None)
+            job.done.set()
+
+    def _batch_data(self, job, batch):
+        # Symbols missing from the batch are fetched on their own, which surfaces their error
+        if batch is None:
+            return None
+        try:
+            return batch.result().get(job.symbol)
+        except Exception as e:
+            self.logger.warning(f"Batch fetch failed, fetching {job.symbol} alone: {str(e)}")
+            return None
+
+    def _enqueue(self, symbol):
+        # Returns (job, created); a symbol with an unfinished job gets that job back
+        with self._lock:
+            job = self._active.get(symbol)
+            if job is not None:
+                return job, False
+            job = self._active[symbol] = TrainingJob(symbol)
+            self._jobs[job.id] = job
+            self._trim()
+        return job, True
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn rather than fork: the parent runs threads that may hold locks
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def _trim(self):
+        # Forget the oldest finished jobs once the history is full
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
@@ -0,0 +1,118 @@
+import time
+import math
+import logging
+import itertools
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import TimeSeriesSplit
+
+import config
+from models.prediction_model import MarketPredictionModel
+from models.model_registry import estimate_model_size
+from models.training_jobs import prepare_training_data
+
+PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [5, 10, 20],
+    'min_samples_split': [2, 5, 10]
+}
+
+def param_candidates(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def evaluate_trial(X, y, params, train_end, test_end, latency_rows=50):
+    # One fold of one trial; X is the shared (memory-mapped) feature matrix
+    model = MarketPredictionModel(params)
+    model.train(X[:train_end], y[:train_end])
+
+    X_test = X[train_end:test_end]
+    predicted, _ = model.predict(X_test)
+
+    # Median single-row latency on the serving path, after compiling once
+    model.compile()
+    timings = []
+    for row in X_test[:latency_rows]:
+        start = time.perf_counter()
+        model.predict_one(row)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'mse': float(np.mean((predicted - y[train_end:test_end]) ** 2)),
+        'latency_us': float(np.median(timings) * 1e6),
+        'size_bytes': estimate_model_size(model)
+    }
+
+def pareto_front(trials, objectives=('mse', 'latency_us', 'size_bytes')):
+    # A trial is on the front unless another is no worse on every objective and better on one
+    values = trials[list(objectives)].to_numpy(dtype=float)
+    no_worse = (values[:, None, :] <= values[None, :, :]).all(axis=2)
+    better = (values[:, None, :] < values[None, :, :]).any(axis=2)
+    dominated = (no_worse & better).any(axis=0)
+    return ~dominated
+
+class HyperparameterSearch:
+    # Grid search with TimeSeriesSplit folds; after each fold only the best 1/`eta` of the trials go on
+
+    def __init__(self, param_grid=None, n_splits=5, eta=3, n_jobs=None):
+        self.param_grid = param_grid or PARAM_GRID
+        self.n_splits = n_splits
+        self.eta = eta
+        self.n_jobs = n_jobs or config.TUNING_WORKERS
+        self.logger = logging.getLogger(__name__)
+
+    def search(self, data):
+        # One row per trial: params, mean error, latency, size, folds survived and Pareto-optimality
+        features, target = prepare_training_data(data)
+        X = np.ascontiguousarray(features.fillna(0).to_numpy(dtype=float))
+        y = np.asarray(target, dtype=float)
+        folds = [(train[-1] + 1, test[-1] + 1) for train, test in TimeSeriesSplit(self.n_splits).split(X)]
+
+        candidates = param_candidates(self.param_grid)
+        scores = [[] for _ in candidates]
+        costs = [None] * len(candidates)
+        alive = list(range(len(candidates)))
+
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            for rung, (train_end, test_end) in enumerate(folds):
+                results = parallel(
+                    delayed(evaluate_trial)(X, y, candidates[i], train_end, test_end) for i in alive
+                )
+                for i, result in zip(alive, results):
+                    scores[i].append(result['mse'])
+                    costs[i] = (result['latency_us'], result['size_bytes'])
+
+                if rung < len(folds) - 1:
+                    keep = max(1, math.ceil(len(alive) / self.eta))
+                    alive = sorted(alive, key=lambda i: np.mean(scores[i]))[:keep]
+
+        trials = pd.DataFrame([{
+            'params': candidates[i],
+            'mse': float(np.mean(scores[i])),
+            'latency_us': costs[i][0],
+            'size_bytes': costs[i][1],
+            'folds': len(scores[i])
+        } for i in range(len(candidates))])
+        # Pruned trials were scored on early folds and fit on less data, so their
+        # error and costs are not comparable with the finalists'
+        finalists = trials['folds'] == trials['folds'].max()
+        trials['pareto'] = False
+        trials.loc[finalists, 'pareto'] = pareto_front(trials[finalists])
+        return trials
+
+    @staticmethod
+    def best(trials):
+        # Only trials that survived every fold compete; ties go to the cheaper model
+        finalists = trials[trials['folds'] == trials['folds'].max()]
+        return finalists.sort_values(['mse', 'latency_us', 'size_bytes']).iloc[0]
+
+    def tune(self, symbol, data, registry):
+        trials = self.search(data)
+        best = self.best(trials)
+        registry.save_params(symbol, best['params'])
+        self.logger.info(
+            f"Best params for {symbol}: {best['params']} "
+            f"(mse {best['mse']:.4f}, {best['latency_us']:.0f}us, {best['size_bytes']} bytes)"
+        )
+        return trials
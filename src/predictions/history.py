@@ -0,0 +1,156 @@
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from sqlalchemy import insert, select
+
+import config
+from metrics import PREDICTION_HISTORY_ROWS
+from predictions.models import PredictionRecord
+
+logger = logging.getLogger(__name__)
+
+def prediction_row(result, username=None):
+    return {
+        'symbol': result['symbol'],
+        'username': username,
+        'current_price': float(result['current_price']),
+        'predicted_price': float(result['predicted_price']),
+        'predicted_change_percent': float(result['predicted_change_percent']),
+        'confidence_score': float(result['confidence_score']),
+        'transaction_hash': result.get('transaction_hash'),
+        'created_at': datetime.fromisoformat(result['timestamp'])
+    }
+
+class PredictionWriter:
+    # Write-behind buffer for the predictions table: a background thread bulk-inserts
+    # every `max_batch` rows or `flush_interval` seconds, keeping at most `max_pending`
+
+    def __init__(self, session_factory, max_batch=None, flush_interval=None, max_pending=None):
+        self.session_factory = session_factory
+        self.max_batch = max_batch or config.PREDICTION_FLUSH_SIZE
+        self.flush_interval = flush_interval or config.PREDICTION_FLUSH_INTERVAL
+        self.max_pending = max_pending or config.PREDICTION_BUFFER_MAX
+        self._rows = deque()
+        self._oldest = None  # monotonic time the oldest buffered row arrived
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def pending(self):
+        return len(self._rows)
+
+    def add(self, result, username=None):
+        row = prediction_row(result, username)
+        with self._condition:
+            if len(self._rows) >= self.max_pending:
+                self._rows.popleft()
+                PREDICTION_HISTORY_ROWS.labels('dropped').inc()
+                logger.warning("Prediction buffer full; dropped the oldest row")
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            self._ensure_started()
+            if len(self._rows) >= self.max_batch:
+                self._condition.notify()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._condition:
+                rows = list(self._rows)
+                self._rows.clear()
+                self._oldest = None
+            if not rows:
+                return 0
+
+            session = self.session_factory()
+            try:
+                session.execute(insert(PredictionRecord), rows)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Failed to write {len(rows)} predictions: {str(e)}")
+                self._requeue(rows)
+                return 0
+            finally:
+                session.close()
+
+            PREDICTION_HISTORY_ROWS.labels('written').inc(len(rows))
+            return len(rows)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _ensure_started(self):
+        # Called with the condition held; the thread starts with the first row
+        if self._thread is None and not self._stopped:
+            self._thread = threading.Thread(target=self._run, name='prediction-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped and not self._due():
+                    timeout = None
+                    if self._oldest is not None:
+                        timeout = max(0.0, self._oldest + self.flush_interval - time.monotonic())
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+            if not self.flush():
+                # Back off instead of retrying a failing database in a tight loop
+                with self._condition:
+                    if not self._stopped:
+                        self._condition.wait(self.flush_interval)
+
+    def _due(self):
+        if not self._rows:
+            return False
+        return len(self._rows) >= self.max_batch or time.monotonic() - self._oldest >= self.flush_interval
+
+    def _requeue(self, rows):
+        with self._condition:
+            keep = self.max_pending - len(self._rows)
+            dropped = len(rows) - max(0, keep)
+            if dropped > 0:
+                rows = rows[dropped:]
+                PREDICTION_HISTORY_ROWS.labels('dropped').inc(dropped)
+            self._rows.extendleft(reversed(rows))
+            if self._rows:
+                self._oldest = time.monotonic()
+
+def history_query(symbol=None, username=None, start=None, end=None):
+    # Newest first; filtering by symbol or user walks the matching (column, created_at) index
+    query = select(PredictionRecord)
+    if symbol:
+        query = query.where(PredictionRecord.symbol == symbol)
+    if username:
+        query = query.where(PredictionRecord.username == username)
+    if start is not None:
+        query = query.where(PredictionRecord.created_at >= start)
+    if end is not None:
+        query = query.where(PredictionRecord.created_at <= end)
+    return query.order_by(PredictionRecord.created_at.desc(), PredictionRecord.id.desc())
+
+def serialize(record):
+    return {
+        'id': record.id,
+        'symbol': record.symbol,
+        'username': record.username,
+        'current_price': record.current_price,
+        'predicted_price': record.predicted_price,
+        'predicted_change_percent': record.predicted_change_percent,
+        'confidence_score': record.confidence_score,
+        'transaction_hash': record.transaction_hash,
+        'created_at': record.created_at.isoformat()
+    }
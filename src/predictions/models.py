@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
+from auth.models import Base
+
+class PredictionRecord(Base):
+    __tablename__ = "predictions"
+    __table_args__ = (
+        Index('ix_predictions_symbol_created', 'symbol', 'created_at'),
+        Index('ix_predictions_user_created', 'username', 'created_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    # Requesting user, when the prediction came in with a token
+    username = Column(String)
+    current_price = Column(Float)
+    predicted_price = Column(Float)
+    predicted_change_percent = Column(Float)
+    confidence_score = Column(Float)
+    transaction_hash = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import format_datetime, parsedate_to_datetime
+import pandas as pd
+
+import config
+from metrics import CACHE_REQUESTS, CACHE_EVICTIONS
+
+def as_utc(value):
+    # Naive timestamps (bars without a timezone, prediction times) are taken as UTC
+    timestamp = pd.Timestamp(value)
+    if timestamp.tz is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return timestamp.tz_convert('UTC').to_pydatetime()
+
+class ChartEntry:
+    def __init__(self, key, last_modified, body=None):
+        self.key = key
+        self.etag = '"' + hashlib.sha1(repr(key).encode()).hexdigest() + '"'
+        # HTTP dates have whole-second resolution
+        self.last_modified = as_utc(last_modified).replace(microsecond=0)
+        self.body = body
+
+    @property
+    def headers(self):
+        return {
+            'ETag': self.etag,
+            'Last-Modified': format_datetime(self.last_modified, usegmt=True),
+            # Authenticated content; the browser may keep it but has to revalidate each time
+            'Cache-Control': 'private, no-cache'
+        }
+
+    def not_modified(self, if_none_match=None, if_modified_since=None):
+        """Whether a request with these conditional headers can be answered with 304."""
+        if if_none_match is not None:
+            # If-None-Match wins over If-Modified-Since when both are sent
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or any(tag.replace('W/', '', 1) == self.etag for tag in tags)
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since is None or since.tzinfo is None:
+                return False
+            return self.last_modified <= since
+        return False
+
+class ChartCache:
+    # Rendered chart bodies in an LRU; keys change whenever the chart would, so entries never go stale
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or config.CHART_CACHE_SIZE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_REQUESTS.labels('charts', 'miss').inc()
+                return None
+            self._entries.move_to_end(key)
+            CACHE_REQUESTS.labels('charts', 'hit').inc()
+            return entry
+
+    def put(self, entry):
+        with self._lock:
+            self._entries[entry.key] = entry
+            self._entries.move_to_end(entry.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.labels('charts', 'capacity').inc()
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+def lttb_indices(x, y, threshold):
+    # Largest-Triangle-Three-Buckets: keeps the first and last points and the most
+    # significant point of every bucket in between; NaNs (indicator warm-up) are skipped
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(np.isfinite(y))
+    n = len(valid)
+    if threshold >= n or threshold < 3:
+        return valid
+
+    x, y = x[valid], y[valid]
+    # threshold - 2 buckets over the interior points; each holds at least one point
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        area = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return valid[selected]
+
+def aggregate_ohlc(data, buckets):
+    # Merges consecutive bars into at most `buckets` candles of equal bar counts
+    n = len(data)
+    if n <= buckets or buckets < 1:
+        return data
+
+    bounds = np.linspace(0, n, buckets + 1).astype(int)
+    starts, ends = bounds[:-1], bounds[1:] - 1
+    aggregated = {
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends],
+    }
+    if 'Volume' in data:
+        aggregated['Volume'] = np.add.reduceat(data['Volume'].to_numpy(), starts)
+    return pd.DataFrame(aggregated, index=data.index[starts])
+
+def viewport(data, start=None, end=None):
+    # Bars between `start` and `end` inclusive; either bound may be omitted
+    index = data.index
+
+    def bound(value):
+        value = pd.Timestamp(value)
+        if index.tz is not None and value.tz is None:
+            return value.tz_localize(index.tz)
+        if index.tz is None and value.tz is not None:
+            return value.tz_convert(None)
+        return value
+
+    lower = 0 if start is None else index.searchsorted(bound(start), side='left')
+    upper = len(index) if end is None else index.searchsorted(bound(end), side='right')
+    return data.iloc[lower:upper]
+
+def time_array(index):
+    # Epoch milliseconds, which Plotly reads as a typed array on date axes;
+    # aware indexes keep their wall-clock time, as date strings would
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[ms]').astype(np.float64)
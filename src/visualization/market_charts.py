@@ -1,11 +1,32 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
+from typing import Optional
 from datetime import datetime, timedelta
+from visualization.downsampling import lttb_indices, aggregate_ohlc, time_array
+
+# Numeric arrays are passed to Plotly as numpy arrays so they serialise as
+# base64 typed arrays; prices keep float64, everything else fits in float32
+PRICE_DTYPE = np.float64
+VALUE_DTYPE = np.float32
+
+def _line(data, column, max_points, dtype):
+    x = time_array(data.index)
+    y = data[column].to_numpy(dtype=dtype)
+    if max_points:
+        keep = lttb_indices(x, y, max_points)
+        x, y = x[keep], y[keep]
+    return {'x': x, 'y': y}
 
 class MarketVisualizer:
     @staticmethod
-    def create_price_prediction_chart(historical_data: pd.DataFrame, predictions: list):
+    def create_price_prediction_chart(historical_data: pd.DataFrame, predictions: list,
+                                      max_candles: Optional[int] = None):
+        if max_candles:
+            historical_data = aggregate_ohlc(historical_data, max_candles)
+        x = time_array(historical_data.index)
+
         fig = make_subplots(
             rows=2, cols=1,
             shared_xaxes=True,
@@ -17,11 +38,11 @@ class MarketVisualizer:
         # Add candlestick chart
         fig.add_trace(
             go.Candlestick(
-                x=historical_data.index,
-                open=historical_data['Open'],
-                high=historical_data['High'],
-                low=historical_data['Low'],
-                close=historical_data['Close'],
+                x=x,
+                open=historical_data['Open'].to_numpy(dtype=PRICE_DTYPE),
+                high=historical_data['High'].to_numpy(dtype=PRICE_DTYPE),
+                low=historical_data['Low'].to_numpy(dtype=PRICE_DTYPE),
+                close=historical_data['Close'].to_numpy(dtype=PRICE_DTYPE),
                 name='OHLC'
             ),
             row=1, col=1
@@ -30,8 +51,8 @@ class MarketVisualizer:
         # Add volume bar chart
         fig.add_trace(
             go.Bar(
-                x=historical_data.index,
-                y=historical_data['Volume'],
+                x=x,
+                y=historical_data['Volume'].to_numpy(dtype=VALUE_DTYPE),
                 name='Volume'
             ),
             row=2, col=1
@@ -59,11 +80,12 @@ class MarketVisualizer:
             yaxis2_title='Volume',
             xaxis_rangeslider_visible=False
         )
+        fig.update_xaxes(type='date')
 
         return fig
 
     @staticmethod
-    def create_technical_indicators_chart(data: pd.DataFrame):
+    def create_technical_indicators_chart(data: pd.DataFrame, max_points: Optional[int] = None):
         fig = make_subplots(
             rows=3, cols=1,
             shared_xaxes=True,
@@ -75,8 +97,7 @@ class MarketVisualizer:
         # Price and Moving Averages
         fig.add_trace(
             go.Scatter(
-                x=data.index,
-                y=data['Close'],
+                **_line(data, 'Close', max_points, PRICE_DTYPE),
                 name='Close'
             ),
             row=1, col=1
@@ -84,8 +105,7 @@ class MarketVisualizer:
         
         fig.add_trace(
             go.Scatter(
-                x=data.index,
-                y=data['SMA_20'],
+                **_line(data, 'SMA_20', max_points, PRICE_DTYPE),
                 name='SMA 20'
             ),
             row=1, col=1
@@ -94,8 +114,7 @@ class MarketVisualizer:
         # RSI
         fig.add_trace(
             go.Scatter(
-                x=data.index,
-                y=data['RSI'],
+                **_line(data, 'RSI', max_points, VALUE_DTYPE),
                 name='RSI'
             ),
             row=2, col=1
@@ -104,8 +123,7 @@ class MarketVisualizer:
         # MACD
         fig.add_trace(
             go.Scatter(
-                x=data.index,
-                y=data['MACD'],
+                **_line(data, 'MACD', max_points, VALUE_DTYPE),
                 name='MACD'
             ),
             row=3, col=1
@@ -113,8 +131,7 @@ class MarketVisualizer:
 
         fig.add_trace(
             go.Scatter(
-                x=data.index,
-                y=data['Signal_Line'],
+                **_line(data, 'Signal_Line', max_points, VALUE_DTYPE),
                 name='Signal Line'
             ),
             row=3, col=1
@@ -125,5 +142,6 @@ class MarketVisualizer:
             title='Technical Indicators',
             height=900
         )
+        fig.update_xaxes(type='date')
 
         return fig 
\ No newline at end of file
@@ -0,0 +1,36 @@
+import os
+import sys
+import pytest
+import numpy as np
+import pandas as pd
+
+# Modules under src/ import each other as top-level packages (e.g. `import config`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from src.data.indicators import FEATURE_COLUMNS
+
+@pytest.fixture
+def make_frame():
+    """Factory for random feature frames, with Close as a random walk so targets are learnable."""
+    def make(seed, periods=80):
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range(start='2024-01-01', periods=periods, freq='D')
+        data = pd.DataFrame(rng.uniform(100, 200, (periods, len(FEATURE_COLUMNS))), index=dates, columns=FEATURE_COLUMNS)
+        data['Close'] = 100 + np.cumsum(rng.normal(0, 1, periods))
+        return data
+    return make
+
+@pytest.fixture
+def make_bars():
+    """Factory for daily OHLCV bars with a steadily rising close."""
+    def make(start, periods):
+        dates = pd.date_range(start=start, periods=periods, freq='D', tz='UTC')
+        close = np.linspace(100, 100 + periods, periods)
+        return pd.DataFrame({
+            'Open': close - 1,
+            'High': close + 1,
+            'Low': close - 2,
+            'Close': close,
+            'Volume': np.full(periods, 1000.0)
+        }, index=dates)
+    return make
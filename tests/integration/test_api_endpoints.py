@@ -78,4 +78,11 @@ def test_chart_endpoint(test_client, auth_token):
     assert response.status_code == 200
     data = response.json()
     assert "data" in data
-    assert "layout" in data 
\ No newline at end of file
+    assert "layout" in data
+
+    # Unchanged charts are not rebuilt or resent
+    response = test_client.get(
+        "/chart/BTC-USD?chart_type=price",
+        headers={"Authorization": f"Bearer {auth_token}", "If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304 
\ No newline at end of file
@@ -0,0 +1,65 @@
+import time
+import pytest
+import jwt
+import config
+from datetime import timedelta
+from src.auth import jwt_handler
+from src.auth.jwt_handler import JWTHandler, TokenCache
+from src.auth.models import User
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(jwt_handler, 'token_cache', TokenCache(max_entries=2))
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, 'decode', counting_decode)
+    return calls
+
+def test_repeat_tokens_skip_decoding(decode_calls):
+    token = JWTHandler.create_access_token({'sub': 'alice'}, timedelta(minutes=5))
+
+    first = JWTHandler.decode_token(token)
+    assert first['sub'] == 'alice'
+    assert JWTHandler.decode_token(token) == first
+    assert len(decode_calls) == 1
+
+def test_invalid_tokens_are_not_cached(decode_calls):
+    assert JWTHandler.decode_token('not-a-token') is None
+    assert JWTHandler.decode_token('not-a-token') is None
+    assert len(decode_calls) == 2
+
+def test_cached_claims_expire():
+    cache = TokenCache(max_entries=2)
+    cache.put('old', {'sub': 'alice', 'exp': time.time() - 1})
+    cache.put('new', {'sub': 'bob', 'exp': time.time() + 60})
+
+    assert cache.get('old') is None
+    assert cache.get('new')['sub'] == 'bob'
+
+def test_cache_is_bounded():
+    cache = TokenCache(max_entries=2)
+    exp = time.time() + 60
+    cache.put('a', {'exp': exp})
+    cache.put('b', {'exp': exp})
+    cache.get('a')
+    cache.put('c', {'exp': exp})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+def test_hash_cost_is_configurable(monkeypatch):
+    monkeypatch.setattr(config, 'BCRYPT_ROUNDS', 4)
+    user = User(hashed_password=User.hash_password('secret'))
+
+    assert user.hashed_password.startswith('$2b$04$')
+    assert user.verify_password('secret')
+    assert not user.verify_password('wrong')
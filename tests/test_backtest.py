@@ -0,0 +1,35 @@
+import pytest
+from src.models.backtest import WalkForwardBacktester, walk_forward_splits, contract_won
+
+def test_walk_forward_splits():
+    assert list(walk_forward_splits(10, 4, 2)) == [(0, 4, 6), (2, 6, 8), (4, 8, 10)]
+    assert list(walk_forward_splits(10, 4, 2, expanding=True)) == [(0, 4, 6), (0, 6, 8), (0, 8, 10)]
+    assert list(walk_forward_splits(5, 4, 2)) == []
+
+def test_contract_win_rule():
+    # Integer division in resolvePrediction: 1.99% still wins, 2% loses
+    assert list(contract_won([100, 100, 100, 100], [101, 101.99, 102, 98])) == [True, True, False, False]
+    assert list(contract_won([1.00], [1.015], price_scale=100)) == [True]
+
+def test_backtest_reports_every_fold(make_frame):
+    backtester = WalkForwardBacktester(train_size=60, test_size=15, model_params={'n_estimators': 5}, n_jobs=2)
+    results = backtester.run({'BTC-USD': make_frame(0, periods=120), 'ETH-USD': make_frame(1, periods=120)})
+
+    # 119 samples: folds end at 75, 90, 105 for both modes and symbols
+    assert len(results) == 12
+    assert set(results['mode']) == {'rolling', 'expanding'}
+    rolling = results[(results['symbol'] == 'BTC-USD') & (results['mode'] == 'rolling')]
+    assert list(rolling['n_train']) == [60, 60, 60]
+    assert (rolling['test_start'] > rolling['train_end']).all()
+    assert results['hit_rate'].between(0, 1).all()
+    assert (results['rmse'] ** 2).values == pytest.approx(results['mse'].values)
+
+    summary = backtester.summarize(results)
+    assert summary.loc[('ETH-USD', 'expanding'), 'mae'] > 0
+
+def test_feature_matrix_is_cached(make_frame):
+    backtester = WalkForwardBacktester()
+    data = make_frame(0, periods=120)
+    X, *_ = backtester.feature_matrix('BTC-USD', data)
+    assert backtester.feature_matrix('BTC-USD', data)[0] is X
+    assert backtester.feature_matrix('BTC-USD', make_frame(0, periods=121))[0] is not X
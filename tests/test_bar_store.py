@@ -0,0 +1,336 @@
+import time
+import threading
+import pytest
+import pandas as pd
+import numpy as np
+import config
+from src.data.bar_store import BarStore
+from src.data.shared_frames import SharedFrameCache
+from src.data.frame_cache import FrameCache
+from src.data import market_data as market_data_module
+from src.data.market_data import MarketDataFetcher
+
+class FakeTicker:
+    calls = []
+    history_data = None
+    delay = 0
+    error = None
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, **kwargs):
+        FakeTicker.calls.append(kwargs)
+        time.sleep(FakeTicker.delay)
+        if FakeTicker.error is not None:
+            raise FakeTicker.error
+        data = FakeTicker.history_data
+        if 'start' in kwargs:
+            return data[data.index >= kwargs['start']]
+        return data
+
+def make_worker(root):
+    # Each worker process has its own fetcher over the same host directory
+    return MarketDataFetcher(store=BarStore(str(root)), shared=SharedFrameCache(str(root / '_frames')))
+
+@pytest.fixture
+def fake_ticker(monkeypatch):
+    FakeTicker.calls = []
+    FakeTicker.delay = 0
+    FakeTicker.error = None
+    monkeypatch.setattr(market_data_module.yf, 'Ticker', FakeTicker)
+    return FakeTicker
+
+def test_store_round_trip(tmp_path, make_bars):
+    store = BarStore(str(tmp_path))
+    bars = make_bars('2024-01-01', 10)
+    store.append('BTC-USD', '1d', bars)
+
+    stored = store.read('BTC-USD', '1d')
+    pd.testing.assert_frame_equal(stored, bars, check_freq=False)
+
+def test_store_later_segments_win(tmp_path, make_bars):
+    store = BarStore(str(tmp_path))
+    bars = make_bars('2024-01-01', 10)
+    store.append('BTC-USD', '1d', bars)
+
+    revised = bars.iloc[-1:].copy()
+    revised['Close'] = 999.0
+    store.append('BTC-USD', '1d', pd.concat([revised, make_bars('2024-01-11', 2)]))
+
+    stored = store.read('BTC-USD', '1d')
+    assert len(stored) == 12
+    assert stored['Close'].iloc[9] == 999.0
+
+def test_store_compaction(tmp_path, make_bars):
+    store = BarStore(str(tmp_path), max_segments=3)
+    for day in range(6):
+        store.append('ETH-USD', '1d', make_bars(pd.Timestamp('2024-01-01') + pd.Timedelta(days=day), 1))
+
+    path = store.partition_path('ETH-USD', '1d')
+    assert len(store._segments(path)) <= 3
+    assert len(store.read('ETH-USD', '1d')) == 6
+
+def test_incremental_fetch(tmp_path, fake_ticker, monkeypatch, make_bars):
+    monkeypatch.setattr(config, 'CACHE_DURATION', 0)
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=99), 100)
+
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path)))
+    first = fetcher.fetch_historical_data('BTC-USD', period='60d')
+    assert 'start' not in fake_ticker.calls[0]
+
+    # A fresh fetcher simulates a restart: only bars from the last stored one are requested
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=98), 100)
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path)))
+    second = fetcher.fetch_historical_data('BTC-USD', period='60d')
+
+    assert fake_ticker.calls[1]['start'] == first.index[-1]
+    assert second.index[-1] == first.index[-1] + pd.Timedelta(days=1)
+    assert list(second.columns) == list(first.columns)
+
+def test_longer_period_triggers_backfill(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=399), 400)
+
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path)))
+    fetcher.fetch_historical_data('BTC-USD', period='60d')
+    data = fetcher.fetch_historical_data('BTC-USD', period='1y')
+
+    assert fake_ticker.calls[1].get('period') == '1y'
+    assert len(data) > 300
+
+def test_incremental_indicators_match_full_recompute(tmp_path, fake_ticker, monkeypatch, make_bars):
+    monkeypatch.setattr(config, 'CACHE_DURATION', 0)
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    full = make_bars(today - pd.Timedelta(days=119), 120)
+    full['Close'] = full['Close'] + np.sin(np.arange(120)) * 5
+
+    fake_ticker.history_data = full.iloc[:-3]
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path)))
+    fetcher.fetch_historical_data('BTC-USD', period='3mo')
+
+    fake_ticker.history_data = full
+    fetcher.cache.clear()
+    data = fetcher.fetch_historical_data('BTC-USD', period='3mo')
+
+    # Indicators are cached as float32, so agreement is to float32 precision
+    expected = fetcher._compact(fetcher._process_data(full.copy()))
+    expected = expected[expected.index >= data.index[0]]
+    pd.testing.assert_frame_equal(data, expected, check_freq=False, rtol=1e-6)
+
+def test_multiple_symbols_match_single_fetch(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path / 'panel')))
+    results = fetcher.fetch_multiple_symbols(['BTC-USD', 'ETH-USD'], period='6mo')
+
+    single = MarketDataFetcher(store=BarStore(str(tmp_path / 'single')))
+    for symbol in ['BTC-USD', 'ETH-USD']:
+        expected = single.fetch_historical_data(symbol, period='6mo')
+        pd.testing.assert_frame_equal(results[symbol], expected, check_freq=False, rtol=1e-9)
+
+def test_overlapping_periods_share_one_buffer(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=399), 400)
+
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path)))
+    year = fetcher.fetch_historical_data('BTC-USD', period='1y')
+    usage = fetcher.memory_usage()
+
+    recent = fetcher.fetch_historical_data('BTC-USD', period='60d')
+    cached = fetcher.fetch_historical_data('BTC-USD', period='60d')
+
+    assert year['Close'].dtype == np.float64 and year['SMA_20'].dtype == np.float32
+    assert recent.index[-1] == year.index[-1] and len(recent) < len(year)
+    assert np.shares_memory(recent['Close'].to_numpy(), year['Close'].to_numpy())
+    assert np.shares_memory(cached['Close'].to_numpy(), recent['Close'].to_numpy())
+
+    # More period keys, same bars: memory does not grow
+    after = fetcher.memory_usage()
+    assert after['cache_entries'] == usage['cache_entries'] + 1
+    assert (after['frames'], after['bars'], after['bytes']) == (usage['frames'], usage['bars'], usage['bytes'])
+
+def test_workers_share_one_download(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+
+    first = make_worker(tmp_path).fetch_historical_data('BTC-USD', period='6mo')
+    second = make_worker(tmp_path).fetch_historical_data('BTC-USD', period='3mo')
+
+    assert len(fake_ticker.calls) == 1
+    assert second.index[-1] == first.index[-1] and len(second) < len(first)
+    pd.testing.assert_frame_equal(second, first.iloc[-len(second):])
+
+def test_prices_keep_full_precision(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    bars = make_bars(today - pd.Timedelta(days=199), 200)
+    bars['Close'] = 67123.45
+    fake_ticker.history_data = bars
+
+    data = make_worker(tmp_path).fetch_historical_data('BTC-USD', period='6mo')
+    assert data['Close'].iloc[-1] == 67123.45
+    assert data['RSI'].dtype == np.float32
+
+def test_integer_volume_is_shared(tmp_path, fake_ticker, make_bars):
+    # yfinance returns Volume as int64
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    bars = make_bars(today - pd.Timedelta(days=199), 200)
+    bars['Volume'] = bars['Volume'].astype(np.int64)
+    fake_ticker.history_data = bars
+
+    first = make_worker(tmp_path)
+    data = first.fetch_historical_data('BTC-USD', period='6mo')
+    assert data['Volume'].dtype == np.float32
+
+    shared, _ = SharedFrameCache(str(tmp_path / '_frames')).read('BTC-USD', '1d')
+    assert shared is not None
+    make_worker(tmp_path).fetch_historical_data('BTC-USD', period='6mo')
+    assert len(fake_ticker.calls) == 1
+
+def test_stale_frame_served_while_another_worker_refreshes(tmp_path, fake_ticker, monkeypatch, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+    make_worker(tmp_path).fetch_historical_data('BTC-USD', period='6mo')
+
+    monkeypatch.setattr(config, 'CACHE_DURATION', 0)
+    refreshing = SharedFrameCache(str(tmp_path / '_frames'))
+    with refreshing.refresh_lock('BTC-USD', '1d') as owner:
+        assert owner
+        data = make_worker(tmp_path).fetch_historical_data('BTC-USD', period='6mo')
+
+    assert len(fake_ticker.calls) == 1
+    assert not data.empty
+
+def test_waits_for_refresh_when_nothing_is_shared(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+    worker = make_worker(tmp_path)
+    results = []
+
+    refreshing = SharedFrameCache(str(tmp_path / '_frames'))
+    with refreshing.refresh_lock('BTC-USD', '1d') as owner:
+        assert owner
+        waiter = threading.Thread(
+            target=lambda: results.append(worker.fetch_historical_data('BTC-USD', period='6mo'))
+        )
+        waiter.start()
+        waiter.join(0.2)
+        assert waiter.is_alive()
+
+        # The refreshing worker publishes its frame before letting go of the lock
+        published = worker._compact(worker._process_data(fake_ticker.history_data))
+        refreshing.write('BTC-USD', '1d', published, coverage_start='max')
+
+    waiter.join(5)
+    assert len(results) == 1 and not results[0].empty
+    assert fake_ticker.calls == []
+
+def test_batch_skips_publishing_while_another_worker_refreshes(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+
+    refreshing = SharedFrameCache(str(tmp_path / '_frames'))
+    with refreshing.refresh_lock('BTC-USD', '1d') as owner:
+        assert owner
+        data = make_worker(tmp_path).fetch_multiple_symbols(['BTC-USD', 'ETH-USD'], period='6mo')
+
+    assert set(data) == {'BTC-USD', 'ETH-USD'}
+    assert refreshing.read('BTC-USD', '1d') == (None, None)
+    assert refreshing.read('ETH-USD', '1d')[0] is not None
+
+def test_publish_keeps_private_frame_when_superseded(tmp_path, fake_ticker, make_bars, monkeypatch):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+    worker = make_worker(tmp_path)
+    # Another worker's version replaced ours and was removed before we read it back
+    monkeypatch.setattr(worker.shared, 'read', lambda symbol, interval: (None, None))
+
+    data = worker.fetch_multiple_symbols(['BTC-USD'], period='6mo')
+    assert not data['BTC-USD'].empty
+    assert worker.fetch_historical_data('BTC-USD', period='6mo').equals(data['BTC-USD'])
+
+class ManualExecutor:
+    # Holds background refreshes until the test runs them
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, func, *args):
+        self.tasks.append((func, args))
+
+    def run_all(self):
+        tasks, self.tasks = self.tasks, []
+        for func, args in tasks:
+            func(*args)
+
+def test_concurrent_misses_share_one_download(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+    fake_ticker.delay = 0.2
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path)))
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(fetcher.fetch_historical_data('BTC-USD', period='6mo')))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(fake_ticker.calls) == 1
+    assert len(results) == 8 and all(result is results[0] or result.equals(results[0]) for result in results)
+
+def test_stale_entry_served_while_refreshing_in_background(tmp_path, fake_ticker, monkeypatch, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=200), 200)
+    refreshes = ManualExecutor()
+    fetcher = MarketDataFetcher(
+        store=BarStore(str(tmp_path)), shared=False, refresh_executor=refreshes
+    )
+    first = fetcher.fetch_historical_data('BTC-USD', period='6mo')
+
+    # The cache TTL follows CACHE_DURATION
+    monkeypatch.setattr(config, 'CACHE_DURATION', 0)
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+    stale = fetcher.fetch_historical_data('BTC-USD', period='6mo')
+    assert stale.index[-1] == first.index[-1]
+    assert len(fake_ticker.calls) == 1 and len(refreshes.tasks) == 1
+
+    # One background refresh per retry interval, however many requests see the stale entry
+    fetcher.fetch_historical_data('BTC-USD', period='6mo')
+    assert len(refreshes.tasks) == 1
+
+    refreshes.run_all()
+    monkeypatch.setattr(config, 'CACHE_DURATION', 3600)
+    fresh = fetcher.fetch_historical_data('BTC-USD', period='6mo')
+    assert fresh.index[-1] == today
+
+def test_stale_entry_served_while_upstream_fails(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path / 'a')), shared=False, cache=FrameCache(ttl=0))
+    first = fetcher.fetch_historical_data('BTC-USD', period='6mo')
+
+    # A new store forces a full download, which fails
+    fetcher.store = BarStore(str(tmp_path / 'b'))
+    fake_ticker.error = ConnectionError("yfinance unavailable")
+    data = fetcher._fetch_uncached('BTC-USD', '6mo', '1d')
+    assert data.index[-1] == first.index[-1]
+
+    with pytest.raises(ConnectionError):
+        fetcher.fetch_historical_data('ETH-USD', period='6mo')
+
+def test_evicted_frames_are_released(tmp_path, fake_ticker, make_bars):
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    fake_ticker.history_data = make_bars(today - pd.Timedelta(days=199), 200)
+    fetcher = MarketDataFetcher(store=BarStore(str(tmp_path)), cache=FrameCache(max_entries=2))
+
+    for symbol in ['A', 'B', 'C', 'D']:
+        fetcher.fetch_historical_data(symbol, period='6mo')
+
+    usage = fetcher.memory_usage()
+    assert usage['cache_entries'] == 2 and usage['frames'] == 2
+    assert set(fetcher._frames) == {'C_1d', 'D_1d'}
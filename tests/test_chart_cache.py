@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+import pandas as pd
+from src.visualization.chart_cache import ChartCache, ChartEntry, as_utc
+
+def entry(last_bar='2024-03-01', prediction=None):
+    key = ('BTC-USD', 'price', 1200, None, None, str(pd.Timestamp(last_bar)), prediction)
+    return ChartEntry(key, as_utc(last_bar), body='{}')
+
+def test_etag_follows_the_key():
+    assert entry().etag == entry().etag
+    assert entry().etag != entry(last_bar='2024-03-02').etag
+    assert entry().etag != entry(prediction='2024-03-01T12:00:00').etag
+
+def test_conditional_headers():
+    chart = entry(last_bar=pd.Timestamp('2024-03-01 10:30:15.5', tz='America/New_York'))
+    headers = chart.headers
+    assert headers['Last-Modified'] == 'Fri, 01 Mar 2024 15:30:15 GMT'
+
+    assert chart.not_modified(if_none_match=chart.etag)
+    assert chart.not_modified(if_none_match=f'"other", W/{chart.etag}')
+    assert chart.not_modified(if_none_match='*')
+    assert not chart.not_modified(if_none_match='"other"')
+    assert not chart.not_modified()
+
+    assert chart.not_modified(if_modified_since=headers['Last-Modified'])
+    assert not chart.not_modified(if_modified_since='Fri, 01 Mar 2024 15:30:14 GMT')
+    assert not chart.not_modified(if_modified_since='not a date')
+    # A matching date does not override a stale ETag
+    assert not chart.not_modified(if_none_match='"other"', if_modified_since=headers['Last-Modified'])
+
+def test_as_utc_treats_naive_as_utc():
+    assert as_utc('2024-03-01T12:00:00') == datetime(2024, 3, 1, 12, tzinfo=timezone.utc)
+
+def test_cache_evicts_least_recently_used():
+    cache = ChartCache(max_entries=2)
+    first, second, third = entry('2024-03-01'), entry('2024-03-02'), entry('2024-03-03')
+    cache.put(first)
+    cache.put(second)
+    assert cache.get(first.key) is first
+
+    cache.put(third)
+    assert len(cache) == 2
+    assert cache.get(second.key) is None
+    assert cache.get(first.key) is first
+    assert cache.get(third.key) is third
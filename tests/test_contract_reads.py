@@ -0,0 +1,122 @@
+import pytest
+from eth_abi import encode, decode
+from web3 import Web3
+from src.blockchain.reads import ContractReader, ContractReadError, AGGREGATE3_SELECTOR
+
+CONTRACT = '0x' + '12' * 20
+MULTICALL = '0x' + '34' * 20
+MARKETS_ABI = [{
+    'type': 'function', 'name': 'markets', 'stateMutability': 'view',
+    'inputs': [{'name': '', 'type': 'bytes32'}],
+    'outputs': [
+        {'name': 'symbol', 'type': 'string'}, {'name': 'minimumStake', 'type': 'uint256'},
+        {'name': 'rewardMultiplier', 'type': 'uint256'}, {'name': 'active', 'type': 'bool'}
+    ]
+}]
+MARKETS_SELECTOR = bytes(Web3.keccak(text='markets(bytes32)')[:4])
+
+def market_id(symbol):
+    return bytes(Web3.solidity_keccak(['string'], [symbol]))
+
+class FakeEth:
+    """Answers Multicall3 aggregate3 calls against an in-memory markets mapping."""
+
+    def __init__(self, markets):
+        self.markets = markets
+        self.block_number = 100
+        self.calls = []
+        self.code = {MULTICALL: b'\x60\x80'}
+
+    def get_code(self, address):
+        return self.code.get(address, b'')
+
+    def call(self, transaction, block_identifier='latest'):
+        self.calls.append(block_identifier)
+        data = transaction['data']
+        assert transaction['to'] == MULTICALL and data[:4] == bytes(AGGREGATE3_SELECTOR)
+        (calls,) = decode(['(address,bool,bytes)[]'], data[4:])
+        results = []
+        for target, allow_failure, call_data in calls:
+            assert call_data[:4] == MARKETS_SELECTOR
+            (key,) = decode(['bytes32'], call_data[4:])
+            market = self.markets.get(key)
+            if market is None:
+                results.append((False, b''))
+            else:
+                results.append((True, encode(['string', 'uint256', 'uint256', 'bool'], list(market))))
+        return encode(['(bool,bytes)[]'], [results])
+
+class FakeProvider:
+    """Answers JSON-RPC batches of eth_call with one fixed market."""
+
+    def __init__(self):
+        self.batches = []
+
+    def make_batch_request(self, requests):
+        self.batches.append(requests)
+        result = '0x' + encode(['string', 'uint256', 'uint256', 'bool'], ['X', 1, 2, True]).hex()
+        return [{'jsonrpc': '2.0', 'id': i, 'result': result} for i, _ in enumerate(requests)]
+
+class FakeWeb3:
+    def __init__(self, markets):
+        self.eth = FakeEth(markets)
+        self.provider = FakeProvider()
+
+@pytest.fixture
+def w3():
+    return FakeWeb3({
+        market_id('BTC'): ('BTC', 10, 150, True),
+        market_id('ETH'): ('ETH', 5, 120, True)
+    })
+
+def reader_for(w3, **kwargs):
+    return ContractReader(w3, CONTRACT, MARKETS_ABI, multicall_address=MULTICALL, block_refresh=0, **kwargs)
+
+def test_many_reads_in_one_call(w3):
+    reader = reader_for(w3)
+    results = reader.call_many([('markets', (market_id(s),)) for s in ['BTC', 'ETH', 'BTC']])
+    assert [r[0] for r in results] == ['BTC', 'ETH', 'BTC']
+    assert w3.eth.calls == [100]
+
+def test_cache_is_dropped_on_new_block(w3):
+    reader = reader_for(w3)
+    assert reader.call('markets', market_id('BTC'))[2] == 150
+    assert reader.call('markets', market_id('BTC'))[2] == 150
+    assert len(w3.eth.calls) == 1
+
+    w3.eth.markets[market_id('BTC')] = ('BTC', 10, 200, True)
+    w3.eth.block_number = 101
+    assert reader.call('markets', market_id('BTC'))[2] == 200
+    assert w3.eth.calls == [100, 101]
+
+def test_failed_reads_are_reported_per_call(w3):
+    reader = reader_for(w3, max_batch=1)
+    btc, missing = reader.call_many([('markets', (market_id('BTC'),)), ('markets', (market_id('DOGE'),))])
+    assert btc[0] == 'BTC'
+    assert isinstance(missing, ContractReadError)
+    with pytest.raises(ContractReadError):
+        reader.call('markets', market_id('DOGE'))
+
+def test_json_rpc_batch_fallback(w3):
+    reader = ContractReader(w3, CONTRACT, MARKETS_ABI, multicall_address='', block_refresh=0)
+    results = reader.call_many([('markets', (market_id(s),)) for s in ['BTC', 'ETH']])
+
+    batches = w3.provider.batches
+    assert len(batches) == 1 and len(batches[0]) == 2
+    assert batches[0][0] == ('eth_call', [{'to': CONTRACT, 'data': '0x' + reader._encode('markets', (market_id('BTC'),)).hex()}, hex(100)])
+    assert [r[0] for r in results] == ['X', 'X']
+    assert w3.eth.calls == []
+
+def test_multicall_without_code_uses_batches(w3):
+    # The docker-compose dev chain has no Multicall3 deployed
+    w3.eth.code = {}
+    reader = reader_for(w3)
+    assert reader.call('markets', market_id('BTC'))[0] == 'X'
+    assert reader.call('markets', market_id('ETH'))[0] == 'X'
+    assert len(w3.provider.batches) == 2 and w3.eth.calls == []
+
+def test_undecodable_multicall_response_fails_each_call(w3, monkeypatch):
+    monkeypatch.setattr(w3.eth, 'call', lambda transaction, block_identifier='latest': b'')
+    reader = reader_for(w3)
+    results = reader.call_many([('markets', (market_id(s),)) for s in ['BTC', 'ETH']])
+    assert all(isinstance(result, ContractReadError) for result in results)
@@ -0,0 +1,43 @@
+import asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import config
+from src.database import async_url, engine_options, is_sqlite
+from auth.models import Base, User
+
+def test_async_url_picks_async_drivers():
+    assert async_url('sqlite:///./prediction_market.db') == 'sqlite+aiosqlite:///./prediction_market.db'
+    assert async_url('postgresql://postgres:postgres@db:5432/prediction_market') == \
+        'postgresql+asyncpg://postgres:postgres@db:5432/prediction_market'
+    # An explicit driver is left alone
+    assert async_url('postgresql+psycopg://u:p@db/app') == 'postgresql+psycopg://u:p@db/app'
+
+def test_pool_options_only_for_server_databases(monkeypatch):
+    monkeypatch.setattr(config, 'DB_POOL_SIZE', 3)
+    assert is_sqlite('sqlite:///x.db')
+    assert engine_options('sqlite:///x.db') == {'connect_args': {'check_same_thread': False}}
+
+    options = engine_options('postgresql://u:p@db/app')
+    assert 'connect_args' not in options
+    assert options['pool_size'] == 3
+    assert options['pool_pre_ping'] is config.DB_POOL_PRE_PING
+
+def test_async_session_roundtrip(tmp_path):
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+
+    async def roundtrip():
+        engine = create_async_engine(async_url(url), **engine_options(url))
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            sessions = async_sessionmaker(engine, expire_on_commit=False)
+            async with sessions() as db:
+                db.add(User(email='a@example.com', username='alice', hashed_password='x'))
+                await db.commit()
+            async with sessions() as db:
+                return (await db.execute(select(User).where(User.username == 'alice'))).scalars().first()
+        finally:
+            await engine.dispose()
+
+    user = asyncio.run(roundtrip())
+    assert user.email == 'a@example.com'
@@ -0,0 +1,94 @@
+import json
+import pytest
+import numpy as np
+import pandas as pd
+from src.visualization.downsampling import lttb_indices, aggregate_ohlc, viewport, time_array
+from src.visualization.market_charts import MarketVisualizer
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(3)
+    dates = pd.date_range(start='2020-01-01', periods=5000, freq='h')
+    close = 1.1 + np.cumsum(rng.normal(0, 0.001, len(dates)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = rng.uniform(0, 0.002, len(dates))
+    data = pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.uniform(1e3, 1e4, len(dates))
+    }, index=dates)
+    data['SMA_20'] = data['Close'].rolling(20).mean()
+    data['RSI'] = 50 + rng.normal(0, 10, len(dates))
+    data['MACD'] = rng.normal(0, 0.001, len(dates))
+    data['Signal_Line'] = data['MACD'].rolling(9).mean()
+    return data
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(1000, dtype=float)
+    y = np.sin(x / 50)
+    y[437] = 10.0  # A spike must survive downsampling
+
+    keep = lttb_indices(x, y, 100)
+
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.all(np.diff(keep) > 0)
+    assert 437 in keep
+
+def test_lttb_skips_nans_and_small_inputs():
+    y = np.array([np.nan, np.nan, 1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(lttb_indices(np.arange(5), y, 10), [2, 3, 4])
+
+    y = np.concatenate([[np.nan] * 10, np.arange(100.0)])
+    keep = lttb_indices(np.arange(110), y, 20)
+    assert len(keep) == 20
+    assert keep[0] == 10 and keep[-1] == 109
+
+def test_aggregate_ohlc(bars):
+    candles = aggregate_ohlc(bars, 100)
+
+    assert len(candles) == 100
+    assert candles.index[0] == bars.index[0]
+    bucket = bars.iloc[:50]
+    first = candles.iloc[0]
+    assert first['Open'] == bucket['Open'].iloc[0]
+    assert first['Close'] == bucket['Close'].iloc[-1]
+    assert first['High'] == bucket['High'].max()
+    assert first['Low'] == bucket['Low'].min()
+    assert candles['Volume'].sum() == pytest.approx(bars['Volume'].sum())
+    assert candles['Close'].iloc[-1] == bars['Close'].iloc[-1]
+
+    assert len(aggregate_ohlc(bars.iloc[:10], 100)) == 10
+
+def test_viewport_handles_timezones(bars):
+    window = viewport(bars, '2020-02-01', '2020-02-02')
+    assert window.index[0] == pd.Timestamp('2020-02-01')
+    assert window.index[-1] == pd.Timestamp('2020-02-02')
+
+    aware = bars.tz_localize('UTC')
+    assert len(viewport(aware, start='2020-02-01')) == len(viewport(bars, start='2020-02-01'))
+    assert len(viewport(bars)) == len(bars)
+
+def test_time_array_is_epoch_milliseconds():
+    index = pd.DatetimeIndex(['2020-01-01', '2020-01-02']).tz_localize('America/New_York')
+    np.testing.assert_array_equal(time_array(index), [1577836800000.0, 1577923200000.0])
+
+def test_chart_payload_scales_with_width(bars):
+    predictions = [{'timestamp': '2020-07-27T00:00:00', 'predicted_price': 1.1}]
+    small = MarketVisualizer.create_price_prediction_chart(bars, predictions, max_candles=100)
+    candles = json.loads(small.to_json())['data'][0]
+
+    # Numeric arrays are sent as base64 typed arrays on a date axis
+    assert candles['x']['dtype'] == 'f8'
+    assert candles['close']['dtype'] == 'f8'
+    assert json.loads(small.to_json())['layout']['xaxis']['type'] == 'date'
+    assert len(small.data[0].x) == 100
+
+    full = MarketVisualizer.create_price_prediction_chart(bars, predictions)
+    assert len(small.to_json()) < len(full.to_json()) / 10
+
+    technical = MarketVisualizer.create_technical_indicators_chart(bars, max_points=200)
+    assert all(len(trace.x) == 200 for trace in technical.data)
+    assert json.loads(technical.to_json())['data'][2]['y']['dtype'] == 'f4'
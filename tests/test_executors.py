@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import pytest
+from src.executors import BoundedExecutor, ExecutorSaturated
+
+@pytest.fixture
+def executor():
+    executor = BoundedExecutor('test', max_workers=1, max_pending=2)
+    yield executor
+    executor.shutdown(wait=False)
+
+def test_run_returns_result(executor):
+    assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+    assert executor.pending == 0
+
+def test_rejects_when_saturated(executor):
+    release = threading.Event()
+    futures = [executor.submit(release.wait), executor.submit(release.wait)]
+
+    with pytest.raises(ExecutorSaturated):
+        executor.submit(release.wait)
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert executor.pending == 0
+
+def test_timeout_keeps_slot_until_work_finishes(executor):
+    release = threading.Event()
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(executor.run(release.wait, timeout=0.05))
+    # The blocking call is still running in its thread and still holds its slot
+    assert executor.pending == 1
+
+    release.set()
+    executor.submit(lambda: None).result(timeout=5)
+    assert executor.pending == 0
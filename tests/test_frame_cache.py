@@ -0,0 +1,77 @@
+import pandas as pd
+import numpy as np
+from src.data import frame_cache as frame_cache_module
+from src.data.frame_cache import FrameCache
+
+def make_frame(periods=100):
+    dates = pd.date_range('2024-01-01', periods=periods, freq='D', tz='UTC')
+    return pd.DataFrame({'Close': np.arange(periods, dtype=np.float32)}, index=dates)
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+def test_fresh_then_stale_then_expired(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(frame_cache_module.time, 'time', clock.time)
+    released = []
+    cache = FrameCache(ttl=10, stale_ttl=100, retry_interval=30, on_release=released.append)
+    frame = make_frame()
+    cache.put('BTC-USD_60d_1d', frame, 40)
+
+    view, refresh = cache.get('BTC-USD_60d_1d')
+    assert len(view) == 60 and not refresh
+
+    # Stale: still served, but only the first caller is asked to refresh
+    clock.now += 20
+    assert cache.get('BTC-USD_60d_1d')[1]
+    view, refresh = cache.get('BTC-USD_60d_1d')
+    assert view is not None and not refresh
+    clock.now += 30
+    assert cache.get('BTC-USD_60d_1d')[1]
+
+    clock.now += 100
+    assert cache.get('BTC-USD_60d_1d') == (None, False)
+    assert released == [frame] and len(cache) == 0 and cache.bytes == 0
+
+def test_stale_fallback_counts_as_attempt(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(frame_cache_module.time, 'time', clock.time)
+    cache = FrameCache(ttl=10, stale_ttl=100, retry_interval=30)
+    cache.put('BTC-USD_60d_1d', make_frame(), 0)
+    assert cache.get_stale('BTC-USD_60d_1d') is not None
+
+    clock.now += 20
+    assert cache.get_stale('BTC-USD_60d_1d') is not None
+    assert not cache.get('BTC-USD_60d_1d')[1]
+    assert cache.get_stale('ETH-USD_60d_1d') is None
+
+def test_entry_limit_evicts_least_recently_used():
+    released = []
+    cache = FrameCache(max_entries=2, on_release=released.append)
+    frames = [make_frame() for _ in range(3)]
+    cache.put('A_1y_1d', frames[0], 0)
+    cache.put('B_1y_1d', frames[1], 0)
+    cache.get('A_1y_1d')
+    cache.put('C_1y_1d', frames[2], 0)
+
+    assert 'A_1y_1d' in cache and 'B_1y_1d' not in cache
+    assert released == [frames[1]]
+
+def test_byte_budget_counts_shared_frames_once():
+    frame = make_frame()
+    size = int(frame.memory_usage(index=True).sum())
+    cache = FrameCache(max_bytes=2 * size)
+
+    # Periods of one symbol share its frame
+    for period, offset in [('1y', 0), ('60d', 40), ('5d', 95)]:
+        cache.put(f"A_{period}_1d", frame, offset)
+    assert len(cache) == 3 and cache.bytes == size
+
+    cache.put('B_1y_1d', make_frame(), 0)
+    cache.put('C_1y_1d', make_frame(), 0)
+    assert cache.bytes <= 2 * size
+    assert 'C_1y_1d' in cache and 'A_1y_1d' not in cache
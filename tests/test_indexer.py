@@ -0,0 +1,137 @@
+import pytest
+from eth_abi import encode
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.orm import sessionmaker
+# Imported by the same module names the indexer uses, so the tables are declared only once
+from auth.models import Base
+from blockchain.models import ChainPrediction
+from blockchain.indexer import ChainIndexer, EVENTS, event_topic, prediction_history, leaderboard
+
+ALICE = '0x' + 'aa' * 20
+BOB = '0x' + 'bb' * 20
+
+class FakeEth:
+    def __init__(self, chain):
+        self.chain = chain
+
+    @property
+    def block_number(self):
+        return len(self.chain.blocks) - 1
+
+    def get_block(self, number):
+        return {'number': number, 'hash': self.chain.blocks[number]['hash']}
+
+    def get_logs(self, params):
+        start, end = params['fromBlock'], params['toBlock']
+        self.chain.ranges.append((start, end))
+        if end - start + 1 > self.chain.max_range:
+            raise ValueError('block range too large')
+        return [log for block in self.chain.blocks[start:end + 1] for log in block['logs']]
+
+class FakeChain:
+    """Local stand-in for a node: blocks of PredictionMarket logs, with forks on demand."""
+
+    def __init__(self, max_range=1000):
+        self.blocks = [{'hash': '0x' + '00' * 32, 'logs': []}]
+        self.max_range = max_range
+        self.ranges = []
+        self.forks = 0
+        self.eth = FakeEth(self)
+
+    def mine(self, *events):
+        number = len(self.blocks)
+        block_hash = '0x' + f"{self.forks:02x}{number:062x}"
+        logs = [{
+            'topics': [bytes(event_topic(name))],
+            'data': encode(EVENTS[name], list(values)),
+            'blockNumber': number,
+            'blockHash': block_hash,
+            'transactionHash': '0x' + f"{number:032x}{i:032x}",
+            'logIndex': i
+        } for i, (name, *values) in enumerate(events)]
+        self.blocks.append({'hash': block_hash, 'logs': logs})
+
+    def mine_empty(self, count):
+        for _ in range(count):
+            self.mine()
+
+    def reorg(self, depth):
+        self.forks += 1
+        del self.blocks[-depth:]
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+def placed(user, symbol, price, stake=10):
+    return ('PredictionPlaced', user, symbol, price, stake)
+
+def resolved(user, symbol, price, actual, won):
+    return ('PredictionResolved', user, symbol, price, actual, won)
+
+def test_indexes_history_and_leaderboard(session_factory):
+    chain = FakeChain()
+    chain.mine(('MarketCreated', 'BTC', 1, 150))
+    chain.mine(placed(ALICE, 'BTC', 100), placed(BOB, 'BTC', 200), placed(ALICE, 'BTC', 100))
+    chain.mine(resolved(ALICE, 'BTC', 100, 101, True), resolved(BOB, 'BTC', 200, 150, False))
+
+    indexer = ChainIndexer(chain, '0x0', session_factory, reorg_depth=3)
+    assert indexer.index_once() == 6
+    assert indexer.index_once() == 0
+
+    session = session_factory()
+    history = prediction_history(session, user=ALICE.upper().replace('0X', '0x'))
+    assert [row['prediction_index'] for row in history] == [2, 0]
+    # Identical open predictions resolve oldest first
+    assert [row['won'] for row in history] == [None, True]
+
+    board = leaderboard(session)
+    assert board[0]['user'] == ALICE and board[0]['wins'] == 1 and board[0]['win_rate'] == 1.0
+    assert board[1]['user'] == BOB and board[1]['win_rate'] == 0.0
+
+def test_adaptive_chunks(session_factory):
+    chain = FakeChain(max_range=8)
+    chain.mine_empty(40)
+    chain.mine(placed(ALICE, 'BTC', 100))
+
+    indexer = ChainIndexer(chain, '0x0', session_factory, chunk_size=32, max_chunk_size=64)
+    assert indexer.index_once() == 1
+    # Rejected ranges were halved until the node accepted them
+    assert chain.ranges[:2] == [(0, 31), (0, 15)]
+    assert all(end - start < 8 for start, end in chain.ranges[2:])
+    assert indexer.chunk_size == 8
+
+def test_reorg_rolls_back_and_reindexes(session_factory):
+    chain = FakeChain()
+    chain.mine(placed(ALICE, 'BTC', 100))
+    chain.mine(placed(BOB, 'BTC', 200))
+    chain.mine(resolved(ALICE, 'BTC', 100, 100, True))
+
+    indexer = ChainIndexer(chain, '0x0', session_factory, reorg_depth=5)
+    indexer.index_once()
+
+    # The last two blocks are replaced by a fork with different contents
+    chain.reorg(2)
+    chain.mine(placed(ALICE, 'BTC', 300))
+    chain.mine_empty(2)
+    indexer.index_once()
+
+    session = session_factory()
+    rows = session.execute(select(ChainPrediction).order_by(ChainPrediction.prediction_index)).scalars().all()
+    assert [(row.user, int(row.predicted_price)) for row in rows] == [(ALICE, 100), (ALICE, 300)]
+    assert [row.prediction_index for row in rows] == [0, 1]
+    assert not rows[0].resolved
+
+def test_restart_resumes_from_checkpoint(session_factory):
+    chain = FakeChain()
+    chain.mine(placed(ALICE, 'BTC', 100))
+    ChainIndexer(chain, '0x0', session_factory).index_once()
+
+    chain.mine(placed(BOB, 'BTC', 200))
+    ChainIndexer(chain, '0x0', session_factory).index_once()
+
+    session = session_factory()
+    assert session.execute(select(func.count()).select_from(ChainPrediction)).scalar() == 2
+    assert session.execute(select(func.max(ChainPrediction.prediction_index))).scalar() == 1
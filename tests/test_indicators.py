@@ -0,0 +1,63 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.data.indicators import (
+    INDICATOR_COLUMNS, IndicatorEngine, IndicatorState, compute_indicators
+)
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    dates = pd.date_range(start='2023-01-01', periods=300, freq='D')
+    close = 30000 + np.cumsum(rng.normal(0, 150, len(dates)))
+    # A flat stretch exercises the zero-gain/zero-loss RSI branch
+    close[100:120] = close[100]
+    return pd.DataFrame({
+        'Close': close,
+        'Volume': rng.uniform(1e6, 5e6, len(dates))
+    }, index=dates)
+
+def stream(state, data):
+    return pd.DataFrame(
+        [state.update(row.Close, row.Volume) for row in data.itertuples()],
+        index=data.index
+    )
+
+def assert_matches(streamed, expected):
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(
+            streamed[column].to_numpy(), expected[column].to_numpy(),
+            rtol=1e-7, atol=1e-6, err_msg=column
+        )
+
+def test_streaming_matches_pandas(bars):
+    expected = compute_indicators(bars.copy())
+    streamed = stream(IndicatorState(), bars)
+    assert_matches(streamed, expected)
+
+def test_warm_start_from_history(bars):
+    expected = compute_indicators(bars.copy())
+    state = IndicatorState.from_history(bars.iloc[:200])
+    streamed = stream(state, bars.iloc[200:])
+    assert_matches(streamed, expected.iloc[200:])
+
+def test_revise_last_bar(bars):
+    state = IndicatorState.from_history(bars.iloc[:-1])
+    state.update(bars['Close'].iloc[-1] * 1.5, 1.0)
+    values = state.revise(bars['Close'].iloc[-1], bars['Volume'].iloc[-1])
+
+    expected = compute_indicators(bars.copy()).iloc[-1]
+    for column in INDICATOR_COLUMNS:
+        assert values[column] == pytest.approx(expected[column], rel=1e-7)
+
+def test_checkpoint_and_restore(bars, tmp_path):
+    engine = IndicatorEngine()
+    engine.prime('BTC-USD_1d', bars.iloc[:250])
+    path = str(tmp_path / 'indicators.json')
+    engine.checkpoint(path)
+
+    restored = IndicatorEngine()
+    restored.restore(path)
+    for row in bars.iloc[250:].itertuples():
+        original = engine.update('BTC-USD_1d', row.Close, row.Volume)
+        assert restored.update('BTC-USD_1d', row.Close, row.Volume) == pytest.approx(original, nan_ok=True)
@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from src.metrics import MetricsRegistry, Counter, Gauge, Histogram
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+def test_counter_and_gauge_exposition(registry):
+    requests = Counter('cache_requests', 'Cache lookups', ['cache', 'result'], registry=registry)
+    requests.labels('models', 'hit').inc()
+    requests.labels('models', 'hit').inc(2)
+    pending = Gauge('pending', 'Queued work', registry=registry)
+    pending.set_function(lambda: 7)
+
+    text = registry.render()
+    assert '# TYPE cache_requests counter' in text
+    assert 'cache_requests_total{cache="models",result="hit"} 3.0' in text
+    assert 'pending 7.0' in text
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = Histogram('stage_seconds', 'Stage latency', ['stage'], buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.labels('fetch').observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'stage_seconds_bucket{stage="fetch",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="1.0"} 3' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="+Inf"} 4' in lines
+    assert 'stage_seconds_count{stage="fetch"} 4' in lines
+    assert 'stage_seconds_sum{stage="fetch"} 6.05' in lines
+
+def test_label_count_is_checked(registry):
+    counter = Counter('events', 'Events', ['kind'], registry=registry)
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        counter.labels('a', 'b')
+
+def test_timer_spans_await(registry):
+    latency = Histogram('wait_seconds', 'Wait', registry=registry)
+
+    async def wait():
+        with latency.time():
+            await asyncio.sleep(0.01)
+
+    asyncio.run(wait())
+    counts, total = latency.labels().snapshot()
+    assert sum(counts) == 1 and total >= 0.01
@@ -0,0 +1,82 @@
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from src.models.prediction_model import MarketPredictionModel
+from src.models.model_registry import ModelRegistry
+
+@pytest.fixture
+def training_data():
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.uniform(100, 200, (120, 5)), columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+    target = features['Close'].shift(-1).fillna(150).values
+    return features, target
+
+def trained_model(training_data, n_estimators=5):
+    model = MarketPredictionModel()
+    model.model.set_params(n_estimators=n_estimators)
+    model.train(*training_data)
+    return model
+
+def test_lazy_load_latest_version(tmp_path, training_data):
+    writer = ModelRegistry(model_dir=str(tmp_path))
+    writer.save('BTC-USD', trained_model(training_data), version='20240101')
+    writer.save('BTC-USD', trained_model(training_data), version='20240102093000')
+    writer.save('ETH-USD', trained_model(training_data), version='20240103')
+
+    # A fresh registry (another worker) only loads what it is asked for
+    reader = ModelRegistry(model_dir=str(tmp_path))
+    assert reader.versions('BTC-USD') == ['20240101', '20240102093000']
+    assert reader.memory_usage()['models'] == 0
+
+    model = reader.get('BTC-USD')
+    assert reader.current_version('BTC-USD') == '20240102093000'
+    assert reader.get('BTC-USD') is model
+    assert reader.memory_usage()['models'] == 1
+
+def test_missing_symbol(tmp_path):
+    with pytest.raises(KeyError):
+        ModelRegistry(model_dir=str(tmp_path)).get('BTC-USD')
+
+def test_lru_eviction(tmp_path, training_data):
+    registry = ModelRegistry(model_dir=str(tmp_path), max_models=2)
+    for symbol in ['A', 'B', 'C']:
+        registry.save(symbol, trained_model(training_data), version='20240101')
+
+    assert registry.memory_usage()['models'] == 2
+    # Evicted models are transparently reloaded from disk
+    assert registry.get('A') is not None
+    assert os.path.exists(registry.artifact_path('A', '20240101'))
+
+def test_memory_budget(tmp_path, training_data):
+    model = trained_model(training_data)
+    registry = ModelRegistry(model_dir=str(tmp_path), max_bytes=1)
+    registry.save('A', model, version='20240101')
+    registry.save('B', trained_model(training_data), version='20240101')
+
+    # The newest model stays resident even when it alone exceeds the budget
+    assert registry.memory_usage()['models'] == 1
+
+def test_publish_swaps_version(tmp_path, training_data):
+    registry = ModelRegistry(model_dir=str(tmp_path))
+    old = trained_model(training_data)
+    registry.save('BTC-USD', old, version='20240101')
+    assert registry.get('BTC-USD') is old
+
+    new = trained_model(training_data, n_estimators=3)
+    registry.save('BTC-USD', new, version='20240102')
+    assert registry.get('BTC-USD') is new
+    assert registry.get('BTC-USD', version='20240101') is old
+
+def test_other_workers_pick_up_new_versions(tmp_path, training_data):
+    trainer = ModelRegistry(model_dir=str(tmp_path))
+    trainer.save('BTC-USD', trained_model(training_data), version='20240101')
+
+    api_worker = ModelRegistry(model_dir=str(tmp_path), check_interval=0)
+    idle_worker = ModelRegistry(model_dir=str(tmp_path), check_interval=3600)
+    assert api_worker.current_version('BTC-USD') == idle_worker.current_version('BTC-USD') == '20240101'
+
+    trainer.save('BTC-USD', trained_model(training_data, n_estimators=3), version='20240102')
+    assert api_worker.get('BTC-USD').model.n_estimators == 3
+    # Within the check interval the known version keeps being served
+    assert idle_worker.current_version('BTC-USD') == '20240101'
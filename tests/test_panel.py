@@ -0,0 +1,48 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.data.panel import MarketPanel, compute_panel_indicators
+from src.data.market_data import MarketDataFetcher
+
+def make_frame(periods, seed, start='2023-01-01'):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start=start, periods=periods, freq='D', tz='UTC')
+    close = 100 + np.cumsum(rng.normal(0, 2, periods))
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 1, periods),
+        'High': close + 2,
+        'Low': close - 2,
+        'Close': close,
+        'Volume': rng.integers(1000, 5000, periods)
+    }, index=dates)
+
+@pytest.fixture
+def frames():
+    # Uneven history lengths exercise the front padding
+    return {
+        'BTC-USD': make_frame(300, 1),
+        'ETH-USD': make_frame(120, 2, start='2023-06-01'),
+        'NEW-USD': make_frame(10, 3, start='2023-12-20')
+    }
+
+def test_round_trip(frames):
+    panel = MarketPanel.from_frames(frames)
+    assert panel.values.shape == (3, 300, 5)
+    for symbol, frame in panel.to_frames().items():
+        pd.testing.assert_frame_equal(frame, frames[symbol], check_freq=False)
+
+def test_panel_indicators_match_per_symbol(frames):
+    fetcher = MarketDataFetcher(store=object())
+    panel = compute_panel_indicators(MarketPanel.from_frames(frames))
+
+    for symbol, frame in panel.to_frames().items():
+        expected = fetcher._process_data(frames[symbol].copy())
+        pd.testing.assert_frame_equal(frame, expected, check_freq=False, rtol=1e-9)
+
+def test_latest_rows(frames):
+    panel = compute_panel_indicators(MarketPanel.from_frames(frames))
+    latest = panel.latest(['Close', 'SMA_20'])
+    assert latest.shape == (3, 2)
+    assert latest[1, 0] == frames['ETH-USD']['Close'].iloc[-1]
+    # Too short a history for SMA_20 is filled with zero, as in _process_data
+    assert latest[2, 1] == 0
@@ -0,0 +1,96 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+# Same module names as the application, so the tables are declared only once
+from auth.models import Base
+from predictions.models import PredictionRecord
+from predictions.history import PredictionWriter, history_query, serialize
+
+@pytest.fixture
+def session_factory(tmp_path):
+    # A file database, so the writer thread sees the same tables as the test
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+def result(symbol='BTC-USD', minutes=0):
+    return {
+        'symbol': symbol,
+        'current_price': 100.0,
+        'predicted_price': 101.0,
+        'predicted_change_percent': 1.0,
+        'confidence_score': 0.9,
+        'timestamp': (datetime(2024, 3, 1) + timedelta(minutes=minutes)).isoformat()
+    }
+
+def count(session_factory):
+    with session_factory() as session:
+        return session.execute(select(func.count()).select_from(PredictionRecord)).scalar()
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_flushes_when_batch_is_full(session_factory):
+    writer = PredictionWriter(session_factory, max_batch=3, flush_interval=60)
+    writer.add(result())
+    writer.add(result())
+    assert count(session_factory) == 0
+
+    writer.add(result())
+    assert wait_for(lambda: count(session_factory) == 3)
+    writer.stop()
+
+def test_flushes_after_interval(session_factory):
+    writer = PredictionWriter(session_factory, max_batch=100, flush_interval=0.05)
+    writer.add(result(), username='alice')
+    assert wait_for(lambda: count(session_factory) == 1)
+    writer.stop()
+
+def test_stop_writes_remaining_rows(session_factory):
+    writer = PredictionWriter(session_factory, max_batch=100, flush_interval=60)
+    for i in range(5):
+        writer.add(result(minutes=i))
+    writer.stop()
+    assert count(session_factory) == 5
+    assert writer.pending == 0
+
+def test_failed_flush_keeps_rows_up_to_limit(tmp_path, session_factory):
+    # No tables yet, so every insert fails
+    broken = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'empty.db'}"))
+    writer = PredictionWriter(broken, max_batch=100, flush_interval=60, max_pending=3)
+    for i in range(5):
+        writer.add(result(minutes=i))
+    assert writer.flush() == 0
+    assert writer.pending == 3
+
+    writer.session_factory = session_factory
+    assert writer.flush() == 3
+    with session_factory() as session:
+        # The oldest rows were the ones dropped
+        times = session.execute(select(PredictionRecord.created_at).order_by(PredictionRecord.created_at)).scalars()
+        assert [t.minute for t in times] == [2, 3, 4]
+    writer.stop()
+
+def test_history_query_filters_and_pages(session_factory):
+    writer = PredictionWriter(session_factory, max_batch=100, flush_interval=60)
+    for i in range(6):
+        writer.add(result('BTC-USD' if i % 2 else 'ETH-USD', minutes=i), username='alice' if i < 3 else 'bob')
+    writer.stop()
+
+    with session_factory() as session:
+        btc = [serialize(r) for r in session.execute(history_query(symbol='BTC-USD')).scalars()]
+        assert [r['created_at'][-5:] for r in btc] == ['05:00', '03:00', '01:00']
+
+        page = session.execute(history_query(username='alice').limit(2).offset(1)).scalars().all()
+        assert [r.created_at.minute for r in page] == [1, 0]
+
+        window = history_query(start=datetime(2024, 3, 1, 0, 2), end=datetime(2024, 3, 1, 0, 3))
+        assert len(session.execute(window).scalars().all()) == 2
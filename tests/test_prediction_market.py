@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import pytest
+import config
+from src.main import PredictionMarket
+from src.data.market_data import AsyncMarketDataFetcher
+from src.models.prediction_model import MarketPredictionModel
+
+class FakeMarketData:
+    def __init__(self, frames):
+        self.frames = frames
+        self.logger = logging.getLogger(__name__)
+
+    def fetch_historical_data(self, symbol, period='1y', interval='1d'):
+        if symbol not in self.frames:
+            raise ValueError(f"No data for {symbol}")
+        return self.frames[symbol]
+
+    def _get_cached(self, cache_key):
+        return None
+
+    def _in_flight(self, cache_key):
+        return None
+
+    def _fetch_uncached(self, symbol, period, interval):
+        return self.fetch_historical_data(symbol, period, interval)
+
+class FakeRegistry:
+    def __init__(self, models):
+        self.models = models
+
+    def get(self, symbol):
+        if symbol not in self.models:
+            raise KeyError(f"No trained model for {symbol}")
+        return self.models[symbol]
+
+class RecordingHistory:
+    def __init__(self):
+        self.rows = []
+
+    def add(self, result, username=None):
+        self.rows.append((result['symbol'], username))
+
+class CountingModel(MarketPredictionModel):
+    def __init__(self):
+        super().__init__()
+        self.model.set_params(n_estimators=5)
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return super().predict(X)
+
+@pytest.fixture
+def market(monkeypatch, make_frame):
+    monkeypatch.setattr(config, 'PREDICTION_THRESHOLD', 2.0)
+    frames = {symbol: make_frame(seed) for seed, symbol in enumerate(['BTC-USD', 'ETH-USD', 'SOL-USD'])}
+
+    shared = CountingModel()
+    data = frames['BTC-USD']
+    shared.train(data[:-1], data['Close'].shift(-1)[:-1].values)
+    own = CountingModel()
+    own.train(frames['SOL-USD'][:-1], frames['SOL-USD']['Close'].shift(-1)[:-1].values)
+
+    market = PredictionMarket.__new__(PredictionMarket)
+    market.market_data = FakeMarketData(frames)
+    market.async_market_data = AsyncMarketDataFetcher(market.market_data)
+    market.models = FakeRegistry({'BTC-USD': shared, 'ETH-USD': shared, 'SOL-USD': own})
+    market.latest_predictions = {}
+    market.history = RecordingHistory()
+    return market
+
+def test_batch_matches_single_predictions(market):
+    batch = market.make_predictions(['BTC-USD', 'ETH-USD', 'SOL-USD'])
+    assert batch['errors'] == {}
+
+    for symbol, result in batch['predictions'].items():
+        single = market.make_prediction(symbol)
+        assert result['predicted_price'] == pytest.approx(single['predicted_price'])
+        assert result['confidence_score'] == pytest.approx(single['confidence_score'])
+
+def test_batch_calls_each_model_once(market):
+    market.make_predictions(['BTC-USD', 'ETH-USD', 'SOL-USD'])
+    assert market.models.get('BTC-USD').calls == 1
+    assert market.models.get('SOL-USD').calls == 1
+
+def test_batch_reports_per_symbol_errors(market):
+    batch = market.make_predictions(['BTC-USD', 'NOPE', 'DOGE-USD'])
+    market.models.models.pop('BTC-USD')
+    assert set(batch['predictions']) == {'BTC-USD'}
+    assert 'No data for NOPE' in batch['errors']['NOPE']
+
+    batch = market.make_predictions(['BTC-USD'])
+    assert batch['errors']['BTC-USD'] == 'No trained model for BTC-USD'
+
+def test_async_paths_match_sync(market):
+    single = asyncio.run(market.make_prediction_async('SOL-USD'))
+    assert single['predicted_price'] == pytest.approx(market.make_prediction('SOL-USD')['predicted_price'])
+
+    batch = asyncio.run(market.make_predictions_async(['BTC-USD', 'ETH-USD', 'NOPE']))
+    assert set(batch['predictions']) == {'BTC-USD', 'ETH-USD'}
+    assert 'No data for NOPE' in batch['errors']['NOPE']
+
+def test_latest_prediction_is_recorded(market):
+    assert market.latest_prediction('BTC-USD') is None
+
+    result = market.make_prediction('BTC-USD')
+    assert market.latest_prediction('BTC-USD') is result
+
+    batch = market.make_predictions(['ETH-USD', 'NOPE'])
+    assert market.latest_prediction('ETH-USD') is batch['predictions']['ETH-USD']
+    assert market.latest_prediction('NOPE') is None
+
+def test_predictions_are_sent_to_history(market):
+    market.make_prediction('BTC-USD', user='alice')
+    market.make_predictions(['ETH-USD', 'NOPE'])
+    asyncio.run(market.make_predictions_async(['SOL-USD'], user='bob'))
+
+    assert market.history.rows == [('BTC-USD', 'alice'), ('ETH-USD', None), ('SOL-USD', 'bob')]
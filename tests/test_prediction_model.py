@@ -60,4 +60,46 @@ def test_prediction(sample_data):
     
     assert isinstance(prediction, np.ndarray)
     assert isinstance(confidence, np.ndarray)
-    assert 0 <= confidence[0] <= 1 
\ No newline at end of file
+    assert 0 <= confidence[0] <= 1
+
+def test_compiled_forest_matches_sklearn(sample_data):
+    model = MarketPredictionModel()
+    features = sample_data[['Open', 'High', 'Low', 'Close', 'Volume', 'SMA_20', 'SMA_50', 'RSI']]
+    target = sample_data['Close'].shift(-1)[:-1]
+    model.train(features[:-1], target)
+
+    X_scaled = model.scaler.transform(model.select_features(features))
+    expected = model.model.predict(X_scaled)
+    compiled = model.compile()
+
+    np.testing.assert_allclose(compiled.predict(X_scaled), expected, rtol=1e-10)
+    np.testing.assert_allclose(compiled.predict_one(X_scaled[-1]), expected[-1], rtol=1e-10)
+
+def test_single_row_prediction_uses_fitted_scaler(sample_data, tmp_path):
+    model = MarketPredictionModel()
+    features = sample_data[['Open', 'High', 'Low', 'Close', 'Volume', 'SMA_20', 'SMA_50', 'RSI']]
+    target = sample_data['Close'].shift(-1)[:-1]
+    model.train(features[:-1], target)
+    model.save_model(str(tmp_path / 'model.joblib'))
+
+    loaded = MarketPredictionModel()
+    loaded.load_model(str(tmp_path / 'model.joblib'))
+    processed = loaded._add_technical_indicators(features.copy())
+
+    # Rows that already carry the training columns skip indicator work
+    prediction, _ = loaded.predict(processed.iloc[-1:])
+    expected = loaded.model.predict(loaded.scaler.transform(processed[loaded.feature_columns].values[-1:]))
+    np.testing.assert_allclose(prediction, expected, rtol=1e-10)
+
+def test_feature_row_follows_column_layout(sample_data):
+    model = MarketPredictionModel()
+    features = sample_data[['Open', 'High', 'Low', 'Close', 'Volume', 'SMA_20', 'SMA_50', 'RSI']]
+    model.train(features[:-1], sample_data['Close'].shift(-1)[:-1])
+    processed = model._add_technical_indicators(features.copy())
+    expected = processed[model.feature_columns].to_numpy()[-1]
+
+    np.testing.assert_array_equal(model.feature_row(processed), expected)
+    # A different layout is looked up again rather than reusing stale positions
+    np.testing.assert_array_equal(model.feature_row(processed[processed.columns[::-1]]), expected)
+    with pytest.raises(KeyError):
+        model.feature_row(processed.drop(columns=['RSI']))
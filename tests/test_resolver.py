@@ -0,0 +1,74 @@
+from concurrent.futures import Future
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+# Same module names as the resolver, so the tables are declared only once
+from auth.models import Base
+from blockchain.models import ChainPrediction
+from blockchain.resolver import BatchResolver
+
+class FakeContractManager:
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = failing
+
+    def estimate_resolution_gas(self, symbol, actual_price, indexes, private_key, as_range=False):
+        if symbol in self.failing:
+            raise ValueError('execution reverted')
+        return 10 + 40 * len(indexes)
+
+    def submit_resolution(self, symbol, actual_price, indexes, private_key, gas=None, as_range=False):
+        self.calls.append((symbol, actual_price, list(indexes), gas, as_range))
+        future = Future()
+        future.set_result({'status': 'success'})
+        return future
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    rows = []
+    for symbol, count in [('BTC', 7), ('ETH', 3)]:
+        for i in range(count):
+            rows.append({
+                'symbol': symbol, 'prediction_index': i, 'user': '0xa', 'predicted_price': 100,
+                'stake': 1, 'block_number': 1, 'transaction_hash': f"{symbol}{i}", 'log_index': 0,
+                'resolved': symbol == 'BTC' and i == 2
+            })
+    session.execute(insert(ChainPrediction), rows)
+    return session
+
+def test_batches_stay_under_gas_limit(session):
+    manager = FakeContractManager()
+    resolver = BatchResolver(manager, max_gas=160, base_gas=10, gas_per_prediction=50)
+    assert resolver.batch_size == 3
+
+    submitted = resolver.resolve(session, {'BTC': 105, 'ETH': 2000}, private_key='0x1')
+    assert [call[:3] for call in manager.calls] == [
+        ('BTC', 105, [0, 1, 3]),
+        ('BTC', 105, [4, 5, 6]),
+        ('ETH', 2000, [0, 1, 2])
+    ]
+    # The node's estimate plus the margin, never above the batch limit
+    assert [call[3] for call in manager.calls] == [156, 156, 156]
+    # Consecutive indexes go out as a range, the one with a gap as a list
+    assert [call[4] for call in manager.calls] == [False, True, True]
+    assert all(future.result()['status'] == 'success' for _, future in submitted)
+
+def test_symbols_without_price_stay_open(session):
+    manager = FakeContractManager()
+    BatchResolver(manager).resolve(session, {'ETH': 2000}, private_key='0x1')
+    assert [call[0] for call in manager.calls] == ['ETH']
+
+def test_margin_is_capped_by_gas_limit():
+    resolver = BatchResolver(FakeContractManager(), max_gas=1000, gas_margin=1.5)
+    assert resolver.gas_limit(600) == 900
+    assert resolver.gas_limit(800) == 1000
+
+def test_batches_that_fail_estimation_are_not_sent(session):
+    manager = FakeContractManager(failing={'BTC'})
+    submitted = BatchResolver(manager).resolve(session, {'BTC': 105, 'ETH': 2000}, private_key='0x1')
+    assert [call[0] for call in manager.calls] == ['ETH']
+    assert [batch.symbol for batch, _ in submitted] == ['ETH']
+
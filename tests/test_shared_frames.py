@@ -0,0 +1,48 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.data import shared_frames as shared_frames_module
+from src.data.shared_frames import SharedFrameCache
+
+def test_round_trip_is_memory_mapped(tmp_path, make_bars):
+    # Prices stay float64 next to float32 volume, as compacted frames do
+    frame = make_bars('2024-01-01', 20).astype({'Volume': np.float32})
+    frame.index.name = 'Date'
+    SharedFrameCache(str(tmp_path)).write('BTC-USD', '1d', frame, coverage_start='max')
+
+    shared, meta = SharedFrameCache(str(tmp_path)).read('BTC-USD', '1d')
+    pd.testing.assert_frame_equal(shared, frame, check_freq=False)
+    assert meta['coverage_start'] == 'max'
+    for column in ('Close', 'Volume'):
+        base = shared[column].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert base is not None
+
+def test_new_version_replaces_old(tmp_path, make_bars):
+    writer, reader = SharedFrameCache(str(tmp_path)), SharedFrameCache(str(tmp_path))
+    writer.write('BTC-USD', '1d', make_bars('2024-01-01', 5).astype(np.float32))
+    old, _ = reader.read('BTC-USD', '1d')
+
+    writer.write('BTC-USD', '1d', make_bars('2024-01-01', 6).astype(np.float32))
+    new, _ = reader.read('BTC-USD', '1d')
+    assert len(new) == 6
+    # The old mapping stays readable after its files are removed
+    assert len(old) == 5 and old['Close'].iloc[-1] == 105.0
+
+def test_rejects_non_float_columns(tmp_path, make_bars):
+    with pytest.raises(ValueError):
+        SharedFrameCache(str(tmp_path)).write('BTC-USD', '1d', make_bars('2024-01-01', 5).astype({'Volume': np.int64}))
+
+def test_late_older_version_does_not_replace_newer(tmp_path, make_bars, monkeypatch):
+    first, second = SharedFrameCache(str(tmp_path)), SharedFrameCache(str(tmp_path))
+
+    # The first writer started earlier but finishes after the second one
+    monkeypatch.setattr(shared_frames_module.time, 'time_ns', lambda: 2)
+    assert second.write('BTC-USD', '1d', make_bars('2024-01-01', 6).astype(np.float32)) is not None
+    monkeypatch.setattr(shared_frames_module.time, 'time_ns', lambda: 1)
+    assert first.write('BTC-USD', '1d', make_bars('2024-01-01', 5).astype(np.float32)) is None
+
+    for reader in (first, second, SharedFrameCache(str(tmp_path))):
+        frame, _ = reader.read('BTC-USD', '1d')
+        assert len(frame) == 6
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from src.api.stream import PredictionHub, Subscriber
+
+class FakeRefresh:
+    def __init__(self):
+        self.calls = []
+        self.price = 100.0
+
+    async def __call__(self, symbol):
+        self.calls.append(symbol)
+        if symbol == 'BAD':
+            raise ValueError("No data for BAD")
+        return {'price': self.price}
+
+async def drain(subscriber):
+    return await asyncio.wait_for(subscriber.next(), 1)
+
+def test_one_refresh_per_symbol_for_all_subscribers():
+    async def scenario():
+        refresh = FakeRefresh()
+        hub = PredictionHub(refresh, interval=0.05)
+        subscribers = [hub.connect() for _ in range(10)]
+        for subscriber in subscribers:
+            hub.subscribe(subscriber, ['BTC-USD'])
+
+        first = [await drain(s) for s in subscribers]
+        assert all(m == {'type': 'update', 'symbol': 'BTC-USD', 'price': 100.0} for m in first)
+        assert refresh.calls == ['BTC-USD']
+
+        # Unchanged data is not sent again; changed data reaches everyone
+        await asyncio.sleep(0.12)
+        refresh.price = 101.0
+        assert (await drain(subscribers[3]))['price'] == 101.0
+        assert len(refresh.calls) <= 5
+
+        # A late subscriber gets the latest update immediately
+        late = hub.connect()
+        hub.subscribe(late, ['BTC-USD'])
+        assert (await drain(late))['price'] == 101.0
+        await hub.shutdown()
+
+    asyncio.run(scenario())
+
+def test_refresh_stops_with_last_subscriber():
+    async def scenario():
+        refresh = FakeRefresh()
+        hub = PredictionHub(refresh, interval=0.01)
+        subscriber = hub.connect()
+        hub.subscribe(subscriber, ['BTC-USD', 'BAD'])
+
+        messages = {m['symbol']: m for m in [await drain(subscriber), await drain(subscriber)]}
+        assert messages['BAD'] == {'type': 'error', 'symbol': 'BAD', 'detail': 'No data for BAD'}
+
+        hub.disconnect(subscriber)
+        await asyncio.sleep(0.05)
+        calls = len(refresh.calls)
+        await asyncio.sleep(0.05)
+        assert len(refresh.calls) == calls
+        assert hub.watched_symbols() == set()
+
+    asyncio.run(scenario())
+
+def test_slow_subscribers_only_get_the_latest_update():
+    async def scenario():
+        subscriber = Subscriber()
+        for price in range(100):
+            subscriber.offer('BTC-USD', {'price': price})
+        subscriber.offer('ETH-USD', {'price': 1})
+
+        assert await drain(subscriber) == {'price': 99}
+        assert await drain(subscriber) == {'price': 1}
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(subscriber.next(), 0.05)
+
+    asyncio.run(scenario())
+
+def test_symbol_limit_per_connection():
+    async def scenario():
+        hub = PredictionHub(FakeRefresh(), interval=1, max_symbols=2)
+        subscriber = hub.connect()
+        hub.subscribe(subscriber, ['A', 'B'])
+        with pytest.raises(ValueError):
+            hub.subscribe(subscriber, ['C'])
+        await hub.shutdown()
+
+    asyncio.run(scenario())
+
+def test_websocket_protocol():
+    hub = PredictionHub(FakeRefresh(), interval=0.05)
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def stream(websocket: WebSocket):
+        await websocket.accept()
+        await hub.serve(websocket)
+
+    with TestClient(app).websocket_connect("/ws") as websocket:
+        websocket.send_json({'action': 'subscribe', 'symbols': ['BTC-USD']})
+        assert websocket.receive_json() == {'type': 'update', 'symbol': 'BTC-USD', 'price': 100.0}
+        websocket.send_json({'action': 'bogus'})
+        assert websocket.receive_json()['type'] == 'error'
+    assert hub.watched_symbols() == set()
+
+def test_malformed_messages_get_error_replies():
+    hub = PredictionHub(FakeRefresh(), interval=0.05)
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def stream(websocket: WebSocket):
+        await websocket.accept()
+        await hub.serve(websocket)
+
+    with TestClient(app).websocket_connect("/ws") as websocket:
+        for message in ['{not json', '[1, 2]', '{"action": "subscribe", "symbols": "BTC-USD"}',
+                        '{"action": "subscribe", "symbols": ["BTC-USD", ""]}']:
+            websocket.send_text(message)
+            assert websocket.receive_json()['type'] == 'error'
+        websocket.send_bytes(b'\x00')
+        assert websocket.receive_json()['type'] == 'error'
+        assert hub.watched_symbols() == set()
+
+        # The connection survives and still serves valid requests
+        websocket.send_json({'action': 'subscribe', 'symbols': ['BTC-USD']})
+        assert websocket.receive_json() == {'type': 'update', 'symbol': 'BTC-USD', 'price': 100.0}
@@ -0,0 +1,69 @@
+import threading
+import pytest
+from src.data.indicators import FEATURE_COLUMNS
+from src.models.model_registry import ModelRegistry
+from src.models.training_jobs import TrainingJobManager, COMPLETED, FAILED
+
+class FakeMarketData:
+    def __init__(self, frames, gate=None):
+        self.frames = frames
+        self.gate = gate
+        self.fetches = 0
+        self.batches = []
+
+    def fetch_historical_data(self, symbol, period='1y', interval='1d'):
+        self.fetches += 1
+        if self.gate is not None:
+            self.gate.wait()
+        if symbol not in self.frames:
+            raise ValueError(f"No data for {symbol}")
+        return self.frames[symbol]
+
+    def fetch_multiple_symbols(self, symbols, period='1y', interval='1d'):
+        self.batches.append(symbols)
+        return {symbol: self.frames[symbol] for symbol in symbols if symbol in self.frames}
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(model_dir=str(tmp_path))
+
+def test_jobs_train_and_publish(registry, make_frame):
+    market_data = FakeMarketData({'BTC-USD': make_frame(0), 'ETH-USD': make_frame(1)})
+    manager = TrainingJobManager(market_data, registry, max_workers=2)
+    try:
+        jobs = manager.submit_many(['BTC-USD', 'ETH-USD', 'NOPE'])
+        assert manager.wait(jobs, timeout=120)
+    finally:
+        manager.shutdown()
+
+    btc, eth, missing = jobs
+    assert btc.status == COMPLETED and eth.status == COMPLETED
+    assert set(btc.metrics) == {'mse', 'rmse', 'r2'}
+    # Artifacts written by the worker processes are visible to the parent's registry
+    assert registry.current_version('BTC-USD') == btc.version
+    assert registry.get('ETH-USD').feature_columns == FEATURE_COLUMNS
+
+    assert missing.status == FAILED
+    assert missing.error == 'No data for NOPE'
+    assert manager.stats() == {'queued': 0, 'running': 0, 'completed': 2, 'failed': 1}
+    # One batch fetch for all symbols; only the one it could not serve is fetched alone
+    assert market_data.batches == [['BTC-USD', 'ETH-USD', 'NOPE']]
+    assert market_data.fetches == 1
+
+def test_duplicate_submissions_share_a_job(registry):
+    gate = threading.Event()
+    market_data = FakeMarketData({}, gate=gate)
+    manager = TrainingJobManager(market_data, registry, max_workers=1)
+    try:
+        first = manager.submit('BTC-USD')
+        assert manager.submit('BTC-USD') is first
+        assert manager.get(first.id) is first
+
+        gate.set()
+        assert manager.wait([first], timeout=10)
+        # Once finished, the symbol can be trained again
+        assert manager.submit('BTC-USD') is not first
+    finally:
+        gate.set()
+        manager.shutdown()
+    assert market_data.fetches == 2
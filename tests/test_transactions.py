@@ -0,0 +1,140 @@
+import threading
+import pytest
+from concurrent.futures import Future
+from hexbytes import HexBytes
+from src.blockchain.transactions import NonceManager, GasPriceCache, TransactionPipeline
+from src.blockchain.contract_manager import ContractManager
+
+PRIVATE_KEY = '0x' + '11' * 32
+
+class FakeSigned:
+    def __init__(self, txn):
+        self.raw_transaction = txn
+
+class FakeAccount:
+    @staticmethod
+    def sign_transaction(txn, private_key):
+        return FakeSigned(txn)
+
+class FakeEth:
+    def __init__(self, chain_nonce=0):
+        self.chain_nonce = chain_nonce
+        self.count_calls = 0
+        self.gas_price_calls = 0
+        self.sent = []
+        self.reject = set()
+        self.mined = threading.Event()
+        self.account = FakeAccount()
+
+    def get_transaction_count(self, address, block_identifier='latest'):
+        self.count_calls += 1
+        return self.chain_nonce
+
+    @property
+    def gas_price(self):
+        self.gas_price_calls += 1
+        return 10
+
+    def send_raw_transaction(self, txn):
+        if txn['nonce'] in self.reject:
+            self.reject.discard(txn['nonce'])
+            raise ValueError('insufficient funds')
+        if txn['nonce'] < self.chain_nonce:
+            raise ValueError('nonce too low')
+        self.sent.append(txn)
+        return HexBytes(txn['nonce'].to_bytes(32, 'big'))
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout=120):
+        self.mined.wait(timeout)
+        return {'status': 1, 'transactionHash': HexBytes(tx_hash), 'blockNumber': 7}
+
+class FakeWeb3:
+    def __init__(self, chain_nonce=0):
+        self.eth = FakeEth(chain_nonce)
+
+class FakeCall:
+    def build_transaction(self, params):
+        return dict(params)
+
+@pytest.fixture
+def w3():
+    return FakeWeb3(chain_nonce=5)
+
+@pytest.fixture
+def pipeline(w3):
+    pipeline = TransactionPipeline(w3, receipt_timeout=5)
+    yield pipeline
+    w3.eth.mined.set()
+    pipeline.shutdown()
+
+def test_back_to_back_submission(w3, pipeline):
+    futures = [pipeline.submit(FakeCall(), PRIVATE_KEY) for _ in range(3)]
+
+    # All three are sent before any is mined, with consecutive nonces and one lookup each
+    assert [txn['nonce'] for txn in w3.eth.sent] == [5, 6, 7]
+    assert w3.eth.count_calls == 1
+    assert w3.eth.gas_price_calls == 1
+    assert not any(future.done() for future in futures)
+
+    w3.eth.mined.set()
+    assert [future.result(timeout=5)['block_number'] for future in futures] == [7, 7, 7]
+
+def test_concurrent_submissions_never_share_a_nonce(w3, pipeline):
+    threads = [threading.Thread(target=pipeline.submit, args=(FakeCall(), PRIVATE_KEY)) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(txn['nonce'] for txn in w3.eth.sent) == list(range(5, 25))
+
+def test_failed_send_leaves_no_gap(w3, pipeline):
+    w3.eth.reject.add(5)
+    with pytest.raises(ValueError):
+        pipeline.submit(FakeCall(), PRIVATE_KEY)
+    pipeline.submit(FakeCall(), PRIVATE_KEY)
+    assert [txn['nonce'] for txn in w3.eth.sent] == [5]
+
+def test_released_nonce_is_reused_first(w3):
+    nonces = NonceManager(w3)
+    assert [nonces.reserve('a') for _ in range(3)] == [5, 6, 7]
+    nonces.release('a', 6)
+    assert nonces.reserve('a') == 6
+    assert nonces.reserve('a') == 8
+
+def test_nonce_too_low_resyncs(w3, pipeline):
+    pipeline.submit(FakeCall(), PRIVATE_KEY)
+    # Another client used the account meanwhile
+    w3.eth.chain_nonce = 9
+    pipeline.submit(FakeCall(), PRIVATE_KEY)
+    assert [txn['nonce'] for txn in w3.eth.sent] == [5, 9]
+
+def test_gas_price_cache_expires(w3):
+    cache = GasPriceCache(w3, ttl=0)
+    cache.get()
+    cache.get()
+    assert w3.eth.gas_price_calls == 2
+
+def test_predictions_on_one_symbol_keep_their_own_futures():
+    manager = ContractManager.__new__(ContractManager)
+    sent = []
+
+    def submit_prediction(symbol, predicted_price, stake_amount, private_key):
+        if predicted_price < 0:
+            raise ValueError('bad price')
+        future = Future()
+        future.set_result(len(sent))
+        sent.append(symbol)
+        return future
+
+    manager.submit_prediction = submit_prediction
+    futures = manager.place_predictions([
+        {'symbol': 'BTC-USD', 'predicted_price': 100, 'stake_amount': 1},
+        {'symbol': 'BTC-USD', 'predicted_price': -1, 'stake_amount': 1},
+        {'symbol': 'BTC-USD', 'predicted_price': 101, 'stake_amount': 1}
+    ], PRIVATE_KEY)
+
+    assert sent == ['BTC-USD', 'BTC-USD']
+    assert futures[0].result() == 0 and futures[2].result() == 1
+    with pytest.raises(ValueError):
+        futures[1].result()
+
@@ -0,0 +1,40 @@
+import pandas as pd
+from src.models.model_registry import ModelRegistry
+from src.models.training_jobs import train_symbol
+from src.models.tuning import HyperparameterSearch, pareto_front
+
+GRID = {'n_estimators': [3, 6], 'max_depth': [2, 4], 'min_samples_split': [2, 10]}
+
+def test_search_prunes_weak_trials(make_frame):
+    trials = HyperparameterSearch(GRID, n_splits=3, eta=2, n_jobs=2).search(make_frame(0, periods=150))
+
+    assert len(trials) == 8
+    # 8 trials on the first fold, the best 4 on the second, the best 2 on the last
+    assert sorted(trials['folds']) == [1, 1, 1, 1, 2, 2, 3, 3]
+    assert (trials['latency_us'] > 0).all() and (trials['size_bytes'] > 0).all()
+    assert trials['pareto'].any()
+    # Only trials measured on every fold compete on the front
+    assert (trials.loc[trials['pareto'], 'folds'] == 3).all()
+
+def test_pareto_front():
+    trials = pd.DataFrame({
+        'mse': [1.0, 2.0, 1.0, 3.0],
+        'latency_us': [10.0, 5.0, 10.0, 6.0],
+        'size_bytes': [100, 50, 200, 60]
+    })
+    # The last is beaten by the second on every objective, the third by the first
+    assert list(pareto_front(trials)) == [True, True, False, False]
+
+def test_best_params_are_used_for_training(tmp_path, make_frame):
+    registry = ModelRegistry(model_dir=str(tmp_path))
+    data = make_frame(1, periods=150)
+    search = HyperparameterSearch(GRID, n_splits=3, eta=2, n_jobs=1)
+    trials = search.tune('BTC-USD', data, registry)
+
+    best = search.best(trials)
+    assert best['folds'] == 3
+    assert registry.load_params('BTC-USD') == best['params']
+
+    train_symbol('BTC-USD', data, str(tmp_path))
+    model = ModelRegistry(model_dir=str(tmp_path)).get('BTC-USD')
+    assert model.model.n_estimators == best['params']['n_estimators']